@@ -6,7 +6,9 @@ set -x
 # to archive data from various global models.
 ##################################################
 
+model_specs=""
 for model in $model_list; do
+    cycles=""
     if [ $model = "cdas" ];   then cycles="00";          fhrmin=0; fhrmax=384; fhrinc=24; fi
     if [ $model = "cfsr" ];   then cycles="00";          fhrmin=0; fhrmax=384; fhrinc=24; fi
     if [ $model = "cmc" ];    then cycles="00 12";       fhrmin=0; fhrmax=240; fhrinc=12; fi
@@ -22,8 +24,13 @@ for model in $model_list; do
     if [ $model = "ukm" ];    then cycles="00 12";       fhrmin=0; fhrmax=144; fhrinc=12; fi
     if [ $model = "graphcastgfs" ]; then cycles="00 06 12 18"; fhrmin=6; fhrmax=384; fhrinc=6;  fi
     if [ $model = "eagle_solo" ]; then cycles="00 06 12 18"; fhrmin=6; fhrmax=384; fhrinc=6;  fi
+    if [ -z "$cycles" ]; then
+        echo "WARNING: no settings for $model, skipping"
+        continue
+    fi
     for cycle in $cycles ; do
-        cd $DATA
-        python ${USHemc_global_archive}/get_model_data.py --date=$IDATE --archdir=$ARCHOUTmodel --rundir=$DATA --model=$model --cycle=$cycle --fhrmin=$fhrmin --fhrmax=$fhrmax --fhrinc=$fhrinc
+        model_specs="${model_specs:+$model_specs,}$model:$cycle:$fhrmin:$fhrmax:$fhrinc"
     done
 done
+cd $DATA
+python ${USHemc_global_archive}/get_model_data.py --date=$IDATE --archdir=$ARCHOUTmodel --rundir=$DATA --modelspecs=$model_specs --workers=$nworkers
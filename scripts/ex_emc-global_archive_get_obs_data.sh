@@ -6,7 +6,6 @@ set -x
 # to archive the observation data.
 ##################################################
 
-for obs in $obs_list; do
-    cd $DATA
-    python ${USHemc_global_archive}/get_obs_data.py --date=$IDATE --archdir=$ARCHOUTobs --rundir=$DATA --obs=$obs
-done
+obs_csv=$(echo $obs_list | tr ' ' ',')
+cd $DATA
+python ${USHemc_global_archive}/get_obs_data.py --date=$IDATE --archdir=$ARCHOUTobs --rundir=$DATA --obs=$obs_csv
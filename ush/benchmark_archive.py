@@ -0,0 +1,620 @@
+"""
+About:
+        This script benchmarks the archive scripts
+        off WCOSS2. It builds a synthetic COMROOT and
+        DCOMROOT tree of realistically sized files (scaled
+        by --scale), puts stand-ins for htar, hsi, wget,
+        lftp, rsync, ssh, and the grib tools on PATH (see
+        benchmark_fake_tool.py), then times each getter,
+        checker, tar creator, and the remove and rsync
+        scripts end to end.
+Author(s):
+        Mallory Row (mallory.row@noaa.gov)
+History Log:
+        October 2026 - Inital version
+Command Line Agruments:
+        --date: optional, date (format YYYYmmdd) to run for,
+                default: 20240115
+        --benchdir: optional, path to benchmark directory,
+                    default: /lfs/h2/emc/stmp/$USER/benchmark_archive
+        --scale: optional, multiplier of realistic file sizes,
+                 default: 0.01
+        --workers: optional, number of worker processes for
+                   get_model_data.py,
+                   default: 4
+        --baseline: optional, path to results of an earlier
+                    benchmark to compare against,
+                    default: none
+        --tolerance: optional, percent slower than the baseline
+                     that is a regression,
+                     default: 20
+Input Files:
+Output Files:
+        benchmark_results.json in the benchmark directory
+Condition codes: 0 for success, 1 for failure or regression
+"""
+
+import os
+import sys
+import datetime
+import shutil
+import subprocess
+import tarfile
+import time
+import json
+
+print("\nBEGIN: "+sys.argv[0]+" at "+str(datetime.datetime.today())+"\n")
+
+def usage():
+    """! How to call this script.
+    """
+    filename = os.path.basename(__file__)
+    print ("Usage: "+filename+" arg1 arg2\n"
+           +"-h|--help               Display this usage statement\n"
+           +"Arguments:\n"
+           +"   --date=PDY              optional, "
+           +"date (format YYYYmmdd) to run for, "
+           +"default: 20240115\n"
+           +"   --benchdir=BENCH_DIR    optional, "
+           +"default: /lfs/h2/emc/stmp/$USER/benchmark_archive\n"
+           +"   --scale=SCALE           optional, "
+           +"default: 0.01\n"
+           +"   --workers=NWORKERS      optional, "
+           +"default: 4\n"
+           +"   --baseline=BASELINE     optional, "
+           +"default: none\n"
+           +"   --tolerance=TOLERANCE   optional, "
+           +"default: 20\n")
+    sys.exit(1)
+
+# Command line agrument information
+cmd_line_args_dict = {
+    '--date=': {
+        'run_name': 'PDY',
+        'default': '20240115'
+    },
+    '--benchdir=': {
+        'run_name': 'BENCH_DIR',
+        'default': ('/lfs/h2/emc/stmp/'+os.environ.get('USER', 'user')
+                    +'/benchmark_archive')
+    },
+    '--scale=': {
+        'run_name': 'SCALE',
+        'default': '0.01'
+    },
+    '--workers=': {
+        'run_name': 'NWORKERS',
+        'default': '4'
+    },
+    '--baseline=': {
+        'run_name': 'BASELINE',
+        'default': ''
+    },
+    '--tolerance=': {
+        'run_name': 'TOLERANCE',
+        'default': '20'
+    }
+}
+
+# Print usage statement
+help_args = ('-h', '--help')
+for help_arg in help_args:
+    if help_arg in sys.argv:
+        usage()
+        sys.exit(0)
+
+# Check number of command line arguments
+if len(sys.argv[1:]) > 6:
+    print("Too many agruments")
+    usage()
+
+# Set up dictionary for run settings
+run_settings_dict = {}
+
+# Run settings: hard coded
+print("Hard coded settings...")
+# Sizes in MB of the synthetic files at --scale=1
+run_settings_dict['file_size_mb_dict'] = {
+    'gfs_pgrb2': 40,
+    'gfs_sflux': 200,
+    'gfs_atcfunix': 0.1,
+    'ecm_dcd': 25,
+    'ecm_u1d': 400,
+    'prepbufr_gdas': 60,
+    'ccpa_6h': 0.5,
+    'evs_stat': 20,
+    'fit2obs_file': 0.5,
+}
+run_settings_dict['model_specs'] = (
+    'gfs:00:0:48:6,ecm:00:0:48:12,ecmg4:00:0:48:6'
+)
+run_settings_dict['fake_tool_list'] = [
+    'htar', 'hsi', 'wget', 'lftp', 'rsync', 'ssh', 'wgrib', 'wgrib2',
+    'cnvgrib', 'copygb'
+]
+for run_name in list(run_settings_dict.keys()):
+    print(run_name+' = '+str(run_settings_dict[run_name]))
+
+# Run settings: command line arguments
+print("Command line argument settings...")
+for cmd_line_arg_name in list(cmd_line_args_dict.keys()):
+    cmd_line_arg_opt_dict = cmd_line_args_dict[cmd_line_arg_name]
+    cmd_line_arg_opt_run_name = cmd_line_arg_opt_dict['run_name']
+    cmd_line_arg_opt_default = cmd_line_arg_opt_dict['default']
+    if any(cmd_line_arg_name in arg for arg in sys.argv[1:]):
+        for arg in sys.argv[1:]:
+            if cmd_line_arg_name in arg:
+                if cmd_line_arg_name == '--date=':
+                    if len(arg.replace('--date=','')) != 8:
+                        print("--date must be in YYYYmmdd format, got "
+                              +arg.replace('--date=',''))
+                        sys.exit(1)
+                print(cmd_line_arg_name+" passed, using  "
+                      +arg.replace(cmd_line_arg_name, ''))
+                run_settings_dict[cmd_line_arg_opt_run_name] = (
+                    arg.replace(cmd_line_arg_name, '')
+                )
+    else:
+        print(cmd_line_arg_name+" not passed, using default "
+              +cmd_line_arg_opt_default)
+        run_settings_dict[cmd_line_arg_opt_run_name] = (
+            cmd_line_arg_opt_default
+        )
+
+print("\nUsing run settings...")
+for run_name in list(run_settings_dict.keys()):
+    print(run_name+' = '+str(run_settings_dict[run_name]))
+print("")
+
+USH_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCH_DIR = os.path.abspath(run_settings_dict['BENCH_DIR'])
+PDY = run_settings_dict['PDY']
+PDY_dt = datetime.datetime.strptime(PDY, '%Y%m%d')
+PDYm_list = [(PDY_dt - datetime.timedelta(days=d)).strftime('%Y%m%d')
+             for d in range(9)]
+comroot = os.path.join(BENCH_DIR, 'com')
+dcomroot = os.path.join(BENCH_DIR, 'dcom')
+bin_dir = os.path.join(BENCH_DIR, 'bin')
+archive_dir = os.path.join(BENCH_DIR, 'archive')
+run_dir = os.path.join(BENCH_DIR, 'run')
+hpss_dir = os.path.join(BENCH_DIR, 'hpss')
+log_dir = os.path.join(BENCH_DIR, 'logs')
+
+def make_synthetic_file(file_path, size_key):
+    """! Write a synthetic file of the realistic size
+         for its type, scaled by --scale
+
+         Args:
+             file_path - string of full path to file
+             size_key  - string of key in file_size_mb_dict
+
+         Returns:
+             nbytes    - integer of bytes written
+    """
+    nbytes = max(1, int(run_settings_dict['file_size_mb_dict'][size_key]
+                        *float(run_settings_dict['SCALE'])*1024*1024))
+    if os.path.exists(file_path) and os.stat(file_path).st_size == nbytes:
+        return 0
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    block = os.urandom(min(nbytes, 1024*1024))
+    with open(file_path, 'wb') as synthetic_file:
+        nleft = nbytes
+        while nleft > 0:
+            synthetic_file.write(block[:nleft])
+            nleft-=len(block)
+    return nbytes
+
+def make_synthetic_grib1_file(file_path, size_key):
+    """! Write a synthetic GRIB1 file of the realistic size
+         for its type, scaled by --scale, made of messages
+         with ECMWF table 128 parameters and filler data
+
+         Args:
+             file_path - string of full path to file
+             size_key  - string of key in file_size_mb_dict
+
+         Returns:
+             nbytes    - integer of bytes written
+    """
+    nbytes = max(1, int(run_settings_dict['file_size_mb_dict'][size_key]
+                        *float(run_settings_dict['SCALE'])*1024*1024))
+    if os.path.exists(file_path) and os.stat(file_path).st_size >= nbytes:
+        return 0
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    # T, R, GH, U, V, Q, W, Z on 850 hPa, then
+    # MSL, TP, 2T, 2D, 10U, 10V, TCC, SD, TCW at the surface
+    param_list = [130, 157, 156, 131, 132, 133, 135, 129, 151, 228, 167,
+                  168, 165, 166, 164, 141, 136]
+    surface_param_list = param_list[8:]
+    message_length = max(256, min(nbytes//(4*len(param_list)), 1024*1024))
+    filler = os.urandom(message_length)
+    nwritten = 0
+    with open(file_path, 'wb') as synthetic_file:
+        nmessage = 0
+        while nwritten < nbytes:
+            param = param_list[nmessage % len(param_list)]
+            if param in surface_param_list:
+                level_bytes = bytes([1, 0, 0])
+            else:
+                level_bytes = bytes([100])+(850).to_bytes(2, 'big')
+            pds = (bytes([0, 0, 28, 128, 98, 145, 255, 128, param])
+                   +level_bytes+bytes(16))
+            message = (b'GRIB'+message_length.to_bytes(3, 'big')+b'\x01'
+                       +pds)
+            message+=filler[:message_length-len(message)-4]+b'7777'
+            synthetic_file.write(message)
+            nwritten+=message_length
+            nmessage+=1
+    return nwritten
+
+def make_synthetic_grib2_file(file_path, size_key):
+    """! Write a synthetic GRIB2 file of the realistic size
+         for its type, scaled by --scale, made of one field
+         messages with filler data, and its wgrib2 inventory
+
+         Args:
+             file_path - string of full path to file
+             size_key  - string of key in file_size_mb_dict
+
+         Returns:
+             nbytes    - integer of bytes written
+    """
+    nbytes = max(1, int(run_settings_dict['file_size_mb_dict'][size_key]
+                        *float(run_settings_dict['SCALE'])*1024*1024))
+    if os.path.exists(file_path) and os.stat(file_path).st_size >= nbytes:
+        return 0
+    os.makedirs(os.path.dirname(file_path), exist_ok=True)
+    # name, category, number, surface type, surface value
+    field_list = [('UGRD', 2, 2, 103, 10), ('VGRD', 2, 3, 103, 10),
+                  ('TMP', 0, 0, 103, 2), ('SPFH', 1, 0, 103, 2),
+                  ('PRATE', 1, 7, 1, 0), ('PRES', 3, 0, 1, 0),
+                  ('TMP', 0, 0, 1, 0), ('DSWRF', 4, 7, 1, 0)]
+    level_name_dict = {1: 'surface', 103: ' m above ground'}
+    message_length = max(256, min(nbytes//(4*len(field_list)), 1024*1024))
+    filler = os.urandom(message_length)
+    nwritten = 0
+    with open(file_path, 'wb') as synthetic_file, \
+            open(file_path+'.idx', 'w') as idx_file:
+        nmessage = 0
+        while nwritten < nbytes:
+            name, category, number, surface_type, surface_value = (
+                field_list[nmessage % len(field_list)]
+            )
+            section4 = (
+                (34).to_bytes(4, 'big')+bytes([4])+bytes(4)
+                +bytes([category, number])+bytes(11)
+                +bytes([surface_type, 0])+surface_value.to_bytes(4, 'big')
+                +bytes([255])+bytes(5)
+            )
+            message = (b'GRIB'+bytes([0, 0, 0, 2])
+                       +message_length.to_bytes(8, 'big')
+                       +(21).to_bytes(4, 'big')+bytes([1])+bytes(16)
+                       +section4)
+            section7_length = message_length-len(message)-4
+            message+=(section7_length.to_bytes(4, 'big')+bytes([7])
+                      +filler[:section7_length-5]+b'7777')
+            if surface_type == 1:
+                level_name = level_name_dict[surface_type]
+            else:
+                level_name = str(surface_value)+level_name_dict[surface_type]
+            idx_file.write(str(nmessage+1)+':'+str(nwritten)+':d='+PDY+'00:'
+                           +name+':'+level_name+':anl:\n')
+            synthetic_file.write(message)
+            nwritten+=message_length
+            nmessage+=1
+    return nwritten
+
+def make_synthetic_tree():
+    """! Make the synthetic COMROOT and DCOMROOT trees for
+         the benchmark dates
+
+         Returns:
+             nbytes - integer of bytes written
+    """
+    nbytes = 0
+    for PDYm in PDYm_list:
+        # gfs
+        for cyc in ['00']:
+            gfs_dir = os.path.join(comroot, 'gfs', 'v16.3', 'gfs.'+PDYm,
+                                   cyc, 'atmos')
+            for fhr in range(0, 49, 6):
+                nbytes+=make_synthetic_file(
+                    os.path.join(gfs_dir, 'gfs.t'+cyc+'z.pgrb2.1p00.f'
+                                 +str(fhr).zfill(3)), 'gfs_pgrb2'
+                )
+                nbytes+=make_synthetic_grib2_file(
+                    os.path.join(gfs_dir, 'gfs.t'+cyc+'z.sfluxgrbf'
+                                 +str(fhr).zfill(3)+'.grib2'), 'gfs_sflux'
+                )
+            nbytes+=make_synthetic_file(
+                os.path.join(gfs_dir, 'gfs.t'+cyc+'z.pgrb2.1p00.anl'),
+                'gfs_pgrb2'
+            )
+            for fs in ['anl', 'f000', 'f006']:
+                nbytes+=make_synthetic_file(
+                    os.path.join(comroot, 'gfs', 'v16.3', 'gdas.'+PDYm, cyc,
+                                 'atmos', 'gdas.t'+cyc+'z.pgrb2.1p00.'+fs),
+                    'gfs_pgrb2'
+                )
+            nbytes+=make_synthetic_file(
+                os.path.join(comroot, 'ens_tracker', 'v1.3', 'gfs.'+PDYm,
+                             cyc, 'tctrack',
+                             'avn.t'+cyc+'z.cyclone.trackatcfunix'),
+                'gfs_atcfunix'
+            )
+        # ecm and ecmg4
+        ecm_dir = os.path.join(dcomroot, PDYm, 'wgrbbul', 'ecmwf')
+        for cyc in ['00', '06', '12', '18']:
+            CDATE_dt = datetime.datetime.strptime(PDYm+cyc, '%Y%m%d%H')
+            for fhr in range(0, 49, 6):
+                VDATE_dt = CDATE_dt + datetime.timedelta(hours=fhr)
+                nbytes+=make_synthetic_grib1_file(
+                    os.path.join(ecm_dir, 'DCD'+CDATE_dt.strftime('%m%d%H')
+                                 +'00'+VDATE_dt.strftime('%m%d%H')+'001'),
+                    'ecm_dcd'
+                )
+                if fhr == 0:
+                    suffix = '011'
+                else:
+                    suffix = '001'
+                nbytes+=make_synthetic_grib1_file(
+                    os.path.join(ecm_dir, 'U1D'+CDATE_dt.strftime('%m%d%H')
+                                 +'00'+VDATE_dt.strftime('%m%d%H')+suffix),
+                    'ecm_u1d'
+                )
+        # prepbufr_gdas and ccpa_accum6hr
+        for cyc in ['00', '06', '12', '18']:
+            nbytes+=make_synthetic_file(
+                os.path.join(comroot, 'obsproc', 'v1.1', 'gdas.'+PDYm, cyc,
+                             'atmos', 'gdas.t'+cyc+'z.prepbufr'),
+                'prepbufr_gdas'
+            )
+            for grid in ['hrap', '1p0']:
+                nbytes+=make_synthetic_file(
+                    os.path.join(comroot, 'ccpa', 'v4.2', 'ccpa.'+PDYm, cyc,
+                                 'ccpa.t'+cyc+'z.06h.'+grid+'.conus.gb2'),
+                    'ccpa_6h'
+                )
+        # evs
+        for verif_case in ['grid2grid', 'grid2obs']:
+            nbytes+=make_synthetic_file(
+                os.path.join(comroot, 'evs', 'v1.0', 'stats', 'global_det',
+                             'gfs.'+PDYm, 'evs.stats.gfs.atmos.'+verif_case
+                             +'.v'+PDYm+'.stat'),
+                'evs_stat'
+            )
+        # fit2obs
+        fits_dir = os.path.join(comroot, 'cfs', 'v2.3', 'fit2obs',
+                                'GFS.fits', PDYm[0:4])
+        for cyc in ['00', '06', '12', '18']:
+            fits_tar = os.path.join(fits_dir, 'GFS.fits.'+PDYm+cyc)
+            if os.path.exists(fits_tar):
+                continue
+            fits_tmp_dir = os.path.join(BENCH_DIR, 'tmp_fits')
+            fits_member_list = []
+            for obs_type in ['acar', 'acft', 'raob', 'sfc', 'surf']:
+                for fhr in ['00', '06', '12', '24', '36', '48', '60', '72',
+                            '84', '96', '108', '120']:
+                    fits_member_list.append(
+                        os.path.join('fits', 'f'+fhr+'.'+obs_type+'.'
+                                     +PDYm+cyc)
+                    )
+            for subdir in ['anl', 'fcs']:
+                for obs_type in ['adpsfc', 'adpupa.mand', 'aircar',
+                                 'aircft', 'sfcshp']:
+                    fits_member_list.append(
+                        os.path.join('horiz', subdir, obs_type+'.'+PDYm+cyc)
+                    )
+            for fits_member in fits_member_list:
+                nbytes+=make_synthetic_file(
+                    os.path.join(fits_tmp_dir, fits_member), 'fit2obs_file'
+                )
+            os.makedirs(fits_dir, exist_ok=True)
+            with tarfile.open(fits_tar, 'w') as fits_tarfile:
+                for fits_member in fits_member_list:
+                    fits_tarfile.add(os.path.join(fits_tmp_dir, fits_member),
+                                     arcname=fits_member)
+            shutil.rmtree(fits_tmp_dir)
+    return nbytes
+
+def make_fake_tools():
+    """! Link the stand-in tool under each tool's name in
+         the benchmark bin directory
+    """
+    os.makedirs(bin_dir, exist_ok=True)
+    fake_tool = os.path.join(USH_DIR, 'benchmark_fake_tool.py')
+    for tool in run_settings_dict['fake_tool_list']:
+        tool_link = os.path.join(bin_dir, tool)
+        if os.path.lexists(tool_link):
+            os.remove(tool_link)
+        os.symlink(fake_tool, tool_link)
+
+def get_bench_env():
+    """! Get the environment the scripts are run with
+
+         Returns:
+             bench_env - dictionary of environment variables
+    """
+    bench_env = dict(os.environ)
+    prodmachinefile = os.path.join(BENCH_DIR, 'prodmachinefile')
+    with open(prodmachinefile, 'w') as pmf:
+        pmf.write('primary:cactus\nbackup:dogwood\n')
+    bench_env.update({
+        'PATH': bin_dir+os.pathsep+os.environ.get('PATH', ''),
+        'PYTHONPATH': USH_DIR+os.pathsep+os.environ.get('PYTHONPATH', ''),
+        'HOSTNAME': 'clogin01',
+        'USER': os.environ.get('USER', 'user'),
+        'PRODMACHINEFILE': prodmachinefile,
+        'EGA_CACHE_DIR': os.path.join(BENCH_DIR, 'cache'),
+        'EGA_LOCK_DIR': os.path.join(BENCH_DIR, 'locks'),
+        'BENCH_HPSS_DIR': hpss_dir,
+        'COMROOT': comroot,
+        'DCOMROOT': dcomroot,
+        'OPSROOT': BENCH_DIR,
+        'WGRIB': os.path.join(bin_dir, 'wgrib'),
+        'WGRIB2': os.path.join(bin_dir, 'wgrib2'),
+        'CNVGRIB': os.path.join(bin_dir, 'cnvgrib'),
+        'COPYGB': os.path.join(bin_dir, 'copygb'),
+        'HOMEemc_global_archive': os.path.dirname(USH_DIR),
+    })
+    return bench_env
+
+def get_benchmark_list():
+    """! Get the scripts to time and their arguments
+
+         Returns:
+             benchmark_list - list of tuples of (name,
+                              script, list of arguments)
+    """
+    model_archive = os.path.join(archive_dir, 'model_data')
+    obs_archive = os.path.join(archive_dir, 'obs_data')
+    evs_archive = os.path.join(archive_dir, 'evs_data')
+    fit2obs_archive = os.path.join(archive_dir, 'fit2obs_data')
+    get_model_args = [
+        '--date='+PDY, '--archdir='+model_archive,
+        '--rundir='+os.path.join(run_dir, 'get_model_data'),
+        '--modelspecs='+run_settings_dict['model_specs'],
+        '--workers='+run_settings_dict['NWORKERS']
+    ]
+    benchmark_list = [
+        ('get_model_data', 'get_model_data.py', get_model_args),
+        ('get_model_data_rerun', 'get_model_data.py', get_model_args),
+        ('get_obs_data', 'get_obs_data.py',
+         ['--date='+PDY, '--archdir='+obs_archive,
+          '--rundir='+os.path.join(run_dir, 'get_obs_data'),
+          '--obs=prepbufr_gdas,ccpa_accum6hr']),
+        ('get_evs_data', 'get_evs_data.py',
+         ['--date='+PDY, '--archdir='+evs_archive,
+          '--rundir='+os.path.join(run_dir, 'get_evs_data'),
+          '--model=gfs']),
+        ('get_fit2obs_data', 'get_fit2obs_data.py',
+         ['--date='+PDY, '--archdir='+fit2obs_archive,
+          '--rundir='+os.path.join(run_dir, 'get_fit2obs_data'),
+          '--model=fnl']),
+    ]
+    for model, fhrinc in [('gfs', '6'), ('ecm', '12'), ('ecmg4', '6')]:
+        benchmark_list.append(
+            ('check_model_data_'+model, 'check_model_data.py',
+             ['--date='+PDY, '--cycle=00', '--archdir='+model_archive,
+              '--rundir='+os.path.join(run_dir, 'check_model_data'),
+              '--model='+model, '--fhrmin=0', '--fhrmax=48',
+              '--fhrinc='+fhrinc])
+        )
+    benchmark_list.extend([
+        ('check_obs_data', 'check_obs_data.py',
+         ['--date='+PDY, '--archdir='+obs_archive,
+          '--rundir='+os.path.join(run_dir, 'check_obs_data'),
+          '--obs=prepbufr_gdas']),
+        ('check_fit2obs_data', 'check_fit2obs_data.py',
+         ['--date='+PDY, '--cycle=00', '--archdir='+fit2obs_archive,
+          '--rundir='+os.path.join(run_dir, 'check_fit2obs_data'),
+          '--model=fnl']),
+        ('create_monthly_model_hpss_tar', 'create_monthly_model_hpss_tar.py',
+         ['--yearmon='+PDY[0:6], '--archdir='+model_archive,
+          '--hpssdir=/NCEPDEV/emc-global/5year/bench/model_archive',
+          '--model=gfs', '--cycle=00']),
+        ('create_monthly_obs_hpss_tar', 'create_monthly_obs_hpss_tar.py',
+         ['--yearmon='+PDY[0:6], '--archdir='+obs_archive,
+          '--hpssdir=/NCEPDEV/emc-global/5year/bench/obs_archive',
+          '--obs=prepbufr_gdas']),
+        ('create_yearly_fit2obs_hpss_tar',
+         'create_yearly_fit2obs_hpss_tar.py',
+         ['--year='+PDY[0:4], '--archdir='+fit2obs_archive,
+          '--hpssdir=/NCEPDEV/emc-global/5year/bench/fit2obs_archive',
+          '--model=fnl']),
+        ('remove_data', 'remove_data.py',
+         ['--removedate='+PDYm_list[7],
+          '--archdir='+os.path.join(model_archive, 'gfs')]),
+        ('rsync_archive', 'rsync_archive.py',
+         ['--archdir='+model_archive]),
+    ])
+    return benchmark_list
+
+# Build the synthetic tree, starting from an empty archive
+# and run directory so every benchmark does the same work
+print("Making synthetic tree in "+BENCH_DIR)
+tree_start = time.monotonic()
+tree_nbytes = make_synthetic_tree()
+print("Wrote "+str(round(tree_nbytes/1024./1024., 1))+" MB in "
+      +str(round(time.monotonic()-tree_start, 1))+" seconds")
+for clean_dir in [archive_dir, run_dir, hpss_dir, log_dir]:
+    if os.path.exists(clean_dir):
+        shutil.rmtree(clean_dir)
+    os.makedirs(clean_dir)
+make_fake_tools()
+bench_env = get_bench_env()
+
+# Time each script
+results_dict = {
+    'date': PDY, 'scale': float(run_settings_dict['SCALE']),
+    'workers': int(run_settings_dict['NWORKERS']), 'benchmarks': {}
+}
+for name, script, script_args in get_benchmark_list():
+    log_file = os.path.join(log_dir, name+'.log')
+    print("--- RUNNING "+name+", log in "+log_file)
+    sys.stdout.flush()
+    script_start = time.monotonic()
+    with open(log_file, 'w') as script_log:
+        script_process = subprocess.run(
+            [sys.executable, os.path.join(USH_DIR, script)]+script_args,
+            stdout=script_log, stderr=subprocess.STDOUT, env=bench_env,
+            cwd=run_dir
+        )
+    duration = time.monotonic() - script_start
+    results_dict['benchmarks'][name] = {
+        'duration': round(duration, 3),
+        'returncode': script_process.returncode
+    }
+    print('{:>32s}: {:8.2f} s, return code {}'.format(
+        name, duration, script_process.returncode
+    ))
+failed_list = [name for name, result in results_dict['benchmarks'].items()
+               if result['returncode'] != 0]
+results_file = os.path.join(BENCH_DIR, 'benchmark_results.json')
+with open(results_file, 'w') as results:
+    json.dump(results_dict, results, indent=2)
+print("\nWrote results to "+results_file)
+
+# Compare to baseline
+nregressions = 0
+if run_settings_dict['BASELINE'] != '':
+    with open(run_settings_dict['BASELINE'], 'r') as baseline:
+        baseline_dict = json.load(baseline)
+    print("\nComparing to "+run_settings_dict['BASELINE'])
+    tolerance = float(run_settings_dict['TOLERANCE'])
+    for name, result in results_dict['benchmarks'].items():
+        if name not in baseline_dict['benchmarks']:
+            continue
+        # A script that failed did not do the work, its time
+        # says nothing about speed
+        if name in failed_list:
+            print('{:>32s}: FAILED, NOT COMPARED'.format(name))
+            continue
+        if baseline_dict['benchmarks'][name]['returncode'] != 0:
+            print('{:>32s}: FAILED IN BASELINE, NOT COMPARED'.format(name))
+            continue
+        baseline_duration = baseline_dict['benchmarks'][name]['duration']
+        if baseline_duration > 0:
+            change = (100.*(result['duration']-baseline_duration)
+                      /baseline_duration)
+        else:
+            change = 0.
+        if change > tolerance:
+            nregressions+=1
+            status = 'REGRESSION'
+        else:
+            status = 'OK'
+        print('{:>32s}: {:8.2f} s vs {:8.2f} s, {:+6.1f}% {}'.format(
+            name, result['duration'], baseline_duration, change, status
+        ))
+    if nregressions != 0:
+        print("ERROR: "+str(nregressions)+" benchmarks more than "
+              +run_settings_dict['TOLERANCE']+"% slower than baseline")
+
+if len(failed_list) != 0:
+    print("ERROR: "+str(len(failed_list))+" benchmarks failed: "
+          +' '.join(failed_list)+", see their logs in "+log_dir)
+if len(failed_list) != 0 or nregressions != 0:
+    sys.exit(1)
+
+print("\nEND: "+sys.argv[0]+" at "+str(datetime.datetime.today())+"\n")
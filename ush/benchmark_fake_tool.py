@@ -0,0 +1,189 @@
+#!/usr/bin/env python
+"""
+About:
+        This script stands in for the external tools
+        (htar, hsi, wget, lftp, rsync, ssh, wgrib,
+        wgrib2, cnvgrib, copygb) when benchmarking the
+        archive scripts off WCOSS2. It is linked under
+        each tool's name and acts on the name it was
+        called by, sleeping to mimic the tool's latency
+        and bandwidth and writing output files of
+        plausible size.
+Author(s):
+        Mallory Row (mallory.row@noaa.gov)
+History Log:
+        October 2026 - Inital version
+Command Line Agruments:
+        the arguments of the tool it stands in for
+Environment Variables:
+        BENCH_TOOL_LATENCY: seconds each call takes before
+                            moving any data, default: 0.05
+        BENCH_TOOL_MBPS: MB per second data is moved at,
+                         default: 500
+        BENCH_<TOOL>_LATENCY, BENCH_<TOOL>_MBPS: per tool
+                                                 overrides
+        BENCH_WGET_MB: size of downloaded files in MB,
+                       default: 1
+        BENCH_SUBSET_FRACTION: fraction of the input kept
+                               by grib subsetting, default: 0.3
+        BENCH_HPSS_DIR: directory standing in for HPSS
+Input Files:
+Output Files:
+Condition codes: 0 for success, 1 for failure
+"""
+
+import os
+import sys
+import time
+import glob
+
+tool = os.path.basename(sys.argv[0])
+tool_args = sys.argv[1:]
+
+def get_tool_setting(name, default):
+    """! Get a setting for this tool from the environment
+
+         Args:
+             name    - string of setting name
+             default - float of default value
+
+         Returns:
+             value   - float of setting value
+    """
+    return float(os.environ.get(
+        'BENCH_'+tool.upper()+'_'+name,
+        os.environ.get('BENCH_TOOL_'+name, default)
+    ))
+
+def move_data(nbytes):
+    """! Sleep for the time the tool takes to move data
+
+         Args:
+             nbytes - integer of number of bytes moved
+    """
+    time.sleep(get_tool_setting('LATENCY', 0.05)
+               +nbytes/1024./1024./get_tool_setting('MBPS', 500))
+
+def write_file(file_path, nbytes, mode='wb'):
+    """! Write a file of a given size
+
+         Args:
+             file_path - string of full path to file
+             nbytes    - integer of number of bytes
+             mode      - string of file open mode
+    """
+    block = b'GRIB'+b'\0'*(1024*1024-4)
+    with open(file_path, mode) as out_file:
+        while nbytes > 0:
+            out_file.write(block[:min(nbytes, len(block))])
+            nbytes-=len(block)
+
+def get_file_size(file_path):
+    """! Get the size of a file, 0 if it does not exist
+
+         Args:
+             file_path - string of full path to file
+
+         Returns:
+             nbytes    - integer of file size
+    """
+    if os.path.exists(file_path):
+        return os.stat(file_path).st_size
+    return 0
+
+def get_subset_size(file_path):
+    """! Get the size of a grib subset of a file
+
+         Args:
+             file_path - string of full path to file
+
+         Returns:
+             nbytes    - integer of subset size
+    """
+    return int(get_file_size(file_path)
+               *float(os.environ.get('BENCH_SUBSET_FRACTION', 0.3)))
+
+def print_inventory(file_path, grib_version):
+    """! Print a short inventory of made up records
+
+         Args:
+             file_path    - string of full path to file
+             grib_version - integer of GRIB edition
+    """
+    if grib_version == 1:
+        for nrec, var in enumerate(['T', 'R', 'GH', 'U', 'V', 'MSL', 'TP',
+                                    '2T', '2D', '10U', '10V', 'Q']):
+            print(str(nrec+1)+':'+str(nrec*1000)+':d=24010100:'+var
+                  +':sfc:kpds=0,0,0:anl:NAve=0')
+    else:
+        for nrec, var in enumerate(['PRATE:surface', 'TMP:2 m above ground',
+                                    'UGRD:10 m above ground']):
+            print(str(nrec+1)+':'+str(nrec*1000)+':d=2024010100:'+var
+                  +':anl:')
+
+# wget [-q] [-O out] url
+if tool == 'wget':
+    url = [arg for arg in tool_args if not arg.startswith('-')][-1]
+    if '-O' in tool_args:
+        out_file = tool_args[tool_args.index('-O')+1]
+    else:
+        out_file = url.rpartition('/')[2]
+    nbytes = int(float(os.environ.get('BENCH_WGET_MB', 1))*1024*1024)
+    move_data(nbytes)
+    write_file(out_file, nbytes)
+# wgrib in [-i] [-grib -o out]
+elif tool == 'wgrib':
+    in_file = tool_args[0]
+    if '-o' in tool_args:
+        if '-i' in tool_args:
+            sys.stdin.read()
+        out_file = tool_args[tool_args.index('-o')+1]
+        move_data(get_file_size(in_file))
+        write_file(out_file, get_subset_size(in_file))
+    else:
+        print_inventory(in_file, 1)
+# wgrib2 in [options] [-grib out]
+elif tool == 'wgrib2':
+    in_file = tool_args[0]
+    if '-grib' in tool_args:
+        out_file = tool_args[tool_args.index('-grib')+1]
+        move_data(get_file_size(in_file))
+        write_file(out_file, get_subset_size(in_file))
+    else:
+        print_inventory(in_file, 2)
+# cnvgrib -g12 in out
+elif tool == 'cnvgrib':
+    in_file, out_file = tool_args[-2], tool_args[-1]
+    move_data(get_file_size(in_file))
+    write_file(out_file, get_file_size(in_file))
+# copygb [options] [-a] [-x] in out
+elif tool == 'copygb':
+    in_file, out_file = tool_args[-2], tool_args[-1]
+    move_data(get_file_size(in_file))
+    write_file(out_file, get_subset_size(in_file)//9, mode='ab')
+# htar -cvf tar pattern... | htar -cvf tar -L list | htar -xvf tar
+elif tool == 'htar':
+    hpss_tar = os.path.join(os.environ.get('BENCH_HPSS_DIR', '.'),
+                            tool_args[1].lstrip('/'))
+    if tool_args[0].startswith('-c'):
+        tar_file_list = []
+        if '-L' in tool_args:
+            with open(tool_args[tool_args.index('-L')+1]) as htar_list:
+                tar_file_list.extend(htar_list.read().split())
+        else:
+            for pattern in tool_args[2:]:
+                tar_file_list.extend(glob.glob(pattern))
+        move_data(sum([get_file_size(f) for f in tar_file_list]))
+        os.makedirs(os.path.dirname(hpss_tar), exist_ok=True)
+        with open(hpss_tar, 'w') as hpss_tar_list:
+            for tar_file in tar_file_list:
+                print('a '+tar_file)
+                hpss_tar_list.write(tar_file+'\n')
+    else:
+        move_data(get_file_size(hpss_tar))
+# hsi put local : hpss
+elif tool == 'hsi' and 'put' in tool_args:
+    move_data(get_file_size(tool_args[tool_args.index('put')+1]))
+# hsi, lftp, rsync, ssh: only the time the call takes
+else:
+    move_data(0)
@@ -143,6 +143,10 @@ for run_name in list(run_settings_dict.keys()):
     print(run_name+' = '+str(run_settings_dict[run_name]))
 print("")
 
+# Open archive manifest
+if os.path.exists(run_settings_dict['ARCHIVE_DIR']):
+    ega_util.open_archive_manifest(run_settings_dict['ARCHIVE_DIR'])
+
 # Check fit-to-obs data
 run_dir = os.path.join(run_settings_dict['RUN_DIR'])
 if not os.path.exists(run_dir):
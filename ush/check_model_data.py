@@ -166,6 +166,10 @@ for run_name in list(run_settings_dict.keys()):
     print(run_name+' = '+str(run_settings_dict[run_name]))
 print("")
 
+# Open archive manifest
+if os.path.exists(run_settings_dict['ARCHIVE_DIR']):
+    ega_util.open_archive_manifest(run_settings_dict['ARCHIVE_DIR'])
+
 # Check model data
 run_dir = os.path.join(
     run_settings_dict['RUN_DIR']
@@ -183,31 +187,11 @@ model_archive_dir = os.path.join(
     run_settings_dict['ARCHIVE_DIR'], run_settings_dict['MODEL']
 )
 if os.path.exists(model_archive_dir):
-    if run_settings_dict['MODEL'] not in ['ecmg4']:
-        check_file_list.append('pgbanl.'+run_settings_dict['MODEL']+'.'+CDATE+'.grib2')
-    if run_settings_dict['MODEL'] == 'ecm' \
-            and run_settings_dict['CYCLE'].zfill(2) in ['06', '18']:
-        run_settings_dict['FHR_MAX'] = '00'
-    fhr = int(run_settings_dict['FHR_MIN'])
-    while fhr <= int(run_settings_dict['FHR_MAX']):
-        fhr2 = str(fhr).zfill(2)
-        if run_settings_dict['MODEL'] == 'ecmg4':
-            check_file_list.append('flxf'+fhr2+'.ecm.'+CDATE)
-        else:
-            check_file_list.append(
-                'pgbf'+fhr2+'.'+run_settings_dict['MODEL']+'.'+CDATE+'.grib2')
-            )
-        if run_settings_dict['MODEL'] == 'gfs' and fhr <= 240:
-            check_file_list.append('flxf'+fhr2+'.gfs.'+CDATE+'.grib2')
-        if run_settings_dict['MODEL'] == 'gfs' and fhr >=240:
-            fhr+=12
-        else:
-            fhr+=int(run_settings_dict['FHR_INC'])
-    if run_settings_dict['MODEL'] == 'gfs':
-        check_file_list.append('pgbanl.gdas.'+CDATE+'.grib2')
-        check_file_list.append('pgbf00.gdas.'+CDATE+'.grib2')
-        check_file_list.append('pgbf06.gdas.'+CDATE+'.grib2')
-        check_file_list.append('atcfunix.gfs.'+CDATE)
+    check_file_list = ega_util.get_model_check_file_list(
+        run_settings_dict['MODEL'], CDATE,
+        int(run_settings_dict['FHR_MIN']), int(run_settings_dict['FHR_MAX']),
+        int(run_settings_dict['FHR_INC'])
+    )
     for check_file in check_file_list:
         archive_file = os.path.join(model_archive_dir, check_file)
         if not ega_util.check_file(archive_file):
@@ -135,6 +135,10 @@ for run_name in list(run_settings_dict.keys()):
     print(run_name+' = '+str(run_settings_dict[run_name]))
 print("")
 
+# Open archive manifest
+if os.path.exists(run_settings_dict['ARCHIVE_DIR']):
+    ega_util.open_archive_manifest(run_settings_dict['ARCHIVE_DIR'])
+
 # Check obs data
 if run_settings_dict['OBS'] in ['prepbufr_gdas', 'prepbufr_nam', 'prepbufr_rap']:
     obs_archive_dir = os.path.join(
@@ -226,8 +230,8 @@ if os.path.exists(obs_archive_dir):
                                +'_1.0.nc')
     elif run_settings_dict['OBS'] == 'osi_saf':
         for hem in ['nh', 'sh']:
-            check_file_list.append('ice_conc_+'hem'+_polstere-100_multi_'
-                                   +PDYm1_dt.strftime('%Y%m%d')+'1200.nc')
+            check_file_list.append('ice_conc_'+hem+'_polstere-100_multi_'
+                                   +PDY_dt.strftime('%Y%m%d')+'1200.nc')
     elif run_settings_dict['OBS'] == 'ghrsst_ospo':
         check_file_list.append(PDY_dt.strftime('%Y%m%d')+'_OSPO_L4_GHRSST.nc')
     elif run_settings_dict['OBS'] == 'OBSPRCP':
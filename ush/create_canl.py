@@ -216,7 +216,7 @@ if not ega_util.check_file(archive_file):
         outtmp_file_list = glob.glob('outtmp*')
         if len(outtmp_file_list) != 0:
             ega_util.run_shell_command(
-                ['cat', 'outtmp*', '>'+run_file]
+                ['cat', 'outtmp*', '>'+run_file], shell=True
             )
         if run_settings_dict['SENDARCH'] == 'YES':
             ega_util.copy_file(run_file, archive_file)
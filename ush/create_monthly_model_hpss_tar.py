@@ -149,14 +149,14 @@ model_hpss_dir = os.path.join(
     run_settings_dict['HPSS_DIR'], run_settings_dict['MODEL']
 )
 ega_util.run_shell_command(
-    ['hsi', '"mkdir -p '+model_hpss_dir+'"']
+    ['hsi', 'mkdir -p '+model_hpss_dir]
 )
 if run_settings_dict['MODEL'] in ['ecm', 'ecmg4']:
     ega_util.run_shell_command(
-        ['hsi', '"chmod 750 '+model_hpss_dir+'"']
+        ['hsi', 'chmod 750 '+model_hpss_dir]
     )
     ega_util.run_shell_command(
-        ['hsi', '"chgrp rstprod '+model_hpss_dir+'"']
+        ['hsi', 'chgrp rstprod '+model_hpss_dir]
     )
 model_archive_dir = os.path.join(
     run_settings_dict['ARCHIVE_DIR'], run_settings_dict['MODEL']
@@ -171,25 +171,25 @@ YEARMON_file_list = glob.glob(
 )
 nYEARMON_files = len(YEARMON_file_list)
 if nYEARMON_files != 0:
-    ega_util.run_shell_command(
-        ['htar', '-cvf',
-         os.path.join(model_hpss_dir,
-                      run_settings_dict['MODEL']+run_settings_dict['CYCLE']+'_'
-                      +run_settings_dict['YEARMON']+'.tar'),
-         '*'+run_settings_dict['YEARMON']+'*'+run_settings_dict['CYCLE']+'*']
+    ega_util.create_htar(
+        os.path.join(model_hpss_dir,
+                     run_settings_dict['MODEL']+run_settings_dict['CYCLE']+'_'
+                     +run_settings_dict['YEARMON']+'.tar'),
+        glob.glob('*'+run_settings_dict['YEARMON']+'*'
+                  +run_settings_dict['CYCLE']+'*')
     )
     if run_settings_dict['MODEL'] in ['ecm', 'ecmg4']:
         ega_util.run_shell_command(
-            ['hsi', '"chmod 750 '
+            ['hsi', 'chmod 750 '
              +os.path.join(model_hpss_dir, run_settings_dict['MODEL']
                            +run_settings_dict['CYCLE']+'_'
-                           +run_settings_dict['YEARMON']+'.tar')+'"']
+                           +run_settings_dict['YEARMON']+'.tar')]
         )
         ega_util.run_shell_command(
-            ['hsi', '"chgrp rstprod '
+            ['hsi', 'chgrp rstprod '
              +os.path.join(model_hpss_dir, run_settings_dict['MODEL']
                            +run_settings_dict['CYCLE']+'_'
-                           +run_settings_dict['YEARMON']+'.tar')+'"']
+                           +run_settings_dict['YEARMON']+'.tar')]
         )
 else:
     print("No files for "+run_settings_dict['YEARMON']+" in "
@@ -142,14 +142,14 @@ obs_hpss_dir = os.path.join(
     run_settings_dict['HPSS_DIR'], run_settings_dict['OBS']
 )
 ega_util.run_shell_command(
-    ['hsi', '"mkdir -p '+obs_hpss_dir+'"']
+    ['hsi', 'mkdir -p '+obs_hpss_dir]
 )
 if run_settings_dict['OBS'] in ['prepbufr_gdas', 'prepbufr_nam', 'prepbufr_rap']:
     ega_util.run_shell_command(
-        ['hsi', '"chmod 750 '+obs_hpss_dir+'"']
+        ['hsi', 'chmod 750 '+obs_hpss_dir]
     )
     ega_util.run_shell_command(
-        ['hsi', '"chgrp rstprod '+obs_hpss_dir+'"']
+        ['hsi', 'chgrp rstprod '+obs_hpss_dir]
     )
 if run_settings_dict['OBS'] in ['prepbufr_gdas', 'prepbufr_nam', 'prepbufr_rap']:
     obs_archive_dir = os.path.join(
@@ -233,24 +233,23 @@ else:
         )
     nYEARMON_files = len(YEARMON_file_list)
     if nYEARMON_files != 0:
-        ega_util.run_shell_command(
-            ['htar', '-cvf',
-             os.path.join(obs_hpss_dir,
-                          run_settings_dict['OBS']+'_'
-                          +run_settings_dict['YEARMON']+'.tar'),
-             '*'+run_settings_dict['YEARMON']+'*']
+        ega_util.create_htar(
+            os.path.join(obs_hpss_dir,
+                         run_settings_dict['OBS']+'_'
+                         +run_settings_dict['YEARMON']+'.tar'),
+            glob.glob('*'+run_settings_dict['YEARMON']+'*')
         )
         if run_settings_dict['OBS'] in ['prepbufr_gdas', 'prepbufr_nam',
                                         'prepbufr_rap']:
             ega_util.run_shell_command(
-                ['hsi', '"chmod 750 '
+                ['hsi', 'chmod 750 '
                  +os.path.join(obs_hpss_dir, run_settings_dict['OBS']+'_'
-                               +run_settings_dict['YEARMON']+'.tar')+'"']
+                               +run_settings_dict['YEARMON']+'.tar')]
             )
             ega_util.run_shell_command(
-                ['hsi', '"chgrp rstprod '
+                ['hsi', 'chgrp rstprod '
                  +os.path.join(obs_hpss_dir, run_settings_dict['OBS']+'_'
-                               +run_settings_dict['YEARMON']+'.tar')+'"']
+                               +run_settings_dict['YEARMON']+'.tar')]
             )
     else:
         print("No files for "+run_settings_dict['YEARMON']+" in "
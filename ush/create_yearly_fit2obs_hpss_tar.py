@@ -141,14 +141,14 @@ model_hpss_dir = os.path.join(
     run_settings_dict['HPSS_DIR'], run_settings_dict['MODEL']
 )
 ega_util.run_shell_command(
-    ['hsi', '"mkdir -p '+model_hpss_dir+'"']
+    ['hsi', 'mkdir -p '+model_hpss_dir]
 )
 if run_settings_dict['MODEL'] in ['fnl']:
     ega_util.run_shell_command(
-        ['hsi', '"chmod 750 '+model_hpss_dir+'"']
+        ['hsi', 'chmod 750 '+model_hpss_dir]
     )
     ega_util.run_shell_command(
-        ['hsi', '"chgrp rstprod '+model_hpss_dir+'"']
+        ['hsi', 'chgrp rstprod '+model_hpss_dir]
     )
 model_archive_dir = os.path.join(
     run_settings_dict['ARCHIVE_DIR'], run_settings_dict['MODEL']
@@ -192,7 +192,7 @@ if nYEAR_files != 0:
          os.path.join('horiz', 'anl',
                       '*.'+run_settings_dict['YEAR']+'*'),
          os.path.join('horiz', 'fcs',
-                      '*.'+run_settings_dict['YEAR']+'*')]
+                      '*.'+run_settings_dict['YEAR']+'*')], shell=True
     )
     ega_util.run_shell_command(
         ['hsi', 'put',
@@ -205,14 +205,14 @@ if nYEAR_files != 0:
     )
     if run_settings_dict['MODEL'] in ['fnl']:
         ega_util.run_shell_command(
-            ['hsi', '"chmod 750 '
+            ['hsi', 'chmod 750 '
              +os.path.join(model_hpss_dir, run_settings_dict['MODEL']+'_'
-                           +run_settings_dict['YEAR']+'.tar')+'"']
+                           +run_settings_dict['YEAR']+'.tar')]
         )
         ega_util.run_shell_command(
-            ['hsi', '"chgrp rstprod '
+            ['hsi', 'chgrp rstprod '
              +os.path.join(model_hpss_dir, run_settings_dict['MODEL']+'_'
-                           +run_settings_dict['YEAR']+'.tar')+'"']
+                           +run_settings_dict['YEAR']+'.tar')]
         )
     os.remove(run_settings_dict['MODEL']+'_'+run_settings_dict['YEAR']+'.tar')
 else:
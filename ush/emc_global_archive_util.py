@@ -18,96 +18,2618 @@ import datetime
 import subprocess
 import re
 import shutil
+import tempfile
+import traceback
+import multiprocessing
+import concurrent.futures
+import collections
+import time
+import signal
+import fcntl
+import sqlite3
+import glob
+import grp
+import stat
+import functools
+import json
+import collections.abc
+import mmap
+import hashlib
+import io
+import ftplib
+import threading
+import http.client
+import urllib.parse
+import urllib.request
 
-def run_shell_command(command):
+# Settings for external tools run through run_command
+#     timeout        - seconds before the command is killed
+#     retries        - number of times to retry a failed command
+#     max_concurrent - number of commands for the tool that can
+#                      run at once across all processes on the node
+tool_settings_dict = {
+    'htar': {'timeout': 7200, 'retries': 2, 'max_concurrent': 2},
+    'hsi': {'timeout': 1800, 'retries': 2, 'max_concurrent': 2},
+    'wget': {'timeout': 1800, 'retries': 3, 'max_concurrent': 4},
+    'lftp': {'timeout': 1800, 'retries': 3, 'max_concurrent': 2},
+    'rsync': {'timeout': 14400, 'retries': 1, 'max_concurrent': 1},
+    'ssh': {'timeout': 600, 'retries': 2, 'max_concurrent': 2},
+}
+retry_backoff_seconds = 30
+retry_backoff_max_seconds = 600
+output_tail_lines = 20
+
+# Settings for files downloaded in process by download_files
+#     timeout    - seconds to wait on the server before the
+#                  download is tried again
+#     retries    - number of times to retry a failed download
+#     nthreads   - number of files a process downloads at once
+http_settings_dict = {'timeout': 300, 'retries': 3, 'nthreads': 4}
+http_chunk_bytes = 1024*1024
+# Days a download state, and the partial file of a download
+# that never finished, are kept without being used
+download_state_max_age_days = 7
+
+# Intermediate files are only made in a scratch area when it
+# has this many times the bytes expected to be written free,
+# leaving room for the other workers on the node
+scratch_bytes_factor = 4
+
+# Limits on the files converted together by one cnvgrib
+# run in convert_grib_files
+convert_batch_max_files = 16
+convert_batch_max_bytes = 2*1024*1024*1024
+
+# Products that are the same bytes as another product,
+# file name prefix of the alias to file name prefix of
+# the file it is the same as
+product_alias_dict = {
+    'pgbanl.ecm.': 'pgbf00.ecm.',
+}
+
+CommandResult = collections.namedtuple(
+    'CommandResult',
+    ['args', 'returncode', 'duration', 'attempts', 'timed_out',
+     'stdout_tail', 'stderr_tail']
+)
+
+# Operation timing log: when started, the wrapped utilities
+# below write one JSON line per call to a file in the run
+# directory, worker processes append to the same file
+_timing_log_path = None
+_timing_log_fd = None
+
+def start_timing_log(run_dir, job_name):
+    """! Start writing operation timings for this job
+
+         Args:
+             run_dir  - string of full path to run directory
+             job_name - string of job name used in the
+                        log file name
+
+         Returns:
+             log_path - string of full path to timing log
+    """
+    global _timing_log_path, _timing_log_fd
+    _timing_log_path = os.path.join(
+        run_dir,
+        'timing_'+job_name+'_'
+        +datetime.datetime.now().strftime('%Y%m%d%H%M%S')+'_'
+        +str(os.getpid())+'.jsonl'
+    )
+    _timing_log_fd = os.open(_timing_log_path,
+                             os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o664)
+    print("Writing operation timings to "+_timing_log_path)
+    return _timing_log_path
+
+def _get_timing_path_info(path):
+    """! Get the product, date, cycle, and forecast hour
+         for the file an operation worked on
+
+         Args:
+             path      - string of full path to file
+
+         Returns:
+             file_dict - dictionary with product, date, cycle,
+                         and fhr (see parse_archive_file_name)
+    """
+    archive_dir = _get_archive_manifest_root(path)
+    if archive_dir is not None:
+        return parse_archive_file_name(os.path.relpath(path, archive_dir))
+    return parse_archive_file_name(os.path.basename(path))
+
+def timed_operation(operation, path_arg=None, size_arg=None):
+    """! Wrap a utility so each call is written to the
+         timing log, if one has been started
+
+         Args:
+             operation - string of operation name
+             path_arg  - integer of the position of the
+                         argument holding the file worked on
+             size_arg  - integer of the position of the
+                         argument holding the file whose
+                         size is the bytes moved,
+                         default: no bytes
+
+         Returns:
+             decorator - function wrapping the utility
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if _timing_log_fd is None:
+                return func(*args, **kwargs)
+            start = time.monotonic()
+            status = 'FAILED'
+            result = None
+            try:
+                result = func(*args, **kwargs)
+                status = 'OK'
+                return result
+            finally:
+                duration = time.monotonic() - start
+                record = {'pid': os.getpid(), 'time': time.time(),
+                          'operation': operation, 'status': status,
+                          'duration': round(duration, 6)}
+                if operation == 'run_shell_command':
+                    record['tool'] = get_command_tool(args[0])
+                    if isinstance(result, CommandResult):
+                        record['returncode'] = result.returncode
+                if isinstance(result, bool):
+                    record['result'] = result
+                if path_arg is not None and len(args) > path_arg:
+                    record['path'] = args[path_arg]
+                    record.update(_get_timing_path_info(args[path_arg]))
+                if size_arg is not None and len(args) > size_arg:
+                    try:
+                        record['bytes'] = os.stat(args[size_arg]).st_size
+                    except OSError:
+                        record['bytes'] = 0
+                os.write(_timing_log_fd,
+                         (json.dumps(record)+'\n').encode('utf-8'))
+        return wrapper
+    return decorator
+
+def print_timing_summary(top_n=10):
+    """! Print the slowest operations and the time and
+         throughput of each operation type in the timing log
+
+         Args:
+             top_n - integer of number of slowest operations
+                     to print
+    """
+    if _timing_log_path is None or not os.path.exists(_timing_log_path):
+        return
+    record_list = []
+    with open(_timing_log_path, 'r') as timing_log:
+        for line in timing_log:
+            try:
+                record_list.append(json.loads(line))
+            except ValueError:
+                continue
+    print("\n--- TIMING SUMMARY from "+_timing_log_path)
+    print("Top "+str(top_n)+" slowest operations:")
+    for record in sorted(record_list, key=lambda r: r['duration'],
+                         reverse=True)[:top_n]:
+        print('{:10.2f}s {} {} {}'.format(
+            record['duration'], record['operation'], record['status'],
+            record.get('path', record.get('tool', ''))
+        ))
+    print("Per operation:")
+    operation_dict = collections.OrderedDict()
+    for record in record_list:
+        if record['operation'] not in operation_dict:
+            operation_dict[record['operation']] = {
+                'calls': 0, 'failed': 0, 'not_found': 0, 'duration': 0.0,
+                'bytes': 0
+            }
+        operation_stats = operation_dict[record['operation']]
+        operation_stats['calls']+=1
+        operation_stats['duration']+=record['duration']
+        operation_stats['bytes']+=record.get('bytes', 0)
+        if record['status'] != 'OK' or record.get('returncode', 0) != 0:
+            operation_stats['failed']+=1
+        if record.get('result') is False:
+            operation_stats['not_found']+=1
+    for operation, operation_stats in operation_dict.items():
+        operation_mb = operation_stats['bytes']/1024./1024.
+        if operation_stats['duration'] > 0:
+            operation_mbps = operation_mb/operation_stats['duration']
+        else:
+            operation_mbps = 0.
+        print('{:>24s}: {:6d} calls, {:5d} failed, {:5d} missing, '
+              '{:10.2f} s, {:10.1f} MB, {:8.1f} MB/s'.format(
+                  operation, operation_stats['calls'],
+                  operation_stats['failed'], operation_stats['not_found'],
+                  operation_stats['duration'], operation_mb, operation_mbps
+              ))
+
+# Kept alive HTTP(S) connections not in use, by scheme and
+# host, for the process that made them
+_http_connection_pool = {}
+_http_connection_pool_pid = None
+_http_connection_pool_lock = threading.Lock()
+_download_states_checked = False
+
+def _get_http_connection(scheme, netloc):
+    """! Get a kept alive connection to a host from the pool,
+         or make a new one, going through the proxy set in
+         the environment if there is one
+
+         Args:
+             scheme     - string of URL scheme, http or https
+             netloc     - string of URL host and port
+
+         Returns:
+             connection - http.client.HTTPConnection
+    """
+    global _http_connection_pool, _http_connection_pool_pid
+    with _http_connection_pool_lock:
+        # Connections made before a fork belong to the parent
+        if _http_connection_pool_pid != os.getpid():
+            _http_connection_pool = {}
+            _http_connection_pool_pid = os.getpid()
+        idle_connection_list = _http_connection_pool.get((scheme, netloc), [])
+        if len(idle_connection_list) != 0:
+            return idle_connection_list.pop()
+    if scheme == 'https':
+        connection_class = http.client.HTTPSConnection
+    else:
+        connection_class = http.client.HTTPConnection
+    proxy = urllib.request.getproxies().get(scheme)
+    if proxy is not None \
+            and not urllib.request.proxy_bypass(netloc.split(':')[0]):
+        proxy_netloc = urllib.parse.urlsplit(proxy).netloc
+        connection = connection_class(proxy_netloc,
+                                      timeout=http_settings_dict['timeout'])
+        connection.set_tunnel(netloc)
+    else:
+        connection = connection_class(netloc,
+                                      timeout=http_settings_dict['timeout'])
+    return connection
+
+def _put_http_connection(scheme, netloc, connection):
+    """! Put a connection back in the pool to be used again
+
+         Args:
+             scheme     - string of URL scheme, http or https
+             netloc     - string of URL host and port
+             connection - http.client.HTTPConnection
+    """
+    with _http_connection_pool_lock:
+        if _http_connection_pool_pid == os.getpid():
+            _http_connection_pool.setdefault((scheme, netloc), []).append(
+                connection
+            )
+            return
+    connection.close()
+
+def _http_request(url_parts, headers=None):
+    """! Send a GET request on a pooled connection, on a new
+         connection when the server has closed the kept alive
+         one
+
+         Args:
+             url_parts  - urllib.parse.SplitResult of URL
+             headers    - dictionary of request headers,
+                          default: None
+
+         Returns:
+             connection - http.client.HTTPConnection
+             response   - http.client.HTTPResponse
+    """
+    url_path = url_parts.path
+    if url_parts.query:
+        url_path+='?'+url_parts.query
+    while True:
+        connection = _get_http_connection(url_parts.scheme,
+                                          url_parts.netloc)
+        reused = connection.sock is not None
+        try:
+            connection.request('GET', url_path, headers=headers or {})
+            return connection, connection.getresponse()
+        except (http.client.RemoteDisconnected, ConnectionResetError,
+                BrokenPipeError):
+            connection.close()
+            if not reused:
+                raise
+
+def _release_http_connection(url_parts, connection, response):
+    """! Put a connection whose response has been read back
+         in the pool, or close it if the server is closing it
+
+         Args:
+             url_parts  - urllib.parse.SplitResult of URL
+             connection - http.client.HTTPConnection
+             response   - http.client.HTTPResponse
+    """
+    if response.will_close:
+        connection.close()
+    else:
+        # The connection can only be used again once the
+        # response is read to its end
+        response.read()
+        _put_http_connection(url_parts.scheme, url_parts.netloc,
+                             connection)
+
+def _read_http_bytes(response, nbytes, out_file=None):
+    """! Read bytes from a response, writing them to a file
+
+         Args:
+             response - http.client.HTTPResponse
+             nbytes   - integer of number of bytes to read,
+                        None to read to the end
+             out_file - file object to write to,
+                        default: None (discard them)
+
+         Returns:
+             nread    - integer of number of bytes read
+    """
+    nread = 0
+    while nbytes is None or nread < nbytes:
+        if nbytes is None:
+            chunk = response.read(http_chunk_bytes)
+        else:
+            chunk = response.read(min(http_chunk_bytes, nbytes-nread))
+        if not chunk:
+            break
+        if out_file is not None:
+            out_file.write(chunk)
+        nread+=len(chunk)
+    if nbytes is not None and nread != nbytes:
+        raise http.client.IncompleteRead(b'', nbytes-nread)
+    return nread
+
+def _parse_content_range(content_range):
+    """! Parse a Content-Range header value
+
+         Args:
+             content_range - string of header value,
+                             bytes first-last/size
+
+         Returns:
+             part_range    - tuple of first byte, last byte,
+                             and file size (None if not known)
+    """
+    byte_range, _, file_size = (
+        content_range.strip().replace('bytes', '').strip().partition('/')
+    )
+    start, _, end = byte_range.partition('-')
+    if file_size.strip() in ['', '*']:
+        return (int(start), int(end), None)
+    return (int(start), int(end), int(file_size))
+
+def _get_download_state_file(url):
+    """! Get the file the download state of a URL is kept in
+
+         Args:
+             url        - string of URL of file
+
+         Returns:
+             state_file - string of full path to state file
+    """
+    return os.path.join(machine_cache_dir, 'downloads',
+                        hashlib.md5(url.encode('utf-8')).hexdigest()+'.json')
+
+def _read_download_state(url, dest):
+    """! Read the download state of a URL for a destination
+
+         Args:
+             url        - string of URL of file
+             dest       - string of full path to
+                          destination file
+
+         Returns:
+             state_dict - dictionary of the URL's ETag,
+                          Last-Modified, size, and if the
+                          download is complete, empty if
+                          there is none for dest
+    """
+    try:
+        with open(_get_download_state_file(url), 'r') as state_file:
+            state_dict = json.load(state_file)
+    except (OSError, ValueError):
+        return {}
+    if state_dict.get('url') != url or state_dict.get('dest') != dest:
+        return {}
+    return state_dict
+
+def _write_download_state(url, state_dict):
+    """! Write the download state of a URL
+
+         Args:
+             url        - string of URL of file
+             state_dict - dictionary of download state
+    """
+    state_file = _get_download_state_file(url)
+    try:
+        os.makedirs(os.path.dirname(state_file), exist_ok=True)
+        tmp_state_file = (state_file+'.tmp.'+str(os.getpid())
+                          +'.'+str(threading.get_ident()))
+        with open(tmp_state_file, 'w') as tmp_state:
+            json.dump(state_dict, tmp_state)
+        os.replace(tmp_state_file, state_file)
+    except OSError as err:
+        print("WARNING: could not save download state of "+url+": "
+              +str(err))
+
+def remove_stale_downloads():
+    """! Remove the download states not used for
+         download_state_max_age_days and the partial files
+         their downloads left behind, once per process
+    """
+    global _download_states_checked
+    if _download_states_checked:
+        return
+    _download_states_checked = True
+    state_dir = os.path.join(machine_cache_dir, 'downloads')
+    if not os.path.isdir(state_dir):
+        return
+    oldest_time = time.time()-download_state_max_age_days*86400
+    for idx_file in glob.glob(os.path.join(state_dir, '*.idx')):
+        try:
+            if os.stat(idx_file).st_mtime < oldest_time:
+                os.remove(idx_file)
+        except OSError:
+            continue
+    for state_file in glob.glob(os.path.join(state_dir, '*.json')):
+        try:
+            if os.stat(state_file).st_mtime >= oldest_time:
+                continue
+            with open(state_file, 'r') as state:
+                state_dict = json.load(state)
+            part_dest = _get_part_dest(state_dict.get('dest', ''))
+            if os.path.exists(part_dest):
+                print("--- REMOVING STALE PARTIAL DOWNLOAD "+part_dest)
+                os.remove(part_dest)
+            os.remove(state_file)
+        except (OSError, ValueError):
+            continue
+
+def _get_part_dest(dest):
+    """! Get the name a download is written to until it
+         is complete
+
+         Args:
+             dest      - string of full path to
+                         destination file
+
+         Returns:
+             part_dest - string of full path to
+                         partial file
+    """
+    return os.path.join(os.path.dirname(dest),
+                        '.'+os.path.basename(dest)+'.part')
+
+@timed_operation('download_file', path_arg=1, size_arg=1)
+def download_file(url, dest):
+    """! Download a file over HTTP(S) on a kept alive
+         connection. The file is written to a partial file
+         next to dest and renamed into place once its size
+         matches what the server sent. The URL's ETag and
+         Last-Modified are kept so a download cut off is
+         resumed from where it stopped, and a file already
+         downloaded is not downloaded again unless it has
+         changed.
+
+         Args:
+             url        - string of URL of file
+             dest       - string of full path to
+                          destination file
+
+         Returns:
+             downloaded - boolean, True if the file was
+                          downloaded or is unchanged
+    """
+    remove_stale_downloads()
+    dest = os.path.abspath(dest)
+    # Only one thread or process downloads to dest at a time
+    lock_fd = acquire_file_lock(dest)
+    try:
+        return _download_file(url, dest)
+    finally:
+        release_file_lock(lock_fd)
+
+def _download_file(url, dest):
+    """! Download a file for download_file, with dest locked
+
+         Args:
+             url        - string of URL of file
+             dest       - string of full path to
+                          destination file
+
+         Returns:
+             downloaded - boolean, True if the file was
+                          downloaded or is unchanged
+    """
+    url_parts = urllib.parse.urlsplit(url)
+    part_dest = _get_part_dest(dest)
+    attempt = 0
+    while True:
+        attempt+=1
+        state_dict = _read_download_state(url, dest)
+        validator = state_dict.get('etag') or state_dict.get('last_modified')
+        headers = {}
+        part_size = 0
+        if state_dict.get('complete') and os.path.exists(dest) \
+                and os.stat(dest).st_size == state_dict.get('size'):
+            if state_dict.get('etag'):
+                headers['If-None-Match'] = state_dict['etag']
+            if state_dict.get('last_modified'):
+                headers['If-Modified-Since'] = state_dict['last_modified']
+        elif os.path.exists(part_dest):
+            if validator is not None and not state_dict.get('complete'):
+                part_size = os.stat(part_dest).st_size
+            if part_size > 0:
+                headers['Range'] = 'bytes='+str(part_size)+'-'
+                headers['If-Range'] = validator
+            else:
+                os.remove(part_dest)
+        if part_size > 0:
+            print("--- DOWNLOADING "+url+" FROM BYTE "+str(part_size))
+        else:
+            print("--- DOWNLOADING "+url)
+        connection = None
+        retry = True
+        try:
+            connection, response = _http_request(url_parts, headers)
+            if response.status == 304:
+                _release_http_connection(url_parts, connection, response)
+                print("UNCHANGED "+url)
+                return True
+            if response.status == 416 and part_size > 0:
+                # The partial file does not fit what the server
+                # has now, start over
+                _release_http_connection(url_parts, connection, response)
+                os.remove(part_dest)
+                _write_download_state(url, {'url': url, 'dest': dest})
+                attempt-=1
+                continue
+            if response.status not in [200, 206]:
+                _release_http_connection(url_parts, connection, response)
+                if response.status == 404:
+                    print("DOES NOT EXIST "+url)
+                    return False
+                print("ERROR: "+url+" gave HTTP status "
+                      +str(response.status))
+                retry = response.status >= 500
+            else:
+                if response.status == 206:
+                    start, end, size = _parse_content_range(
+                        response.getheader('Content-Range', '')
+                    )
+                    if start != part_size:
+                        raise http.client.HTTPException(
+                            'resumed at byte '+str(start)+', asked for '
+                            +str(part_size)
+                        )
+                    part_mode = 'ab'
+                else:
+                    part_size = 0
+                    part_mode = 'wb'
+                    size = response.getheader('Content-Length')
+                    if size is not None:
+                        size = int(size)
+                state_dict = {'url': url, 'dest': dest,
+                              'etag': response.getheader('ETag'),
+                              'last_modified': response.getheader(
+                                  'Last-Modified'
+                              ),
+                              'size': size, 'complete': False}
+                _write_download_state(url, state_dict)
+                with open(part_dest, part_mode) as part_dest_file:
+                    nbytes = _read_http_bytes(response, None, part_dest_file)
+                if size is not None and part_size+nbytes != size:
+                    print("ERROR: "+url+" gave "+str(part_size+nbytes)
+                          +" bytes, expected "+str(size))
+                    connection.close()
+                    if part_size+nbytes > size:
+                        os.remove(part_dest)
+                else:
+                    os.replace(part_dest, dest)
+                    state_dict['size'] = part_size+nbytes
+                    state_dict['complete'] = True
+                    _write_download_state(url, state_dict)
+                    _release_http_connection(url_parts, connection, response)
+                    return True
+        except (OSError, http.client.HTTPException) as e:
+            # What was written to the partial file is kept to
+            # resume from
+            print("ERROR: "+url+" failed: "+str(e))
+            if connection is not None:
+                connection.close()
+        if not retry or attempt > http_settings_dict['retries']:
+            return False
+        backoff = min(retry_backoff_seconds*2**(attempt-1),
+                      retry_backoff_max_seconds)
+        print("--- RETRYING "+url+" in "+str(backoff)+" seconds")
+        time.sleep(backoff)
+
+def get_grib2_idx_ranges(idx_lines, field_list):
+    """! Get the byte ranges of the GRIB2 messages holding
+         given fields from a wgrib2 inventory, merging
+         ranges of messages next to each other
+
+         Args:
+             idx_lines  - list of strings of inventory lines
+             field_list - list of wgrib2 inventory names
+                          (e.g. 'TMP:500 mb')
+
+         Returns:
+             range_list - list of tuples of first and last
+                          byte (None for the end of the
+                          file), None if the inventory can
+                          not be used
+             nmessages  - integer of number of messages in
+                          the ranges
+    """
+    match = '|'.join(['(:'+name+':)' for name in field_list])
+    # Fields sharing a message share its offset
+    offset_list = []
+    keep_offset_list = []
+    for line in idx_lines:
+        line_split = line.strip().split(':')
+        if len(line_split) < 3:
+            continue
+        if not line_split[1].isdigit():
+            return None, 0
+        offset = int(line_split[1])
+        if len(offset_list) == 0 or offset_list[-1] != offset:
+            if len(offset_list) != 0 and offset < offset_list[-1]:
+                return None, 0
+            offset_list.append(offset)
+        if re.search(match, line) and offset not in keep_offset_list[-1:]:
+            keep_offset_list.append(offset)
+    range_list = []
+    for offset in keep_offset_list:
+        noffset = offset_list.index(offset)
+        if noffset+1 < len(offset_list):
+            end = offset_list[noffset+1]-1
+        else:
+            end = None
+        if len(range_list) != 0 and range_list[-1][1] == offset-1:
+            range_list[-1] = (range_list[-1][0], end)
+        else:
+            range_list.append((offset, end))
+    return range_list, len(keep_offset_list)
+
+def count_grib2_messages(file_path, offset=0):
+    """! Count the GRIB2 messages in a file, checking that
+         the file is only whole GRIB2 messages
+
+         Args:
+             file_path - string of full path to file
+             offset    - integer of byte to start counting
+                         from, default: 0
+
+         Returns:
+             nmessages - integer of number of messages,
+                         None if the file is not only whole
+                         GRIB2 messages
+    """
+    file_size = os.stat(file_path).st_size
+    nmessages = 0
+    position = offset
+    with open(file_path, 'rb') as grib_file:
+        while position < file_size:
+            grib_file.seek(position)
+            indicator = grib_file.read(16)
+            if len(indicator) != 16 or indicator[0:4] != b'GRIB' \
+                    or indicator[7] != 2:
+                return None
+            message_length = int.from_bytes(indicator[8:16], 'big')
+            if message_length < 20 or position+message_length > file_size:
+                return None
+            grib_file.seek(position+message_length-4)
+            if grib_file.read(4) != b'7777':
+                return None
+            position+=message_length
+            nmessages+=1
+    return nmessages
+
+def _write_url(url_parts, out_file):
+    """! Write a whole file from a URL to a file object at
+         its current position, checking it is the size the
+         server sent
+
+         Args:
+             url_parts - urllib.parse.SplitResult of URL
+             out_file  - file object to write to
+
+         Returns:
+             nbytes    - integer of number of bytes written
+    """
+    url = urllib.parse.urlunsplit(url_parts)
+    connection, response = _http_request(url_parts)
+    try:
+        if response.status != 200:
+            _release_http_connection(url_parts, connection, response)
+            if response.status == 404:
+                raise FileNotFoundError('DOES NOT EXIST '+url)
+            raise http.client.HTTPException('HTTP status '
+                                            +str(response.status))
+        content_length = response.getheader('Content-Length')
+        nbytes = _read_http_bytes(response, None, out_file)
+        if content_length is not None and nbytes != int(content_length):
+            raise http.client.HTTPException(
+                'gave '+str(nbytes)+' bytes, expected '+content_length
+            )
+        _release_http_connection(url_parts, connection, response)
+    except (OSError, http.client.HTTPException):
+        connection.close()
+        raise
+    return nbytes
+
+def _write_url_byte_ranges(url_parts, range_list, out_file):
+    """! Write byte ranges of a file from a URL one after
+         another to a file object from its current position,
+         with one single range request for each range on the
+         pooled connection, as object stores such as S3 do
+         not answer requests for several ranges at once
+
+         Args:
+             url_parts  - urllib.parse.SplitResult of URL
+             range_list - list of tuples of first and last
+                          byte (None for the end of the
+                          file) of the ranges
+             out_file   - file object to write to
+
+         Returns:
+             ranged     - boolean, False if the server ignored
+                          the range and sent the whole file, the
+                          ranges after it are then not written
+    """
+    for start, end in range_list:
+        connection, response = _http_request(
+            url_parts,
+            {'Range': 'bytes='+str(start)+'-'+('' if end is None
+                                                else str(end))}
+        )
+        try:
+            if response.status == 200:
+                # Stop the whole file instead of reading it
+                connection.close()
+                return False
+            if response.status != 206:
+                _release_http_connection(url_parts, connection, response)
+                raise http.client.HTTPException(
+                    'HTTP status '+str(response.status)
+                )
+            part_start, part_end, file_size = _parse_content_range(
+                response.getheader('Content-Range', '')
+            )
+            if part_start != start or (end is not None and part_end != end):
+                raise http.client.HTTPException(
+                    'gave bytes '+str(part_start)+'-'+str(part_end)
+                    +', asked for '+str(start)+'-'+str(end)
+                )
+            _read_http_bytes(response, part_end-part_start+1, out_file)
+            _release_http_connection(url_parts, connection, response)
+        except (OSError, http.client.HTTPException):
+            connection.close()
+            raise
+    return True
+
+def _extract_byte_ranges(src, dest, range_list):
+    """! Write byte ranges of a local file to a file
+
+         Args:
+             src        - string of full path to source file
+             dest       - string of full path to destination
+                          file
+             range_list - list of tuples of first and last
+                          byte (None for the end of the
+                          file) of the ranges
+    """
+    src_size = os.stat(src).st_size
+    _write_grib_records(
+        src, dest,
+        [{'offset': start,
+          'length': (src_size if end is None else end+1)-start}
+         for start, end in range_list]
+    )
+
+def _get_grib2_idx_dest(url):
+    """! Get the file the wgrib2 inventory of a URL is kept
+         in, with the download states and out of the archive,
+         so a rerun only asks if it changed
+
+         Args:
+             url      - string of URL of GRIB2 file
+
+         Returns:
+             idx_dest - string of full path to inventory file
+    """
+    return os.path.join(machine_cache_dir, 'downloads',
+                        hashlib.md5(url.encode('utf-8')).hexdigest()+'.idx')
+
+def _get_grib2_field_ranges(url, field_list):
+    """! Get the byte ranges of the GRIB2 messages of given
+         fields from the wgrib2 inventory (.idx) next to a file
+
+         Args:
+             url        - string of URL of GRIB2 file
+             field_list - list of wgrib2 inventory names
+                          (e.g. 'TMP:500 mb')
+
+         Returns:
+             range_list - list of tuples of first and last
+                          byte (None for the end of the
+                          file), None if there is no usable
+                          inventory or none of the fields
+             nmessages  - integer of number of messages in
+                          the ranges
+    """
+    idx_dest = _get_grib2_idx_dest(url)
+    os.makedirs(os.path.dirname(idx_dest), exist_ok=True)
+    range_list = None
+    nmessages = 0
+    if download_file(url+'.idx', idx_dest):
+        with open(idx_dest, 'r') as idx:
+            range_list, nmessages = get_grib2_idx_ranges(idx.readlines(),
+                                                         field_list)
+    if range_list is None or nmessages == 0:
+        return None, 0
+    return range_list, nmessages
+
+@timed_operation('download_grib2_fields', path_arg=1, size_arg=1)
+def download_grib2_fields(url, dest, field_list):
+    """! Download only the GRIB2 messages of given fields
+         from a file over HTTP(S), finding their byte ranges
+         in the wgrib2 inventory (.idx) next to the file and
+         getting each range with its own request on a
+         pooled connection; downloads the whole file when it
+         has no usable inventory, and takes the fields out of
+         it locally when the server ignores ranges
+
+         Args:
+             url        - string of URL of GRIB2 file
+             dest       - string of full path to
+                          destination file
+             field_list - list of wgrib2 inventory names
+                          (e.g. 'TMP:500 mb')
+
+         Returns:
+             downloaded - boolean, True if the file was
+                          downloaded
+    """
+    url_parts = urllib.parse.urlsplit(url)
+    tmp_dest = os.path.join(
+        os.path.dirname(os.path.abspath(dest)),
+        '.'+os.path.basename(dest)+'.tmp.'+str(os.getpid())
+        +'.'+str(threading.get_ident())
+    )
+    idx_dest = _get_grib2_idx_dest(url)
+    range_list, nmessages = _get_grib2_field_ranges(url, field_list)
+    if range_list is None:
+        print("--- NO USABLE INVENTORY OR FIELDS FOR "+url+", "
+              +"DOWNLOADING ALL OF IT")
+        return download_file(url, dest)
+    if os.path.exists(dest) \
+            and os.stat(dest).st_mtime >= os.stat(idx_dest).st_mtime \
+            and count_grib2_messages(dest) == nmessages:
+        print("UNCHANGED "+url)
+        return True
+    attempt = 0
+    while True:
+        attempt+=1
+        print("--- DOWNLOADING "+str(nmessages)+" messages in "
+              +str(len(range_list))+" byte ranges of "+url)
+        try:
+            with open(tmp_dest, 'wb') as tmp_dest_file:
+                ranged = _write_url_byte_ranges(url_parts, range_list,
+                                                tmp_dest_file)
+            if not ranged:
+                os.remove(tmp_dest)
+                return _download_grib2_fields_locally(url, dest, range_list,
+                                                      nmessages)
+            if count_grib2_messages(tmp_dest) != nmessages:
+                print("ERROR: "+url+" byte ranges are not "+str(nmessages)
+                      +" whole GRIB2 messages")
+                os.remove(tmp_dest)
+            else:
+                os.replace(tmp_dest, dest)
+                return True
+        except (OSError, http.client.HTTPException) as e:
+            print("ERROR: "+url+" failed: "+str(e))
+            if os.path.exists(tmp_dest):
+                os.remove(tmp_dest)
+        if attempt > http_settings_dict['retries']:
+            return False
+        backoff = min(retry_backoff_seconds*2**(attempt-1),
+                      retry_backoff_max_seconds)
+        print("--- RETRYING "+url+" in "+str(backoff)+" seconds")
+        time.sleep(backoff)
+
+def _download_grib2_fields_locally(url, dest, range_list, nmessages):
+    """! Download all of a GRIB2 file and take the byte ranges
+         of given fields out of it locally, for servers that
+         ignore range requests
+
+         Args:
+             url        - string of URL of GRIB2 file
+             dest       - string of full path to
+                          destination file
+             range_list - list of tuples of first and last
+                          byte (None for the end of the
+                          file) of the fields' messages
+             nmessages  - integer of number of messages in
+                          the ranges
+
+         Returns:
+             downloaded - boolean, True if the file was
+                          downloaded
+    """
+    print("--- "+url+" IGNORES BYTE RANGES, DOWNLOADING ALL OF IT "
+          +"AND TAKING THE FIELDS OUT LOCALLY")
+    full_dest = os.path.join(os.path.dirname(os.path.abspath(dest)),
+                             '.'+os.path.basename(dest)+'.full')
+    if not download_file(url, full_dest):
+        return False
+    try:
+        _extract_byte_ranges(full_dest, dest, range_list)
+    finally:
+        os.remove(full_dest)
+    if count_grib2_messages(dest) != nmessages:
+        print("ERROR: "+url+" byte ranges are not "+str(nmessages)
+              +" whole GRIB2 messages")
+        os.remove(dest)
+        return False
+    return True
+
+def _write_url_resumed(url_parts, state_url, state_dict,
+                       component_state_dict, part_file, resume_bytes):
+    """! Write a whole file from a URL to the end of a
+         partial file, resuming from resume_bytes when the
+         server still has the file the state was kept for
+
+         Args:
+             url_parts            - urllib.parse.SplitResult
+                                    of URL
+             state_url            - string the download state
+                                    is kept under
+             state_dict           - dictionary of download
+                                    state holding
+                                    component_state_dict,
+                                    written once the server
+                                    answers
+             component_state_dict - dictionary of the file's
+                                    download state (ETag,
+                                    Last-Modified, size),
+                                    updated as it is written
+             part_file            - file object positioned at
+                                    where the file's bytes
+                                    start plus resume_bytes
+             resume_bytes         - integer of bytes of the
+                                    file already written
+
+         Returns:
+             nbytes               - integer of bytes of the
+                                    file written, in all
+    """
+    url = urllib.parse.urlunsplit(url_parts)
+    headers = {}
+    validator = (component_state_dict.get('etag')
+                 or component_state_dict.get('last_modified'))
+    if resume_bytes > 0 and validator is not None:
+        headers['Range'] = 'bytes='+str(resume_bytes)+'-'
+        headers['If-Range'] = validator
+        print("--- DOWNLOADING "+url+" FROM BYTE "+str(resume_bytes))
+    else:
+        print("--- DOWNLOADING "+url)
+    connection, response = _http_request(url_parts, headers)
+    try:
+        if response.status not in [200, 206]:
+            _release_http_connection(url_parts, connection, response)
+            if response.status == 404:
+                raise FileNotFoundError('DOES NOT EXIST '+url)
+            raise http.client.HTTPException('HTTP status '
+                                            +str(response.status))
+        if response.status == 206 and 'Range' in headers:
+            start, end, size = _parse_content_range(
+                response.getheader('Content-Range', '')
+            )
+            if start != resume_bytes:
+                raise http.client.HTTPException(
+                    'resumed at byte '+str(start)+', asked for '
+                    +str(resume_bytes)
+                )
+        else:
+            # The server sent the whole file, start it over
+            part_file.seek(part_file.tell()-resume_bytes)
+            part_file.truncate()
+            resume_bytes = 0
+            size = response.getheader('Content-Length')
+            if size is not None:
+                size = int(size)
+        component_state_dict.update({
+            'etag': response.getheader('ETag'),
+            'last_modified': response.getheader('Last-Modified'),
+            'size': size
+        })
+        _write_download_state(state_url, state_dict)
+        nbytes = resume_bytes+_read_http_bytes(response, None, part_file)
+        if size is not None and nbytes != size:
+            raise http.client.HTTPException(
+                'gave '+str(nbytes)+' bytes, expected '+str(size)
+            )
+        _release_http_connection(url_parts, connection, response)
+    except (OSError, http.client.HTTPException):
+        connection.close()
+        raise
+    return nbytes
+
+def _write_url_fields(url_parts, range_list, part_file):
+    """! Write the byte ranges of given fields of a GRIB2
+         file from a URL to the end of a partial file, taking
+         them out of the whole file locally when the server
+         ignores ranges
+
+         Args:
+             url_parts  - urllib.parse.SplitResult of URL
+             range_list - list of tuples of first and last
+                          byte (None for the end of the
+                          file) of the fields' messages
+             part_file  - file object positioned at where
+                          the fields' bytes start
+    """
+    url = urllib.parse.urlunsplit(url_parts)
+    print("--- DOWNLOADING "+str(len(range_list))+" byte ranges of "+url)
+    start_position = part_file.tell()
+    if _write_url_byte_ranges(url_parts, range_list, part_file):
+        return
+    print("--- "+url+" IGNORES BYTE RANGES, DOWNLOADING ALL OF IT "
+          +"AND TAKING THE FIELDS OUT LOCALLY")
+    part_file.seek(start_position)
+    part_file.truncate()
+    # The whole file is kept with the download states, out of
+    # the archive
+    full_dest = os.path.join(
+        machine_cache_dir, 'downloads',
+        hashlib.md5(url.encode('utf-8')).hexdigest()+'.full'
+    )
+    if not download_file(url, full_dest):
+        raise http.client.HTTPException('could not download all of it')
+    try:
+        part_file.flush()
+        with open(full_dest, 'rb') as full_file:
+            full_size = os.fstat(full_file.fileno()).st_size
+            for start, end in range_list:
+                full_file.seek(start)
+                _copy_file_data(
+                    full_file.fileno(), part_file.fileno(),
+                    (full_size if end is None else end+1)-start
+                )
+        part_file.seek(0, os.SEEK_END)
+    finally:
+        os.remove(full_dest)
+
+@timed_operation('download_concatenated_files', path_arg=1, size_arg=1)
+def download_concatenated_files(url_list, dest, field_list=None):
+    """! Download GRIB2 files over HTTP(S) one after another
+         straight into one partial file next to dest, check
+         each is only whole GRIB2 messages, and rename it into
+         place. Where each file starts and its ETag and
+         Last-Modified are kept in the download state cache,
+         so a download cut off resumes from the file it
+         stopped in, and from the byte it stopped at when the
+         whole file is downloaded.
+
+         Args:
+             url_list   - list of strings of URLs of files,
+                          in the order they are put together
+             dest       - string of full path to
+                          destination file
+             field_list - list of wgrib2 inventory names to
+                          download only those GRIB2 messages,
+                          default: None (all of the files)
+
+         Returns:
+             downloaded - boolean, True if the file was
+                          downloaded
+    """
+    remove_stale_downloads()
+    dest = os.path.abspath(dest)
+    # Only one thread or process downloads to dest at a time
+    lock_fd = acquire_file_lock(dest)
+    try:
+        return _download_concatenated_files(url_list, dest, field_list)
+    finally:
+        release_file_lock(lock_fd)
+
+def _download_concatenated_files(url_list, dest, field_list):
+    """! Download files for download_concatenated_files, with
+         dest locked
+
+         Args:
+             url_list   - list of strings of URLs of files,
+                          in the order they are put together
+             dest       - string of full path to
+                          destination file
+             field_list - list of wgrib2 inventory names,
+                          None for all of the files
+
+         Returns:
+             downloaded - boolean, True if the file was
+                          downloaded
+    """
+    part_dest = _get_part_dest(dest)
+    # One state for all the files, under the URLs together
+    state_url = ' '.join(url_list)
+    state_dict = _read_download_state(state_url, dest)
+    if state_dict.get('complete') or not os.path.exists(part_dest):
+        state_dict = {}
+    component_state_list = state_dict.get('component_list', [])
+    state_dict = {'url': state_url, 'dest': dest, 'complete': False,
+                  'component_list': []}
+    if not os.path.exists(part_dest):
+        open(part_dest, 'wb').close()
+    part_size = os.stat(part_dest).st_size
+    start = 0
+    for ncomponent, url in enumerate(url_list):
+        url_parts = urllib.parse.urlsplit(url)
+        range_list = None
+        nmessages = None
+        if field_list is not None:
+            range_list, nmessages = _get_grib2_field_ranges(url, field_list)
+            if range_list is None:
+                print("--- NO USABLE INVENTORY OR FIELDS FOR "+url+", "
+                      +"DOWNLOADING ALL OF IT")
+        # What is kept of a file is only used if the files
+        # before it were, and it was of the same byte ranges
+        if ncomponent < len(component_state_list) \
+                and len(state_dict['component_list']) == ncomponent \
+                and component_state_list[ncomponent].get('url') == url \
+                and component_state_list[ncomponent].get('range_list') \
+                == (None if range_list is None
+                    else [list(byte_range) for byte_range in range_list]):
+            component_state_dict = component_state_list[ncomponent]
+        else:
+            component_state_dict = {}
+        if component_state_dict.get('complete') \
+                and part_size >= start+component_state_dict['size']:
+            print("--- "+url+" ALREADY DOWNLOADED")
+            state_dict['component_list'].append(component_state_dict)
+            start+=component_state_dict['size']
+            continue
+        component_state_dict = {
+            'url': url, 'complete': False,
+            'range_list': (None if range_list is None
+                           else [list(byte_range)
+                                 for byte_range in range_list]),
+            'etag': component_state_dict.get('etag'),
+            'last_modified': component_state_dict.get('last_modified')
+        }
+        attempt = 0
+        while True:
+            attempt+=1
+            # Only a whole file is resumed part way through
+            resume_bytes = 0
+            if range_list is None:
+                resume_bytes = max(0, min(part_size, os.stat(part_dest)\
+                                          .st_size)-start)
+            try:
+                with open(part_dest, 'r+b') as part_file:
+                    part_file.seek(start+resume_bytes)
+                    part_file.truncate()
+                    state_dict['component_list'] = (
+                        state_dict['component_list'][:ncomponent]
+                        +[component_state_dict]
+                    )
+                    _write_download_state(state_url, state_dict)
+                    if range_list is None:
+                        _write_url_resumed(url_parts, state_url, state_dict,
+                                           component_state_dict, part_file,
+                                           resume_bytes)
+                    else:
+                        _write_url_fields(url_parts, range_list, part_file)
+                nbytes = os.stat(part_dest).st_size-start
+                ncomponent_messages = count_grib2_messages(part_dest,
+                                                           offset=start)
+                if nbytes == 0 or ncomponent_messages is None \
+                        or (nmessages is not None
+                            and ncomponent_messages != nmessages):
+                    print("ERROR: "+url+" gave "+str(nbytes)+" bytes that "
+                          +"are not whole GRIB2 messages")
+                    component_state_dict['etag'] = None
+                    component_state_dict['last_modified'] = None
+                    part_size = start
+                else:
+                    break
+            except FileNotFoundError as e:
+                print(str(e))
+                return False
+            except (OSError, http.client.HTTPException) as e:
+                # What was written is kept to resume from
+                print("ERROR: "+url+" failed: "+str(e))
+                part_size = os.stat(part_dest).st_size
+            if attempt > http_settings_dict['retries']:
+                print("ERROR: could not download "+url+", keeping "
+                      +part_dest+" to resume from")
+                return False
+            backoff = min(retry_backoff_seconds*2**(attempt-1),
+                          retry_backoff_max_seconds)
+            print("--- RETRYING "+url+" in "+str(backoff)+" seconds")
+            time.sleep(backoff)
+        component_state_dict['size'] = nbytes
+        component_state_dict['complete'] = True
+        _write_download_state(state_url, state_dict)
+        part_size = start+nbytes
+        start+=nbytes
+    print("--- "+dest+" SIZES "+' + '.join(
+        [url.rpartition('/')[2]+' '+str(component_state_dict['size'])
+         for url, component_state_dict
+         in zip(url_list, state_dict['component_list'])]
+    ))
+    os.truncate(part_dest, start)
+    if count_grib2_messages(part_dest) is None:
+        print("ERROR: "+part_dest+" is not whole GRIB2 messages, "
+              +"not using it")
+        os.remove(part_dest)
+        return False
+    os.replace(part_dest, dest)
+    state_dict['size'] = start
+    state_dict['complete'] = True
+    _write_download_state(state_url, state_dict)
+    record_archive_file(dest)
+    return True
+
+def download_files(url_file_list, nthreads=None, field_list=None):
+    """! Download files over HTTP(S), several at once, on
+         kept alive connections shared by the downloads
+
+         Args:
+             url_file_list - list of tuples of URL and full
+                             path to destination file
+             nthreads      - integer of number of files to
+                             download at once,
+                             default: from http_settings_dict
+             field_list    - list of wgrib2 inventory names
+                             to download only those GRIB2
+                             messages (see
+                             download_grib2_fields),
+                             default: None (all of the file)
+
+         Returns:
+             failed_list   - list of URLs that were not
+                             downloaded
+    """
+    if nthreads is None:
+        nthreads = http_settings_dict['nthreads']
+    if field_list is None:
+        download_args_list = [(url, dest) for url, dest in url_file_list]
+        download_func = download_file
+    else:
+        download_args_list = [(url, dest, field_list)
+                              for url, dest in url_file_list]
+        download_func = download_grib2_fields
+    failed_list = []
+    if nthreads <= 1 or len(url_file_list) <= 1:
+        for download_args in download_args_list:
+            if not download_func(*download_args):
+                failed_list.append(download_args[0])
+        return failed_list
+    with concurrent.futures.ThreadPoolExecutor(
+            max_workers=nthreads
+    ) as executor:
+        future_list = [executor.submit(download_func, *download_args)
+                       for download_args in download_args_list]
+        for download_args, future in zip(download_args_list, future_list):
+            try:
+                downloaded = future.result()
+            except Exception:
+                traceback.print_exc()
+                downloaded = False
+            if not downloaded:
+                failed_list.append(download_args[0])
+    return failed_list
+
+def list_http_dir(url_dir):
+    """! List the files in a directory served over HTTP(S)
+         by reading the links of its index page
+
+         Args:
+             url_dir   - string of URL of directory
+
+         Returns:
+             name_list - list of file names, None if the
+                         directory could not be listed
+    """
+    index_bytes = io.BytesIO()
+    try:
+        _write_url(urllib.parse.urlsplit(url_dir.rstrip('/')+'/'),
+                   index_bytes)
+    except (OSError, http.client.HTTPException) as e:
+        print("WARNING: could not list "+url_dir+": "+str(e))
+        return None
+    name_list = []
+    for href in re.findall(r'href="([^"?#]+)"',
+                           index_bytes.getvalue().decode('utf-8', 'replace')):
+        name = urllib.parse.unquote(href.rstrip('/').rpartition('/')[2])
+        if name not in ['', '.', '..'] and name not in name_list:
+            name_list.append(name)
+    return name_list
+
+# Logged in FTP sessions not in use, by host, for the
+# process that made them
+_ftp_session_pool = {}
+_ftp_session_pool_pid = None
+
+def _get_ftp_session(host):
+    """! Get a logged in anonymous FTP session to a host
+         from the pool, or log in a new one
+
+         Args:
+             host    - string of FTP host and optional port
+
+         Returns:
+             session - ftplib.FTP
+    """
+    global _ftp_session_pool, _ftp_session_pool_pid
+    # Sessions made before a fork belong to the parent
+    if _ftp_session_pool_pid != os.getpid():
+        _ftp_session_pool = {}
+        _ftp_session_pool_pid = os.getpid()
+    while len(_ftp_session_pool.get(host, [])) != 0:
+        session = _ftp_session_pool[host].pop()
+        try:
+            session.voidcmd('NOOP')
+            return session
+        except (OSError, ftplib.Error, EOFError):
+            session.close()
+    print("--- LOGGING IN TO "+host)
+    host_name, _, port = host.partition(':')
+    session = ftplib.FTP(timeout=http_settings_dict['timeout'])
+    session.connect(host_name, int(port or 21))
+    session.login()
+    return session
+
+def _put_ftp_session(host, session):
+    """! Put an FTP session back in the pool to be used again
+
+         Args:
+             host    - string of FTP host and optional port
+             session - ftplib.FTP
+    """
+    if _ftp_session_pool_pid == os.getpid():
+        _ftp_session_pool.setdefault(host, []).append(session)
+    else:
+        session.close()
+
+def list_ftp_dir(url_dir):
+    """! List the files in a directory on an FTP server
+
+         Args:
+             url_dir   - string of URL of directory,
+                         ftp://host/path
+
+         Returns:
+             name_list - list of file names, None if the
+                         directory could not be listed
+    """
+    url_parts = urllib.parse.urlsplit(url_dir)
+    try:
+        session = _get_ftp_session(url_parts.netloc)
+        try:
+            name_list = [name.rpartition('/')[2] for name
+                         in session.nlst(url_parts.path or '/')]
+        except ftplib.error_perm as e:
+            # Some servers answer an empty directory this way
+            _put_ftp_session(url_parts.netloc, session)
+            if str(e).startswith('550'):
+                return []
+            raise
+        _put_ftp_session(url_parts.netloc, session)
+    except (OSError, ftplib.Error, EOFError) as e:
+        print("WARNING: could not list "+url_dir+": "+str(e))
+        return None
+    return name_list
+
+@timed_operation('download_ftp_file', path_arg=1, size_arg=1)
+def download_ftp_file(url, dest):
+    """! Download a file from an FTP server on a pooled
+         logged in session, writing it to a partial file next
+         to dest, resumed from where it stopped if a download
+         was cut off, and renaming it into place once it is
+         the size the server has
+
+         Args:
+             url        - string of URL of file,
+                          ftp://host/path
+             dest       - string of full path to
+                          destination file
+
+         Returns:
+             downloaded - boolean, True if the file was
+                          downloaded
+    """
+    url_parts = urllib.parse.urlsplit(url)
+    part_dest = _get_part_dest(os.path.abspath(dest))
+    attempt = 0
+    while True:
+        attempt+=1
+        session = None
+        try:
+            session = _get_ftp_session(url_parts.netloc)
+            session.voidcmd('TYPE I')
+            try:
+                size = session.size(url_parts.path)
+            except ftplib.error_perm as e:
+                if str(e).startswith('550'):
+                    _put_ftp_session(url_parts.netloc, session)
+                    print("DOES NOT EXIST "+url)
+                    return False
+                size = None
+            part_size = 0
+            if os.path.exists(part_dest):
+                part_size = os.stat(part_dest).st_size
+                if size is None or part_size > size:
+                    part_size = 0
+            if part_size > 0:
+                print("--- DOWNLOADING "+url+" FROM BYTE "+str(part_size))
+            else:
+                print("--- DOWNLOADING "+url)
+            with open(part_dest, 'ab' if part_size > 0 else 'wb') \
+                    as part_dest_file:
+                session.retrbinary('RETR '+url_parts.path,
+                                   part_dest_file.write,
+                                   blocksize=http_chunk_bytes,
+                                   rest=part_size or None)
+            _put_ftp_session(url_parts.netloc, session)
+            nbytes = os.stat(part_dest).st_size
+            if size is not None and nbytes != size:
+                print("ERROR: "+url+" gave "+str(nbytes)+" bytes, "
+                      +"expected "+str(size))
+            else:
+                os.replace(part_dest, dest)
+                return True
+        except (OSError, ftplib.Error, EOFError) as e:
+            # What was written to the partial file is kept to
+            # resume from
+            print("ERROR: "+url+" failed: "+str(e))
+            if session is not None:
+                session.close()
+        if attempt > http_settings_dict['retries']:
+            return False
+        backoff = min(retry_backoff_seconds*2**(attempt-1),
+                      retry_backoff_max_seconds)
+        print("--- RETRYING "+url+" in "+str(backoff)+" seconds")
+        time.sleep(backoff)
+
+def get_remote_files(url_file_list):
+    """! Download the files that exist from HTTP(S) or FTP
+         servers, listing each remote directory once to see
+         which files are there, then getting those one after
+         another on pooled connections or logged in sessions
+
+         Args:
+             url_file_list - list of tuples of URL and full
+                             path to destination file
+
+         Returns:
+             failed_list   - list of URLs that were not
+                             downloaded, including the ones
+                             not on the server
+    """
+    dir_name_list_dict = {}
+    get_url_file_list = []
+    failed_list = []
+    for url, dest in url_file_list:
+        url_dir, _, name = url.rpartition('/')
+        if url_dir not in dir_name_list_dict:
+            if url.startswith('ftp://'):
+                dir_name_list_dict[url_dir] = list_ftp_dir(url_dir)
+            else:
+                dir_name_list_dict[url_dir] = list_http_dir(url_dir)
+        # Try everything when the directory could not be listed
+        if dir_name_list_dict[url_dir] is not None \
+                and name not in dir_name_list_dict[url_dir]:
+            print("DOES NOT EXIST "+url)
+            failed_list.append(url)
+        else:
+            get_url_file_list.append((url, dest))
+    for url, dest in get_url_file_list:
+        if url.startswith('ftp://'):
+            downloaded = download_ftp_file(url, dest)
+        else:
+            downloaded = download_file(url, dest)
+        if not downloaded:
+            failed_list.append(url)
+    return failed_list
+
+def get_command_tool(command):
+    """! Get the name of the tool a command runs
+
+         Args:
+             command - list of agrument entries
+
+         Returns:
+             tool    - string of executable base name
+    """
+    return os.path.basename(' '.join(command).strip().split(' ')[0])
+
+def get_lock_dir():
+    """! Get the directory of the lock files shared by all
+         processes, EGA_LOCK_DIR overrides it
+
+         Args:
+
+         Returns:
+             lock_dir - string of full path to lock directory
+    """
+    lock_dir = os.environ.get(
+        'EGA_LOCK_DIR',
+        os.path.join(tempfile.gettempdir(),
+                     'ega_locks_'+os.environ.get('USER', 'user'))
+    )
+    os.makedirs(lock_dir, exist_ok=True)
+    return lock_dir
+
+def acquire_file_lock(file_path):
+    """! Wait for the lock on making a file, so only one
+         process, in this run or any other, makes it at a time;
+         check for the file again once the lock is held
+
+         Args:
+             file_path - string of full path to file
+
+         Returns:
+             lock_fd   - integer of locked lock file descriptor
+    """
+    lock_fd = os.open(
+        os.path.join(get_lock_dir(),
+                     'file.'+hashlib.md5(os.path.abspath(file_path)\
+                                         .encode('utf-8')).hexdigest()
+                     +'.lock'),
+        os.O_CREAT | os.O_RDWR, 0o600
+    )
+    try:
+        fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+    except BlockingIOError:
+        print("--- WAITING for another process making "+file_path)
+        fcntl.flock(lock_fd, fcntl.LOCK_EX)
+    return lock_fd
+
+def release_file_lock(lock_fd):
+    """! Release the lock on making a file
+
+         Args:
+             lock_fd - integer of locked lock file descriptor
+    """
+    fcntl.flock(lock_fd, fcntl.LOCK_UN)
+    os.close(lock_fd)
+
+def _acquire_tool_slot(tool, max_concurrent):
+    """! Wait for one of the tool's concurrency slots, the
+         slots are lock files shared by all processes
+
+         Args:
+             tool           - string of executable base name
+             max_concurrent - integer of number of slots
+
+         Returns:
+             slot_fd        - integer of locked slot file
+                              descriptor
+    """
+    lock_dir = get_lock_dir()
+    waiting = False
+    while True:
+        for slot in range(max_concurrent):
+            slot_fd = os.open(
+                os.path.join(lock_dir, tool+'.'+str(slot)+'.lock'),
+                os.O_CREAT | os.O_RDWR, 0o600
+            )
+            try:
+                fcntl.flock(slot_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                return slot_fd
+            except BlockingIOError:
+                os.close(slot_fd)
+        if not waiting:
+            print("--- WAITING for one of "+str(max_concurrent)
+                  +" "+tool+" slots")
+            waiting = True
+        time.sleep(1)
+
+def _release_tool_slot(slot_fd):
+    """! Release a tool concurrency slot
+
+         Args:
+             slot_fd - integer of locked slot file descriptor
+    """
+    fcntl.flock(slot_fd, fcntl.LOCK_UN)
+    os.close(slot_fd)
+
+def _stream_command_output(pipe, out_stream, tail_deque):
+    """! Print each line a command writes as it is written,
+         keeping the last lines
+
+         Args:
+             pipe       - file object of the command's
+                          stdout or stderr
+             out_stream - file object to print lines to
+             tail_deque - deque the last lines are kept in
+    """
+    for line in iter(pipe.readline, b''):
+        line = line.decode('utf-8', errors='replace')
+        out_stream.write(line if line.endswith('\n') else line+'\n')
+        out_stream.flush()
+        tail_deque.append(line.rstrip('\n'))
+    pipe.close()
+
+def run_command(command, timeout='default', retries='default', shell=False):
+    """! Run command with a timeout, retrying failures with
+         exponential backoff, and return what happened; the
+         command's output is printed line by line as it runs
+
+         Args:
+             command - list of agrument entries
+             timeout - seconds before the command is killed,
+                       None for no timeout,
+                       default: from tool_settings_dict
+             retries - integer number of retries,
+                       default: from tool_settings_dict
+             shell   - boolean to run the joined entries
+                       through the shell, for commands
+                       using quotes, pipes, redirects
+                       or wildcards
+
+         Returns:
+             result  - CommandResult of the last attempt
+    """
+    tool = get_command_tool(command)
+    tool_settings = tool_settings_dict.get(tool, {})
+    if timeout == 'default':
+        timeout = tool_settings.get('timeout', None)
+    if retries == 'default':
+        retries = tool_settings.get('retries', 0)
+    max_concurrent = tool_settings.get('max_concurrent', None)
+    if shell:
+        run_args = ' '.join(command)
+    else:
+        run_args = command
+    attempt = 0
+    while True:
+        attempt+=1
+        print("--- RUNNING "+' '.join(command))
+        sys.stdout.flush()
+        if max_concurrent is not None:
+            slot_fd = _acquire_tool_slot(tool, max_concurrent)
+        start_time = time.monotonic()
+        timed_out = False
+        stdout_deque = collections.deque(maxlen=output_tail_lines)
+        stderr_deque = collections.deque(maxlen=output_tail_lines)
+        try:
+            run_process = subprocess.Popen(
+                run_args, shell=shell, stdout=subprocess.PIPE,
+                stderr=subprocess.PIPE, start_new_session=True
+            )
+            stream_thread_list = [
+                threading.Thread(target=_stream_command_output,
+                                 args=(run_process.stdout, sys.stdout,
+                                       stdout_deque)),
+                threading.Thread(target=_stream_command_output,
+                                 args=(run_process.stderr, sys.stderr,
+                                       stderr_deque))
+            ]
+            for stream_thread in stream_thread_list:
+                stream_thread.start()
+            try:
+                run_process.wait(timeout=timeout)
+            except subprocess.TimeoutExpired:
+                os.killpg(run_process.pid, signal.SIGKILL)
+                run_process.wait()
+                timed_out = True
+            for stream_thread in stream_thread_list:
+                stream_thread.join()
+        finally:
+            if max_concurrent is not None:
+                _release_tool_slot(slot_fd)
+        duration = time.monotonic() - start_time
+        returncode = run_process.returncode
+        result = CommandResult(
+            args=command, returncode=returncode,
+            duration=duration, attempts=attempt, timed_out=timed_out,
+            stdout_tail='\n'.join(stdout_deque),
+            stderr_tail='\n'.join(stderr_deque)
+        )
+        if timed_out:
+            print("ERROR: "+' '.join(command)+" timed out after "
+                  +str(timeout)+" seconds")
+        elif returncode != 0:
+            print("ERROR: "+' '.join(command)+" gave return code "
+                  +str(returncode))
+        if (returncode == 0 and not timed_out) or attempt > retries:
+            return result
+        backoff = min(retry_backoff_seconds*2**(attempt-1),
+                      retry_backoff_max_seconds)
+        print("--- RETRYING in "+str(backoff)+" seconds, attempt "
+              +str(attempt+1)+" of "+str(retries+1))
+        time.sleep(backoff)
+
+@timed_operation('run_shell_command')
+def run_shell_command(command, shell=False):
     """! Run shell command
 
          Args:
-             command - list of agrument entries
+             command - list of agrument entries
+             shell   - boolean to run the joined entries
+                       through the shell
+
+         Returns:
+             result  - CommandResult of the last attempt
+    """
+    return run_command(command, shell=shell)
+
+def _run_captured_work_unit(work_unit):
+    """! Run one unit of work capturing everything it writes
+         to stdout and stderr, including output of any
+         subprocesses it runs
+
+         Args:
+             work_unit      - tuple of (name, function,
+                              tuple of function arguments)
+
+         Returns:
+             name           - string of work unit name
+             status         - string of work unit status
+                              (OK or FAILED)
+             output         - string of captured output
+    """
+    name, func, func_args = work_unit
+    with tempfile.TemporaryFile(mode='w+') as work_unit_log:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        saved_stdout_fd = os.dup(1)
+        saved_stderr_fd = os.dup(2)
+        os.dup2(work_unit_log.fileno(), 1)
+        os.dup2(work_unit_log.fileno(), 2)
+        try:
+            func(*func_args)
+            status = 'OK'
+        except Exception:
+            traceback.print_exc()
+            status = 'FAILED'
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(saved_stdout_fd, 1)
+            os.dup2(saved_stderr_fd, 2)
+            os.close(saved_stdout_fd)
+            os.close(saved_stderr_fd)
+        work_unit_log.seek(0)
+        output = work_unit_log.read()
+    return name, status, output
+
+def run_work_units(work_unit_list, nworkers):
+    """! Run independent units of work, using a pool of
+         worker processes when more than one worker is
+         requested. Output from each unit is printed in
+         the order the units were given. A unit that raises
+         an exception is reported as failed and the others
+         still run.
+
+         Args:
+             work_unit_list - list of tuples of (name, function,
+                              tuple of function arguments)
+             nworkers       - integer of number of worker
+                              processes
+
+         Returns:
+             failed_list    - list of names of work units
+                              that failed
+    """
+    failed_list = []
+    if nworkers <= 1 or len(work_unit_list) <= 1:
+        for name, func, func_args in work_unit_list:
+            try:
+                func(*func_args)
+                status = 'OK'
+            except Exception:
+                traceback.print_exc()
+                status = 'FAILED'
+            sys.stdout.flush()
+            sys.stderr.flush()
+            print("--- WORK UNIT "+name+" "+status)
+            if status != 'OK':
+                failed_list.append(name)
+        return failed_list
+    print("--- RUNNING "+str(len(work_unit_list))+" work units with "
+          +str(nworkers)+" workers")
+    sys.stdout.flush()
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=nworkers,
+            mp_context=multiprocessing.get_context('fork')
+    ) as executor:
+        for name, status, output in executor.map(_run_captured_work_unit,
+                                                 work_unit_list):
+            print("--- WORK UNIT "+name+" "+status)
+            print(output, end='')
+            sys.stdout.flush()
+            if status != 'OK':
+                failed_list.append(name)
+    return failed_list
+
+def get_PDYm_dict(PDY):
+    """! Get dictionary of date and previous days
+
+         Args:
+             PDY       - string of date in YYYYmmdd form
+
+         Returns:
+             PDYm_dict - dictionary containing 7 days of
+                         previous days from PDY (strings
+                         in YYYYmmdd)
+
+    """
+    PDY_dt = datetime.datetime.strptime(PDY, '%Y%m%d')
+    PDYm_dict = {
+        'PDYm0': (PDY_dt - datetime.timedelta(days=0)).strftime('%Y%m%d'),
+        'PDYm1': (PDY_dt - datetime.timedelta(days=1)).strftime('%Y%m%d'),
+        'PDYm2': (PDY_dt - datetime.timedelta(days=2)).strftime('%Y%m%d'),
+        'PDYm3': (PDY_dt - datetime.timedelta(days=3)).strftime('%Y%m%d'),
+        'PDYm4': (PDY_dt - datetime.timedelta(days=4)).strftime('%Y%m%d'),
+        'PDYm5': (PDY_dt - datetime.timedelta(days=5)).strftime('%Y%m%d'),
+        'PDYm6': (PDY_dt - datetime.timedelta(days=6)).strftime('%Y%m%d'),
+        'PDYm7': (PDY_dt - datetime.timedelta(days=7)).strftime('%Y%m%d')
+    }
+    print("\nDate Information")
+    for PDYm in list(PDYm_dict.keys()):
+        print("Using "+PDYm+" as "+PDYm_dict[PDYm])
+    print("")
+    return PDYm_dict
+
+prodmachinefile = os.environ.get(
+    'PRODMACHINEFILE', '/lfs/h1/ops/prod/config/prodmachinefile'
+)
+machine_cache_dir = os.environ.get(
+    'EGA_CACHE_DIR',
+    os.path.join(os.path.expanduser('~'), '.cache', 'emc_global_archive')
+)
+
+def _read_prodmachinefile():
+    """! Get the production and development WCOSS2 machines
+         from the production machine file, reusing the
+         copy cached on disk when the file has not changed
+
+         Args:
+
+         Returns:
+             config_dict - dictionary containing PROD and
+                           DEV WCOSS2 machines
+    """
+    prodmachinefile_stat = os.stat(prodmachinefile)
+    cache_file = os.path.join(machine_cache_dir, 'prodmachinefile.json')
+    if os.path.exists(cache_file):
+        try:
+            with open(cache_file, 'r') as cache:
+                cache_dict = json.load(cache)
+            if (cache_dict['path'] == prodmachinefile
+                    and cache_dict['mtime_ns']
+                    == prodmachinefile_stat.st_mtime_ns
+                    and cache_dict['size'] == prodmachinefile_stat.st_size):
+                return cache_dict['config_dict']
+        except (OSError, ValueError, KeyError):
+            pass
+    config_dict = {}
+    with open(prodmachinefile, 'r') as machinefile:
+        for config_machine in machinefile.read().rstrip().split('\n'):
+            config = config_machine.split(':')[0]
+            machine = config_machine.split(':')[1]
+            if config == 'primary':
+                config_dict['PROD'] = machine
+            elif config == 'backup':
+                config_dict['DEV'] = machine
+    try:
+        os.makedirs(machine_cache_dir, exist_ok=True)
+        tmp_cache_file = cache_file+'.tmp.'+str(os.getpid())
+        with open(tmp_cache_file, 'w') as cache:
+            json.dump({'path': prodmachinefile,
+                       'mtime_ns': prodmachinefile_stat.st_mtime_ns,
+                       'size': prodmachinefile_stat.st_size,
+                       'config_dict': config_dict}, cache)
+        os.replace(tmp_cache_file, cache_file)
+    except OSError as err:
+        print("WARNING: could not cache "+prodmachinefile+": "+str(err))
+    return config_dict
+
+def _get_host_machine_dict():
+    """! Get the current and other WCOSS2 transfer machines
+         from the host name
+
+         Args:
+
+         Returns:
+             host_dict - dictionary containing CURRENT and
+                         OTHER WCOSS2 machines
+    """
+    host_dict = {}
+    hostname = os.environ.get('HOSTNAME', '')
+    cactus_match = re.match(re.compile(r"^clogin[0-9]{2}$"), hostname)
+    dogwood_match = re.match(re.compile(r"^dlogin[0-9]{2}$"), hostname)
+    if cactus_match:
+        host_dict['CURRENT'] = 'cdxfer.wcoss2.ncep.noaa.gov'
+        host_dict['OTHER'] = 'ddxfer.wcoss2.ncep.noaa.gov'
+    elif dogwood_match:
+        host_dict['CURRENT'] = 'ddxfer.wcoss2.ncep.noaa.gov'
+        host_dict['OTHER'] = 'cdxfer.wcoss2.ncep.noaa.gov'
+    return host_dict
+
+class WCOSS2MachineDict(collections.abc.Mapping):
+    """! Dictionary of dev, prod, current, and other WCOSS2
+         machines that is only worked out when a machine
+         is looked up: CURRENT and OTHER come from the
+         host name, PROD and DEV from the production
+         machine file
+    """
+    def __init__(self):
+        self._host_dict = None
+        self._config_dict = None
+
+    def _load(self, key=None):
+        if self._host_dict is None:
+            self._host_dict = _get_host_machine_dict()
+        if key not in self._host_dict and self._config_dict is None:
+            self._config_dict = _read_prodmachinefile()
+            print("\nWCOSS2 machine information...")
+            for status, machine in {**self._config_dict,
+                                    **self._host_dict}.items():
+                print(status+' -> '+machine)
+            print("")
+        return {**(self._config_dict or {}), **self._host_dict}
+
+    def __getitem__(self, key):
+        return self._load(key)[key]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+_wcoss2_machine_dict = None
+
+def get_machine_dict():
+    """! Get dictionary of dev, prod, current, and other
+        WCOSS2 machines, nothing is looked up until a
+        machine is used
+
+         Args:
+
+         Returns:
+             wcoss2_dict - dictionary containing
+                           dev, prod, current, and other
+                           WCOSS2 machines
+    """
+    global _wcoss2_machine_dict
+    if _wcoss2_machine_dict is None:
+        _wcoss2_machine_dict = WCOSS2MachineDict()
+    return _wcoss2_machine_dict
+
+# Archive manifest: a SQLite database at the top of an archive
+# directory recording every archived file so existence checks
+# do not have to go to the file system
+archive_manifest_name = '.archive_manifest.sqlite'
+_archive_manifest_root_list = []
+_archive_manifest_conn_dict = {}
+_archive_manifest_day_dict = {}
+
+def open_archive_manifest(archive_dir):
+    """! Open (creating if needed) the archive manifest for
+         an archive directory, files under the directory
+         are then recorded in and checked against it
+
+         Args:
+             archive_dir - string of full path to archive
+                           directory
+    """
+    archive_dir = os.path.abspath(archive_dir)
+    if archive_dir not in _archive_manifest_root_list:
+        print("Using archive manifest "
+              +os.path.join(archive_dir, archive_manifest_name))
+        _archive_manifest_root_list.append(archive_dir)
+        _archive_manifest_root_list.sort(key=len, reverse=True)
+    conn = _get_archive_manifest_conn(archive_dir)
+    with conn:
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS archive_files ('
+            +'path TEXT PRIMARY KEY, product TEXT, date TEXT, '
+            +'cycle TEXT, fhr TEXT, size INTEGER, mtime REAL)'
+        )
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS archive_files_product_date '
+            +'ON archive_files (product, date)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sealed_days ('
+            +'spec TEXT, date TEXT, nfiles INTEGER, sealed REAL, '
+            +'PRIMARY KEY (spec, date))'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS sealed_day_files ('
+            +'spec TEXT, date TEXT, path TEXT, '
+            +'PRIMARY KEY (spec, date, path))'
+        )
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS sealed_day_files_path '
+            +'ON sealed_day_files (path)'
+        )
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS source_fingerprints ('
+            +'path TEXT PRIMARY KEY, src_path TEXT, src_size INTEGER, '
+            +'src_mtime_ns INTEGER, src_ino INTEGER)'
+        )
+
+def find_archive_manifest(path):
+    """! Look for an existing archive manifest in a directory
+         or any of its parents and open it
+
+         Args:
+             path        - string of full path to file or
+                           directory
+
+         Returns:
+             archive_dir - string of full path to archive
+                           directory holding the manifest,
+                           None if there is no manifest
+    """
+    search_dir = os.path.abspath(path)
+    while True:
+        if os.path.exists(os.path.join(search_dir, archive_manifest_name)):
+            open_archive_manifest(search_dir)
+            return search_dir
+        if search_dir == os.path.dirname(search_dir):
+            return None
+        search_dir = os.path.dirname(search_dir)
+
+def _get_archive_manifest_conn(archive_dir):
+    """! Get this process's connection to an archive manifest,
+         worker processes get their own connections
+
+         Args:
+             archive_dir - string of full path to archive
+                           directory
+
+         Returns:
+             conn        - sqlite3 connection
+    """
+    conn_key = (archive_dir, os.getpid())
+    if conn_key not in _archive_manifest_conn_dict:
+        _archive_manifest_conn_dict[conn_key] = sqlite3.connect(
+            os.path.join(archive_dir, archive_manifest_name), timeout=120
+        )
+    return _archive_manifest_conn_dict[conn_key]
+
+def _get_archive_manifest_root(file_path):
+    """! Get the archive directory whose manifest covers a file
+
+         Args:
+             file_path   - string of full path to file
+
+         Returns:
+             archive_dir - string of full path to archive
+                           directory, None if not covered
+    """
+    if len(_archive_manifest_root_list) == 0:
+        return None
+    file_path = os.path.abspath(file_path)
+    for archive_dir in _archive_manifest_root_list:
+        if file_path.startswith(archive_dir+os.sep):
+            return archive_dir
+    return None
+
+def parse_archive_file_name(rel_path):
+    """! Get the product, date, cycle, and forecast hour
+         from an archive file's path
+
+         Args:
+             rel_path  - string of file path relative to the
+                         archive directory
+
+         Returns:
+             file_dict - dictionary with product, date, cycle,
+                         and fhr (None when not in the name),
+                         product is the path with the date,
+                         cycle and forecast hour replaced by
+                         {PDY}, {HH} and {FHR}
+    """
+    span_list = []
+    date = cycle = fhr = None
+    date_match = re.search(
+        r'(?<!\d)((?:19|20)\d{6})(\d{2})?(?:\d{2})?(?!\d)', rel_path
+    )
+    julian_match = re.search(r'_((?:19|20)\d{5})_', rel_path)
+    if date_match:
+        date = date_match.group(1)
+        span_list.append((date_match.start(1), date_match.end(1), '{PDY}'))
+        if date_match.group(2):
+            cycle = date_match.group(2)
+            span_list.append((date_match.start(2), date_match.end(2),
+                              '{HH}'))
+    elif julian_match:
+        date = datetime.datetime.strptime(
+            julian_match.group(1), '%Y%j'
+        ).strftime('%Y%m%d')
+        span_list.append((julian_match.start(1), julian_match.end(1),
+                          '{PDYj}'))
+    cycle_match = re.search(r'\.t(\d{2})z\.', rel_path)
+    if cycle_match:
+        if cycle is None:
+            cycle = cycle_match.group(1)
+        span_list.append((cycle_match.start(1), cycle_match.end(1), '{HH}'))
+    fhr_match = (re.search(r'(?:pgbf|flxf)(\d{2,3})(?=\.)', rel_path)
+                 or re.search(r'\.f(\d{3})(?=\.|$)', rel_path))
+    if fhr_match:
+        fhr = fhr_match.group(1).zfill(3)
+        span_list.append((fhr_match.start(1), fhr_match.end(1), '{FHR}'))
+    elif 'pgbanl.' in rel_path:
+        fhr = 'anl'
+    product = rel_path
+    for start, end, token in sorted(span_list, reverse=True):
+        product = product[:start]+token+product[end:]
+    return {'product': product, 'date': date, 'cycle': cycle, 'fhr': fhr}
+
+def record_archive_file(file_path, file_stat=None):
+    """! Record a file in its archive manifest
+
+         Args:
+             file_path - string of full path to file
+             file_stat - os.stat_result of file,
+                         default: stat the file
+    """
+    archive_dir = _get_archive_manifest_root(file_path)
+    if archive_dir is None:
+        return
+    if file_stat is None:
+        file_stat = os.stat(file_path)
+    rel_path = os.path.relpath(os.path.abspath(file_path), archive_dir)
+    file_dict = parse_archive_file_name(rel_path)
+    conn = _get_archive_manifest_conn(archive_dir)
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO archive_files '
+            +'(path, product, date, cycle, fhr, size, mtime) '
+            +'VALUES (?, ?, ?, ?, ?, ?, ?)',
+            (rel_path, file_dict['product'], file_dict['date'],
+             file_dict['cycle'], file_dict['fhr'], file_stat.st_size,
+             file_stat.st_mtime)
+        )
+    day_key = (archive_dir, file_dict['product'], file_dict['date'])
+    if day_key in _archive_manifest_day_dict:
+        if file_stat.st_size != 0:
+            _archive_manifest_day_dict[day_key].add(rel_path)
+        else:
+            _archive_manifest_day_dict[day_key].discard(rel_path)
+
+def remove_archive_file_record(file_path):
+    """! Remove a file from its archive manifest
+
+         Args:
+             file_path - string of full path to file, removes
+                         everything under it if a directory
+    """
+    archive_dir = _get_archive_manifest_root(file_path)
+    if archive_dir is None:
+        return
+    rel_path = os.path.relpath(os.path.abspath(file_path), archive_dir)
+    file_dict = parse_archive_file_name(rel_path)
+    for day_key, day_path_set in _archive_manifest_day_dict.items():
+        if day_key[0] == archive_dir:
+            day_path_set.difference_update(
+                [day_path for day_path in day_path_set
+                 if day_path == rel_path
+                 or day_path.startswith(rel_path+os.sep)]
+            )
+    conn = _get_archive_manifest_conn(archive_dir)
+    with conn:
+        for table in ['archive_files', 'source_fingerprints']:
+            conn.execute(
+                'DELETE FROM '+table+' WHERE path = ? '
+                +'OR substr(path, 1, ?) = ?',
+                (rel_path, len(rel_path)+1, rel_path+os.sep)
+            )
+        # A day missing a file is no longer complete, only the
+        # specs the file was sealed with are reopened
+        sealed_spec_date_list = conn.execute(
+            'SELECT DISTINCT spec, date FROM sealed_day_files '
+            +'WHERE path = ? OR substr(path, 1, ?) = ?',
+            (rel_path, len(rel_path)+1, rel_path+os.sep)
+        ).fetchall()
+        for spec, date in sealed_spec_date_list:
+            _delete_sealed_day(conn, spec, date)
+        # Days sealed before their files were kept are reopened
+        # by date
+        if file_dict['date'] is not None:
+            conn.execute(
+                'DELETE FROM sealed_days WHERE date = ? AND NOT EXISTS '
+                +'(SELECT 1 FROM sealed_day_files WHERE '
+                +'sealed_day_files.spec = sealed_days.spec AND '
+                +'sealed_day_files.date = sealed_days.date)',
+                (file_dict['date'],)
+            )
+
+def lookup_archive_file(file_path):
+    """! Look up a file in its archive manifest
+
+         Args:
+             file_path   - string of full path to file
 
          Returns:
+             record_dict - dictionary of the file's manifest
+                           record, None if not recorded
+    """
+    archive_dir = _get_archive_manifest_root(file_path)
+    if archive_dir is None:
+        return None
+    rel_path = os.path.relpath(os.path.abspath(file_path), archive_dir)
+    conn = _get_archive_manifest_conn(archive_dir)
+    row = conn.execute(
+        'SELECT path, product, date, cycle, fhr, size, mtime '
+        +'FROM archive_files WHERE path = ?', (rel_path,)
+    ).fetchone()
+    if row is None:
+        return None
+    return dict(zip(['path', 'product', 'date', 'cycle', 'fhr', 'size',
+                     'mtime'], row))
+
+def is_archived_file(file_path):
+    """! Check if a file is recorded in its archive manifest
+         and not 0 sized, the manifest records of the file's
+         product and date are read with one query the first
+         time one of them is asked about and kept for the
+         rest of the run
+
+         Args:
+             file_path - string of full path to file
 
+         Returns:
+             archived  - boolean, True if the file is recorded
     """
-    print("--- RUNNING "+' '.join(command))
-    if any(mark in ' '.join(command) for mark in ['"', "'", '|', '*', '<', '>']):
-        run_command = subprocess.run(
-            ' '.join(command), shell=True
+    archive_dir = _get_archive_manifest_root(file_path)
+    if archive_dir is None:
+        return False
+    rel_path = os.path.relpath(os.path.abspath(file_path), archive_dir)
+    file_dict = parse_archive_file_name(rel_path)
+    if file_dict['date'] is None:
+        return False
+    day_key = (archive_dir, file_dict['product'], file_dict['date'])
+    if day_key not in _archive_manifest_day_dict:
+        conn = _get_archive_manifest_conn(archive_dir)
+        _archive_manifest_day_dict[day_key] = set(
+            row[0] for row in conn.execute(
+                'SELECT path FROM archive_files WHERE product = ? '
+                +'AND date = ? AND size > 0',
+                (file_dict['product'], file_dict['date'])
+            )
         )
-    else:
-        run_command = subprocess.run(command)
-    if run_command.returncode != 0:
-        print("ERROR: "+' '.join(run_command.args)+" gave return code "
-              +str(run_command.returncode))
+    return rel_path in _archive_manifest_day_dict[day_key]
 
-def get_PDYm_dict(PDY):
-    """! Get dictionary of date and previous days
+def get_source_fingerprint(src_path, src_stat):
+    """! Get the fingerprint of a source file: its path,
+         size, modification time, and inode
 
          Args:
-             PDY       - string of date in YYYYmmdd form
+             src_path    - string of full path to source file
+             src_stat    - os.stat_result of source file
 
          Returns:
-             PDYm_dict - dictionary containing 7 days of
-                         previous days from PDY (strings
-                         in YYYYmmdd)
+             fingerprint - tuple of path, size, mtime_ns, inode
+    """
+    return (os.path.abspath(src_path), src_stat.st_size,
+            src_stat.st_mtime_ns, src_stat.st_ino)
+
+def lookup_source_fingerprint(file_path):
+    """! Look up the fingerprint of the source an archive
+         file was copied from
+
+         Args:
+             file_path   - string of full path to archive file
 
+         Returns:
+             fingerprint - tuple of path, size, mtime_ns, inode,
+                           None if not recorded
     """
-    PDY_dt = datetime.datetime.strptime(PDY, '%Y%m%d')
-    PDYm_dict = {
-        'PDYm0': (PDY_dt - datetime.timedelta(days=0)).strftime('%Y%m%d'),
-        'PDYm1': (PDY_dt - datetime.timedelta(days=1)).strftime('%Y%m%d'),
-        'PDYm2': (PDY_dt - datetime.timedelta(days=2)).strftime('%Y%m%d'),
-        'PDYm3': (PDY_dt - datetime.timedelta(days=3)).strftime('%Y%m%d'),
-        'PDYm4': (PDY_dt - datetime.timedelta(days=4)).strftime('%Y%m%d'),
-        'PDYm5': (PDY_dt - datetime.timedelta(days=5)).strftime('%Y%m%d'),
-        'PDYm6': (PDY_dt - datetime.timedelta(days=6)).strftime('%Y%m%d'),
-        'PDYm7': (PDY_dt - datetime.timedelta(days=7)).strftime('%Y%m%d')
-    }
-    print("\nDate Information")
-    for PDYm in list(PDYm_dict.keys()):
-        print("Using "+PDYm+" as "+PDYm_dict[PDYm])
-    print("")
-    return PDYm_dict
+    archive_dir = _get_archive_manifest_root(file_path)
+    if archive_dir is None:
+        return None
+    rel_path = os.path.relpath(os.path.abspath(file_path), archive_dir)
+    conn = _get_archive_manifest_conn(archive_dir)
+    row = conn.execute(
+        'SELECT src_path, src_size, src_mtime_ns, src_ino '
+        +'FROM source_fingerprints WHERE path = ?', (rel_path,)
+    ).fetchone()
+    if row is None:
+        return None
+    return tuple(row)
 
-def get_machine_dict():
-    """! Get dictionary of dev, prod, current, and other
-        WCOSS2 machines
+def record_source_fingerprint(file_path, fingerprint):
+    """! Record the fingerprint of the source an archive
+         file was copied from
+
+         Args:
+             file_path   - string of full path to archive file
+             fingerprint - tuple of path, size, mtime_ns, inode
+    """
+    archive_dir = _get_archive_manifest_root(file_path)
+    if archive_dir is None:
+        return
+    rel_path = os.path.relpath(os.path.abspath(file_path), archive_dir)
+    conn = _get_archive_manifest_conn(archive_dir)
+    with conn:
+        conn.execute(
+            'INSERT OR REPLACE INTO source_fingerprints '
+            +'(path, src_path, src_size, src_mtime_ns, src_ino) '
+            +'VALUES (?, ?, ?, ?, ?)', (rel_path,)+tuple(fingerprint)
+        )
+
+def query_archive_manifest(archive_dir, product=None, date=None,
+                           cycle=None):
+    """! Get the manifest records matching a product, date,
+         and/or cycle
 
          Args:
+             archive_dir - string of full path to archive
+                           directory
+             product     - string of product (see
+                           parse_archive_file_name), may
+                           use SQL LIKE wildcards
+             date        - string of date (YYYYmmdd)
+             cycle       - string of cycle hour (HH)
 
          Returns:
-             wcoss2_dict - dictionary containing
-                           dev, prod, current, and other
-                           WCOSS2 machines
+             record_list - list of dictionaries of manifest
+                           records
     """
-    wcoss2_dict = {}
-    wcoss2_config_machine_output = subprocess.run(
-        ['cat', '/lfs/h1/ops/prod/config/prodmachinefile'],
-        capture_output=True
-    ).stdout.decode('utf-8').rstrip().split('\n')
-    for config_machine in wcoss2_config_machine_output:
-        config = config_machine.split(':')[0]
-        machine = config_machine.split(':')[1]
-        if config == 'primary':
-            wcoss2_dict['PROD'] = machine
-        elif config == 'backup':
-            wcoss2_dict['DEV'] = machine
-    hostname = os.environ['HOSTNAME']
-    cactus_match = re.match(re.compile(r"^clogin[0-9]{2}$"), hostname)
-    dogwood_match = re.match(re.compile(r"^dlogin[0-9]{2}$"), hostname)
-    if cactus_match:
-        wcoss2_dict['CURRENT'] = 'cdxfer.wcoss2.ncep.noaa.gov'
-        wcoss2_dict['OTHER'] = 'ddxfer.wcoss2.ncep.noaa.gov'
-    elif dogwood_match:
-        wcoss2_dict['CURRENT'] = 'ddxfer.wcoss2.ncep.noaa.gov'
-        wcoss2_dict['OTHER'] = 'cdxfer.wcoss2.ncep.noaa.gov'
-    print("\nWCOSS2 machine information...")
-    for status in list(wcoss2_dict.keys()):
-        print(status+' -> '+wcoss2_dict[status])
-    print("")
-    return wcoss2_dict
+    archive_dir = os.path.abspath(archive_dir)
+    sql = ('SELECT path, product, date, cycle, fhr, size, mtime '
+           +'FROM archive_files WHERE 1 = 1')
+    sql_args = []
+    for column, value in [('product', product), ('date', date),
+                          ('cycle', cycle)]:
+        if value is not None:
+            if column == 'product':
+                sql+=' AND product LIKE ?'
+            else:
+                sql+=' AND '+column+' = ?'
+            sql_args.append(value)
+    conn = _get_archive_manifest_conn(archive_dir)
+    return [
+        dict(zip(['path', 'product', 'date', 'cycle', 'fhr', 'size',
+                  'mtime'], row))
+        for row in conn.execute(sql+' ORDER BY path', sql_args)
+    ]
 
+def reconcile_archive_manifest(archive_dir):
+    """! Rebuild an archive manifest from one walk of the
+         archive directory
+
+         Args:
+             archive_dir - string of full path to archive
+                           directory
+
+         Returns:
+             nfiles      - integer of number of files recorded
+    """
+    archive_dir = os.path.abspath(archive_dir)
+    open_archive_manifest(archive_dir)
+    row_list = []
+    scan_dir_list = [archive_dir]
+    while len(scan_dir_list) != 0:
+        scan_dir = scan_dir_list.pop()
+        with os.scandir(scan_dir) as scan_dir_entries:
+            for entry in scan_dir_entries:
+                if entry.name.startswith(archive_manifest_name):
+                    continue
+                if entry.is_dir(follow_symlinks=False):
+                    scan_dir_list.append(entry.path)
+                elif entry.is_file():
+                    entry_stat = entry.stat()
+                    rel_path = os.path.relpath(entry.path, archive_dir)
+                    file_dict = parse_archive_file_name(rel_path)
+                    row_list.append(
+                        (rel_path, file_dict['product'], file_dict['date'],
+                         file_dict['cycle'], file_dict['fhr'],
+                         entry_stat.st_size, entry_stat.st_mtime)
+                    )
+    conn = _get_archive_manifest_conn(archive_dir)
+    with conn:
+        conn.execute('DELETE FROM archive_files')
+        conn.executemany(
+            'INSERT INTO archive_files '
+            +'(path, product, date, cycle, fhr, size, mtime) '
+            +'VALUES (?, ?, ?, ?, ?, ?, ?)', row_list
+        )
+    print("Recorded "+str(len(row_list))+" files in "
+          +os.path.join(archive_dir, archive_manifest_name))
+    return len(row_list)
+
+def check_sealed_day(archive_dir, spec, date):
+    """! Check if a day has been sealed in the archive
+         manifest's completeness ledger
+
+         Args:
+             archive_dir - string of full path to archive
+                           directory
+             spec        - string of what was checked for the
+                           day (e.g. model:cycle:fhrmin:fhrmax:fhrinc)
+             date        - string of date (YYYYmmdd)
+
+         Returns:
+             sealed      - boolean of if all the day's
+                           expected files were found
+    """
+    archive_dir = os.path.abspath(archive_dir)
+    if archive_dir not in _archive_manifest_root_list:
+        return False
+    conn = _get_archive_manifest_conn(archive_dir)
+    row = conn.execute(
+        'SELECT 1 FROM sealed_days WHERE spec = ? AND date = ?',
+        (spec, date)
+    ).fetchone()
+    return row is not None
+
+def _delete_sealed_day(conn, spec, date):
+    """! Remove a day and its files from the archive
+         manifest's completeness ledger
+
+         Args:
+             conn - sqlite3 connection to archive manifest
+             spec - string of what was checked for the day
+             date - string of date (YYYYmmdd)
+    """
+    for table in ['sealed_days', 'sealed_day_files']:
+        conn.execute(
+            'DELETE FROM '+table+' WHERE spec = ? AND date = ?',
+            (spec, date)
+        )
+
+def seal_day(archive_dir, spec, date, check_file_list):
+    """! Seal a day in the archive manifest's completeness
+         ledger if all of its expected files are archived
+
+         Args:
+             archive_dir     - string of full path to archive
+                               directory
+             spec            - string of what was checked for
+                               the day (e.g.
+                               model:cycle:fhrmin:fhrmax:fhrinc)
+             date            - string of date (YYYYmmdd)
+             check_file_list - list of strings of full paths
+                               of the day's expected files
+
+         Returns:
+             sealed          - boolean of if the day was sealed
+    """
+    archive_dir = os.path.abspath(archive_dir)
+    if archive_dir not in _archive_manifest_root_list \
+            or len(check_file_list) == 0:
+        return False
+    for check_file_path in check_file_list:
+        try:
+            check_file_stat = os.stat(check_file_path)
+        except FileNotFoundError:
+            return False
+        if check_file_stat.st_size == 0:
+            return False
+        record_dict = lookup_archive_file(check_file_path)
+        if record_dict is None \
+                or record_dict['size'] != check_file_stat.st_size:
+            record_archive_file(check_file_path, check_file_stat)
+    conn = _get_archive_manifest_conn(archive_dir)
+    with conn:
+        _delete_sealed_day(conn, spec, date)
+        conn.execute(
+            'INSERT INTO sealed_days (spec, date, nfiles, sealed) '
+            +'VALUES (?, ?, ?, ?)',
+            (spec, date, len(check_file_list), time.time())
+        )
+        conn.executemany(
+            'INSERT OR IGNORE INTO sealed_day_files (spec, date, path) '
+            +'VALUES (?, ?, ?)',
+            [(spec, date,
+              os.path.relpath(os.path.abspath(check_file_path), archive_dir))
+             for check_file_path in check_file_list]
+        )
+    print("Sealed "+spec+" "+date+" with "+str(len(check_file_list))
+          +" files")
+    return True
+
+def reopen_days(archive_dir, spec, date=None):
+    """! Remove days from the archive manifest's completeness
+         ledger so they are checked again
+
+         Args:
+             archive_dir - string of full path to archive
+                           directory
+             spec        - string of what was checked for the
+                           days (e.g. model:cycle:fhrmin:fhrmax:fhrinc)
+             date        - string of date (YYYYmmdd),
+                           default: all dates
+    """
+    archive_dir = os.path.abspath(archive_dir)
+    if archive_dir not in _archive_manifest_root_list:
+        return
+    conn = _get_archive_manifest_conn(archive_dir)
+    with conn:
+        if date is None:
+            for table in ['sealed_days', 'sealed_day_files']:
+                conn.execute('DELETE FROM '+table+' WHERE spec = ?',
+                             (spec,))
+        else:
+            _delete_sealed_day(conn, spec, date)
+
+def get_fhr_list(FHR_MIN, FHR_MAX, FHR_INC, fhr_inc_change=None):
+    """! Get the forecast hours from a minimum to a maximum
+
+         Args:
+             FHR_MIN        - integer of minimum forecast hour
+             FHR_MAX        - integer of maximum forecast hour
+             FHR_INC        - integer of forecast hour increment
+             fhr_inc_change - tuple of forecast hour and the
+                              increment used from it on
+                              (e.g. (240, 12) for gfs),
+                              default: None (FHR_INC throughout)
+
+         Returns:
+             fhr_list       - list of integers of forecast hours
+    """
+    fhr_list = []
+    fhr = FHR_MIN
+    while fhr <= FHR_MAX:
+        fhr_list.append(fhr)
+        if fhr_inc_change is not None and fhr >= fhr_inc_change[0]:
+            fhr+=fhr_inc_change[1]
+        else:
+            fhr+=FHR_INC
+    return fhr_list
+
+def get_model_check_file_list(MODEL, CDATE, FHR_MIN, FHR_MAX, FHR_INC):
+    """! Get the files expected in a model's archive
+         directory for a cycle
+
+         Args:
+             MODEL           - string of model name
+             CDATE           - string of cycle date (YYYYmmddHH)
+             FHR_MIN         - integer of minimum forecast hour
+             FHR_MAX         - integer of maximum forecast hour
+             FHR_INC         - integer of forecast hour increment
+
+         Returns:
+             check_file_list - list of strings of file paths
+                               relative to the model's archive
+                               directory
+    """
+    check_file_list = []
+    if MODEL not in ['ecmg4']:
+        check_file_list.append('pgbanl.'+MODEL+'.'+CDATE+'.grib2')
+    if MODEL == 'ecm' and CDATE[8:10] in ['06', '18']:
+        FHR_MAX = 0
+    if MODEL == 'gfs':
+        fhr_inc_change = (240, 12)
+    else:
+        fhr_inc_change = None
+    for fhr in get_fhr_list(FHR_MIN, FHR_MAX, FHR_INC, fhr_inc_change):
+        fhr2 = str(fhr).zfill(2)
+        if MODEL == 'ecmg4':
+            check_file_list.append('flxf'+fhr2+'.ecm.'+CDATE)
+        else:
+            check_file_list.append(
+                'pgbf'+fhr2+'.'+MODEL+'.'+CDATE+'.grib2'
+            )
+        if MODEL == 'gfs' and fhr <= 240:
+            check_file_list.append('flxf'+fhr2+'.gfs.'+CDATE+'.grib2')
+    if MODEL == 'gfs':
+        check_file_list.append('pgbanl.gdas.'+CDATE+'.grib2')
+        check_file_list.append('pgbf00.gdas.'+CDATE+'.grib2')
+        check_file_list.append('pgbf06.gdas.'+CDATE+'.grib2')
+        check_file_list.append('atcfunix.gfs.'+CDATE)
+    return check_file_list
+
+@timed_operation('check_file', path_arg=0)
 def check_file(file_path):
-    """! Check if file exists and is not 0 sized
+    """! Check if file exists and is not 0 sized, a file
+         recorded in its archive manifest is taken as
+         existing without going to the file system, other
+         files are checked with one stat
 
          Args:
              file_path      - string of full path to
@@ -117,19 +2639,29 @@ def check_file(file_path):
             file_check_good - boolean of file status
 
     """
-    if os.path.exists(file_path):
-        if os.stat(file_path).st_size != 0:
+    if is_archived_file(file_path):
+        file_check_good = True
+        print("EXISTS "+file_path)
+        return file_check_good
+    try:
+        file_stat = os.stat(file_path)
+    except FileNotFoundError:
+        file_stat = None
+    if file_stat is not None:
+        if file_stat.st_size != 0:
             file_check_good = True
             print("EXISTS "+file_path)
         else:
             file_check_good = False
             print("SIZE 0, REMOVING "+file_path)
             os.remove(file_path)
+            remove_archive_file_record(file_path)
     else:
         file_check_good = False
         print("DOES NOT EXIST "+file_path)
     return file_check_good
 
+@timed_operation('copy_file', path_arg=1, size_arg=1)
 def copy_file(src, dest):
     """! Copy file if on machine locally
 
@@ -149,10 +2681,248 @@ def copy_file(src, dest):
     else:
         print("--- "+src+" DOES NOT EXIST")
     if os.path.exists(dest):
-        if os.stat(dest).st_size == 0:
+        dest_stat = os.stat(dest)
+        if dest_stat.st_size == 0:
             print("--- SIZE 0, REMOVING "+dest)
             os.remove(dest)
+            remove_archive_file_record(dest)
+        else:
+            record_archive_file(dest, file_stat=dest_stat)
+
+def _copy_file_data(src_fd, dest_fd, nbytes):
+    """! Copy file data between file descriptors in the
+         kernel when possible (copy_file_range, then
+         sendfile), otherwise through user space
+
+         Args:
+             src_fd  - integer of source file descriptor
+             dest_fd - integer of destination file descriptor
+             nbytes  - integer of number of bytes to copy
+    """
+    copied = 0
+    for copy_method in ['copy_file_range', 'sendfile']:
+        if not hasattr(os, copy_method):
+            continue
+        try:
+            while copied < nbytes:
+                if copy_method == 'copy_file_range':
+                    ncopy = os.copy_file_range(src_fd, dest_fd,
+                                               nbytes-copied)
+                else:
+                    ncopy = os.sendfile(dest_fd, src_fd, copied,
+                                        nbytes-copied)
+                if ncopy == 0:
+                    break
+                copied+=ncopy
+            return
+        except OSError:
+            if copied != 0:
+                raise
+    while copied < nbytes:
+        chunk = os.read(src_fd, min(16*1024*1024, nbytes-copied))
+        if not chunk:
+            break
+        os.write(dest_fd, chunk)
+        copied+=len(chunk)
+
+@timed_operation('stage_file', path_arg=1, size_arg=1)
+def stage_file(src, dest, restricted=False, link=False):
+    """! Put a file straight from its source into the archive:
+         copy in the kernel to a temporary name next to the
+         destination, fsync, and rename into place; hard link
+         instead only when asked to or when the source is
+         already in the same archive, so the archive never
+         shares an inode with production data
+
+         Args:
+             src          - string of full path to
+                            source file
+             dest         - string of full path to
+                            destintation file
+             restricted   - boolean, if True do not hard link
+                            and give the file rstprod
+                            permissions before it appears
+             link         - boolean, if True hard link when
+                            on the same file system
+
+         Returns:
+    """
+    if not os.path.exists(src):
+        print("--- "+src+" DOES NOT EXIST")
+        return
+    src_stat = os.stat(src)
+    if src_stat.st_size == 0:
+        print("--- SIZE 0, NOT STAGING "+src)
+        return
+    tmp_dest = os.path.join(
+        os.path.dirname(dest),
+        '.'+os.path.basename(dest)+'.tmp.'+str(os.getpid())
+    )
+    if os.path.exists(tmp_dest):
+        os.remove(tmp_dest)
+    dest_archive_dir = _get_archive_manifest_root(dest)
+    if not link and dest_archive_dir is not None:
+        link = _get_archive_manifest_root(src) == dest_archive_dir
+    if link and not restricted:
+        try:
+            os.link(src, tmp_dest)
+            os.replace(tmp_dest, dest)
+            print("--- HARD LINKING "+src+" TO "+dest)
+            record_archive_file(dest, file_stat=src_stat)
+            return
+        except OSError:
+            if os.path.exists(tmp_dest):
+                os.remove(tmp_dest)
+    print("--- STAGING "+src+" TO "+dest)
+    try:
+        src_fd = os.open(src, os.O_RDONLY)
+        try:
+            if restricted:
+                dest_file = open_restricted_file(tmp_dest, mode='xb')
+            else:
+                dest_file = os.fdopen(
+                    os.open(tmp_dest, os.O_WRONLY | os.O_CREAT | os.O_EXCL,
+                            0o600), 'wb'
+                )
+                os.fchmod(dest_file.fileno(), stat.S_IMODE(src_stat.st_mode))
+            with dest_file:
+                _copy_file_data(src_fd, dest_file.fileno(), src_stat.st_size)
+                os.fsync(dest_file.fileno())
+        finally:
+            os.close(src_fd)
+        os.utime(tmp_dest, ns=(src_stat.st_atime_ns, src_stat.st_mtime_ns))
+        if os.stat(tmp_dest).st_size != src_stat.st_size:
+            print("ERROR: "+tmp_dest+" size does not match "+src)
+            os.remove(tmp_dest)
+            return
+        os.replace(tmp_dest, dest)
+    except BaseException:
+        if os.path.exists(tmp_dest):
+            os.remove(tmp_dest)
+        raise
+    record_archive_file(dest)
+
+def make_scratch_dir(scratch_root=None, nbytes=None):
+    """! Make a private scratch directory for intermediate files,
+         by default in the first of EGA_SCRATCH_DIR (default
+         /dev/shm, so the files are kept in memory), TMPDIR,
+         and the current (run) directory that has room for
+         them; /dev/shm counts against the job's memory, so
+         it is only used when the bytes to be written are known
 
+         Args:
+             scratch_root - string of full path to directory
+                            to make it in,
+                            default: None (as above)
+             nbytes       - integer of bytes expected to be
+                            written in it, default: None
+                            (not known)
+
+         Returns:
+             scratch_dir  - string of full path to scratch
+                            directory, only readable by the
+                            user, the caller removes it
+    """
+    if scratch_root is None:
+        scratch_root = os.getcwd()
+        for scratch_area in [os.environ.get('EGA_SCRATCH_DIR', '/dev/shm'),
+                             os.environ.get('TMPDIR', '')]:
+            if scratch_area == '' or not os.path.isdir(scratch_area) \
+                    or not os.access(scratch_area, os.W_OK):
+                continue
+            if nbytes is None:
+                if scratch_area == '/dev/shm':
+                    continue
+                scratch_root = scratch_area
+                break
+            try:
+                scratch_stat = os.statvfs(scratch_area)
+                scratch_free = scratch_stat.f_bavail*scratch_stat.f_frsize
+            except OSError:
+                scratch_free = 0
+            if scratch_free >= nbytes*scratch_bytes_factor:
+                scratch_root = scratch_area
+                break
+            print("--- "+scratch_area+" HAS "+str(scratch_free)
+                  +" BYTES FREE, NOT USING IT FOR "+str(nbytes)+" BYTES")
+    os.makedirs(scratch_root, exist_ok=True)
+    return tempfile.mkdtemp(
+        prefix='ega_'+os.environ.get('USER', 'user')+'_', dir=scratch_root
+    )
+
+@timed_operation('update_file', path_arg=1)
+def update_file(src, dest):
+    """! Copy a source file into the archive unless the
+         archive copy came from the same, unchanged source:
+         the source's size, modification time, and inode are
+         checked against the fingerprint recorded when it
+         was copied, and the archive copy's own size and
+         modification time against the source's, so an
+         unchanged source is skipped with two stats and no
+         reads, and a changed source, an archive copy that
+         does not match the source (e.g. truncated), or an
+         archive copy that is a hard link to the source is
+         copied again
+
+         Args:
+             src          - string of full path to
+                            source file
+             dest         - string of full path to
+                            destintation file
+
+         Returns:
+             up_to_date   - boolean, True if the archive copy
+                            matches the source or the source
+                            is missing and an archive copy exists
+    """
+    try:
+        src_stat = os.stat(src)
+    except FileNotFoundError:
+        print("--- "+src+" DOES NOT EXIST")
+        return check_file(dest)
+    if src_stat.st_size == 0:
+        print("--- SIZE 0, NOT COPYING "+src)
+        return check_file(dest)
+    src_fingerprint = get_source_fingerprint(src, src_stat)
+    dest_fingerprint = lookup_source_fingerprint(dest)
+    try:
+        dest_stat = os.stat(dest)
+    except FileNotFoundError:
+        dest_stat = None
+    if dest_stat is None:
+        print("DOES NOT EXIST "+dest)
+    elif dest_stat.st_ino == src_stat.st_ino \
+            and dest_stat.st_dev == src_stat.st_dev:
+        print("--- "+dest+" IS A HARD LINK TO "+src+", COPYING")
+    elif dest_stat.st_size != src_stat.st_size:
+        print("--- "+dest+" SIZE "+str(dest_stat.st_size)+" DOES NOT "
+              +"MATCH "+src+" SIZE "+str(src_stat.st_size)
+              +", COPYING AGAIN")
+    elif dest_stat.st_mtime_ns != src_stat.st_mtime_ns:
+        print("--- "+dest+" MODIFICATION TIME DOES NOT MATCH "+src
+              +", COPYING AGAIN")
+    elif dest_fingerprint == src_fingerprint:
+        print("UNCHANGED "+dest)
+        dest_record = lookup_archive_file(dest)
+        if dest_record is None or dest_record['size'] != dest_stat.st_size:
+            record_archive_file(dest, file_stat=dest_stat)
+        return True
+    elif dest_fingerprint is None:
+        # Copied before fingerprints were kept, the sizes match
+        print("EXISTS "+dest)
+        record_archive_file(dest, file_stat=dest_stat)
+        record_source_fingerprint(dest, src_fingerprint)
+        return True
+    else:
+        print("--- "+src+" CHANGED SINCE "+dest+" WAS COPIED, "
+              +"COPYING AGAIN")
+    stage_file(src, dest)
+    if os.path.exists(dest) and os.stat(dest).st_size == src_stat.st_size:
+        record_source_fingerprint(dest, src_fingerprint)
+        return True
+    return False
+
+@timed_operation('link_file', path_arg=1)
 def link_file(src, dest):
     """! Link file if on machine locally
 
@@ -173,10 +2943,456 @@ def link_file(src, dest):
     else:
         print("DOES NOT EXIST "+src)
     if os.path.exists(dest):
-        if os.stat(dest).st_size == 0:
+        dest_stat = os.stat(dest)
+        if dest_stat.st_size == 0:
             print("--- SIZE 0, REMOVING "+dest)
             os.remove(dest)
+            remove_archive_file_record(dest)
+        else:
+            record_archive_file(dest, file_stat=dest_stat)
+
+def get_product_alias_target(file_path):
+    """! Get the file a product alias is the same as
+
+         Args:
+             file_path - string of full path to file
+
+         Returns:
+             target    - string of full path to file it
+                         is the same as, None if it is
+                         not an alias
+    """
+    file_name = os.path.basename(file_path)
+    for alias_prefix, target_prefix in product_alias_dict.items():
+        if file_name.startswith(alias_prefix):
+            return os.path.join(
+                os.path.dirname(file_path),
+                target_prefix+file_name[len(alias_prefix):]
+            )
+    return None
+
+@timed_operation('link_product_alias', path_arg=1)
+def link_product_alias(target, alias):
+    """! Hard link a product alias to the file it is the
+         same as, replacing an older symbolic link alias;
+         symbolically links when the two can not be hard
+         linked
+
+         Args:
+             target - string of full path to file
+             alias  - string of full path to alias
+
+         Returns:
+    """
+    if not os.path.exists(target):
+        print("DOES NOT EXIST "+target)
+        return
+    if os.path.exists(alias) and not os.path.islink(alias) \
+            and os.path.samefile(target, alias):
+        return
+    print("--- HARD LINKING "+target+" TO "+alias)
+    tmp_alias = os.path.join(
+        os.path.dirname(alias),
+        '.'+os.path.basename(alias)+'.tmp.'+str(os.getpid())
+    )
+    try:
+        os.link(target, tmp_alias)
+    except OSError as e:
+        print("--- COULD NOT HARD LINK "+target+": "+str(e))
+        if not os.path.lexists(alias):
+            link_file(target, alias)
+        return
+    os.replace(tmp_alias, alias)
+    record_archive_file(alias)
+
+def get_htar_file_list(file_list):
+    """! Order files to put in an HPSS tar so product aliases
+         come after the files they are the same as, so htar
+         stores each hard linked alias as a link member and
+         not the data a second time; symbolic link aliases
+         are listed as they are and stored as links
+
+         Args:
+             file_list      - list of paths to files
+
+         Returns:
+             htar_file_list - list of paths to files
+    """
+    alias_file_list = []
+    htar_file_list = []
+    for file_path in sorted(file_list):
+        target = get_product_alias_target(file_path)
+        if target is not None and os.path.exists(target):
+            alias_file_list.append(file_path)
+        else:
+            htar_file_list.append(file_path)
+    return htar_file_list+alias_file_list
+
+def create_htar(hpss_tar, file_list):
+    """! Create an HPSS tar of files, passing htar the
+         files in a list file
+
+         Args:
+             hpss_tar  - string of full path to HPSS tar
+             file_list - list of paths to files
+
+         Returns:
+             result    - CommandResult of htar
+    """
+    scratch_dir = make_scratch_dir(tempfile.gettempdir())
+    try:
+        htar_list_file = os.path.join(scratch_dir, 'htar_file_list')
+        with open(htar_list_file, 'w') as htar_list:
+            for file_path in get_htar_file_list(file_list):
+                htar_list.write(file_path+'\n')
+        return run_shell_command(['htar', '-cvf', hpss_tar,
+                                  '-L', htar_list_file])
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+def _write_grib_records(src, dest, record_list):
+    """! Copy the bytes of GRIB messages from one file to
+         a temporary name next to another, then rename it
+         into place
+
+         Args:
+             src         - string of full path to source file
+             dest        - string of full path to destination
+                           file
+             record_list - list of dictionaries with each
+                           message's offset and length, in
+                           file order
+    """
+    range_list = []
+    for record in record_list:
+        # Merge messages next to each other into one write
+        if len(range_list) != 0 and range_list[-1][1] == record['offset']:
+            range_list[-1][1] = record['offset']+record['length']
+        else:
+            range_list.append([record['offset'],
+                               record['offset']+record['length']])
+    tmp_dest = os.path.join(
+        os.path.dirname(dest),
+        '.'+os.path.basename(dest)+'.tmp.'+str(os.getpid())
+    )
+    try:
+        with open(src, 'rb') as grib_file:
+            with mmap.mmap(grib_file.fileno(), 0,
+                           access=mmap.ACCESS_READ) as grib_mm:
+                with memoryview(grib_mm) as grib_view:
+                    with open(tmp_dest, 'wb') as dest_file:
+                        os.fchmod(dest_file.fileno(), stat.S_IMODE(
+                            os.fstat(grib_file.fileno()).st_mode
+                        ))
+                        for start, end in range_list:
+                            dest_file.write(grib_view[start:end])
+        os.replace(tmp_dest, dest)
+    except BaseException:
+        if os.path.exists(tmp_dest):
+            os.remove(tmp_dest)
+        raise
+
+def scan_grib1_file(file_path):
+    """! Index the messages in a GRIB1 file in one pass,
+         reading only the indicator section and the start
+         of the product definition section of each message
+
+         Args:
+             file_path   - string of full path to GRIB1 file
+
+         Returns:
+             record_list - list of dictionaries with each
+                           message's offset, length, table
+                           version, parameter, and level type,
+                           None if the file can not be indexed
+                           here (not GRIB1, ECMWF large
+                           messages, or truncated)
+    """
+    record_list = []
+    with open(file_path, 'rb') as grib_file:
+        file_size = os.fstat(grib_file.fileno()).st_size
+        if file_size == 0:
+            return record_list
+        with mmap.mmap(grib_file.fileno(), 0,
+                       access=mmap.ACCESS_READ) as grib_mm:
+            offset = grib_mm.find(b'GRIB')
+            while offset != -1:
+                if offset+18 > file_size:
+                    return None
+                message_length = int.from_bytes(
+                    grib_mm[offset+4:offset+7], 'big'
+                )
+                # Edition 1 only, and no ECMWF large messages
+                # whose length does not fit in octets 5-7
+                if grib_mm[offset+7] != 1 or message_length & 0x800000:
+                    return None
+                if offset+message_length > file_size \
+                        or grib_mm[offset+message_length-4:
+                                   offset+message_length] != b'7777':
+                    return None
+                pds_offset = offset+8
+                record_list.append({
+                    'offset': offset,
+                    'length': message_length,
+                    'table': grib_mm[pds_offset+3],
+                    'param': grib_mm[pds_offset+8],
+                    'level_type': grib_mm[pds_offset+9]
+                })
+                offset = grib_mm.find(b'GRIB', offset+message_length)
+    return record_list
+
+@timed_operation('extract_grib1_records', path_arg=1, size_arg=1)
+def extract_grib1_records(src, dest, param_dict, wgrib, table=128,
+                          level_type=None):
+    """! Write the GRIB1 messages of given parameters from
+         one file to another, copying the messages' bytes
+         as they are without decoding them. Falls back to
+         wgrib when the file can not be indexed in process.
+
+         Args:
+             src        - string of full path to source
+                          GRIB1 file
+             dest       - string of full path to
+                          destination GRIB1 file
+             param_dict - dictionary of wgrib parameter
+                          names to parameter codes
+             wgrib      - string of full path to wgrib
+                          executable
+             table      - integer of parameter table version,
+                          default: 128 (ECMWF)
+             level_type - integer of level type (kpds6) to
+                          keep, default: None (all)
+
+         Returns:
+             nrecords   - integer of number of messages
+                          written, None if wgrib was used
+    """
+    record_list = scan_grib1_file(src)
+    if record_list is None:
+        print("--- "+src+" NOT INDEXED, USING "+wgrib)
+        if level_type is None:
+            match_list = [':'+name+':' for name in param_dict]
+        else:
+            match_list = [':kpds5='+str(code)+':kpds6='+str(level_type)+':'
+                          for code in param_dict.values()]
+        run_shell_command(
+            [wgrib+' '+src+' | '
+             +'egrep "('+'|'.join(match_list)+')" | '
+             +wgrib+' '+src+' -i -grib -o '+dest], shell=True
+        )
+        return None
+    param_code_list = list(param_dict.values())
+    keep_record_list = []
+    for record in record_list:
+        if record['table'] == table and record['param'] in param_code_list \
+                and (level_type is None
+                     or record['level_type'] == level_type):
+            keep_record_list.append(record)
+    print("--- EXTRACTING "+str(len(keep_record_list))+" of "
+          +str(len(record_list))+" GRIB1 records from "+src+" TO "+dest)
+    if len(keep_record_list) != 0:
+        _write_grib_records(src, dest, keep_record_list)
+    return len(keep_record_list)
+
+def scan_grib2_file(file_path):
+    """! Index the messages in a GRIB2 file in one pass,
+         reading only the indicator section and walking the
+         section headers to the product definition section
+         of each message
+
+         Args:
+             file_path   - string of full path to GRIB2 file
+
+         Returns:
+             record_list - list of dictionaries with each
+                           message's offset, length, discipline,
+                           parameter category and number, first
+                           fixed surface type and value (None
+                           if missing), None if the file can
+                           not be indexed here (not GRIB2, more
+                           than one field in a message, or
+                           truncated)
+    """
+    record_list = []
+    with open(file_path, 'rb') as grib_file:
+        file_size = os.fstat(grib_file.fileno()).st_size
+        if file_size == 0:
+            return record_list
+        with mmap.mmap(grib_file.fileno(), 0,
+                       access=mmap.ACCESS_READ) as grib_mm:
+            offset = grib_mm.find(b'GRIB')
+            while offset != -1:
+                if offset+16 > file_size or grib_mm[offset+7] != 2:
+                    return None
+                message_length = int.from_bytes(
+                    grib_mm[offset+8:offset+16], 'big'
+                )
+                message_end = offset+message_length
+                if message_end > file_size \
+                        or grib_mm[message_end-4:message_end] != b'7777':
+                    return None
+                record = None
+                section_offset = offset+16
+                while section_offset < message_end-4:
+                    section_length = int.from_bytes(
+                        grib_mm[section_offset:section_offset+4], 'big'
+                    )
+                    if section_length < 5 \
+                            or section_offset+section_length > message_end:
+                        return None
+                    if grib_mm[section_offset+4] == 4:
+                        if record is not None or section_length < 28:
+                            return None
+                        scale_factor = grib_mm[section_offset+23]
+                        scaled_value = int.from_bytes(
+                            grib_mm[section_offset+24:section_offset+28],
+                            'big'
+                        )
+                        if scale_factor == 255 \
+                                or scaled_value == 0xFFFFFFFF:
+                            surface_value = None
+                        else:
+                            # Sign bit, not two's complement
+                            if scale_factor & 0x80:
+                                scale_factor = -(scale_factor & 0x7F)
+                            surface_value = (scaled_value
+                                             *10.**(-scale_factor))
+                        record = {
+                            'offset': offset,
+                            'length': message_length,
+                            'discipline': grib_mm[offset+6],
+                            'category': grib_mm[section_offset+9],
+                            'number': grib_mm[section_offset+10],
+                            'surface_type': grib_mm[section_offset+22],
+                            'surface_value': surface_value
+                        }
+                    section_offset+=section_length
+                if record is None:
+                    return None
+                record_list.append(record)
+                offset = grib_mm.find(b'GRIB', message_end)
+    return record_list
+
+def read_grib2_idx(idx_file, file_path):
+    """! Read the wgrib2 inventory written next to a GRIB2
+         file, checking its offsets against the file
+
+         Args:
+             idx_file    - string of full path to inventory
+             file_path   - string of full path to GRIB2 file
+
+         Returns:
+             record_list - list of dictionaries with each
+                           message's offset, length, and
+                           inventory line, None if there is no
+                           usable inventory (missing, older
+                           than the file, has fields sharing
+                           a message, or does not match the
+                           file)
+    """
+    if not os.path.exists(idx_file) \
+            or os.stat(idx_file).st_mtime < os.stat(file_path).st_mtime:
+        return None
+    record_list = []
+    with open(idx_file, 'r') as idx:
+        for line in idx:
+            line = line.strip()
+            if line == '':
+                continue
+            line_split = line.split(':')
+            if len(line_split) < 3 or '.' in line_split[0] \
+                    or not line_split[1].isdigit():
+                return None
+            record_list.append({'offset': int(line_split[1]),
+                                'inventory': line})
+    file_size = os.stat(file_path).st_size
+    for nrecord, record in enumerate(record_list):
+        if nrecord+1 < len(record_list):
+            record['length'] = (record_list[nrecord+1]['offset']
+                                -record['offset'])
+        else:
+            record['length'] = file_size-record['offset']
+        if record['length'] <= 0:
+            return None
+    return record_list
+
+@timed_operation('extract_grib2_records', path_arg=1, size_arg=1)
+def extract_grib2_records(src, dest, field_dict, wgrib2):
+    """! Write the GRIB2 messages of given fields from one
+         file to another, copying the messages' bytes as they
+         are without decoding them. Uses the wgrib2 inventory
+         next to the file when there is one, otherwise walks
+         the file's section headers, and falls back to
+         wgrib2 -match when neither can be used.
 
+         Args:
+             src        - string of full path to source
+                          GRIB2 file
+             dest       - string of full path to
+                          destination GRIB2 file
+             field_dict - dictionary of wgrib2 inventory
+                          names (e.g. 'TMP:2 m above ground')
+                          to tuples of discipline, parameter
+                          category, parameter number, first
+                          fixed surface type, and value (None
+                          for any)
+             wgrib2     - string of full path to wgrib2
+                          executable
+
+         Returns:
+             nrecords   - integer of number of messages
+                          written, None if wgrib2 was used
+    """
+    match = '|'.join(['(:'+name+':)' for name in field_dict])
+    keep_record_list = None
+    record_list = read_grib2_idx(src+'.idx', src)
+    if record_list is not None:
+        keep_record_list = [record for record in record_list
+                            if re.search(match, record['inventory'])]
+        # The inventory must point at whole messages of this file
+        with open(src, 'rb') as grib_file:
+            for record in keep_record_list:
+                grib_file.seek(record['offset'])
+                indicator = grib_file.read(16)
+                if indicator[0:4] != b'GRIB' or int.from_bytes(
+                        indicator[8:16], 'big') != record['length']:
+                    keep_record_list = None
+                    break
+        index_name = 'inventory '+src+'.idx'
+    if keep_record_list is None:
+        record_list = scan_grib2_file(src)
+        if record_list is not None:
+            keep_record_list = []
+            for record in record_list:
+                for field in field_dict.values():
+                    if (record['discipline'], record['category'],
+                            record['number'], record['surface_type']) \
+                            == field[0:4] \
+                            and (field[4] is None
+                                 or record['surface_value'] == field[4]):
+                        keep_record_list.append(record)
+                        break
+            index_name = 'section headers'
+    if keep_record_list is None:
+        print("--- "+src+" NOT INDEXED, USING "+wgrib2)
+        tmp_dest = os.path.join(
+            os.path.dirname(dest),
+            '.'+os.path.basename(dest)+'.tmp.'+str(os.getpid())
+        )
+        run_shell_command(
+            [wgrib2, src, '-match', match, '-grib', tmp_dest]
+        )
+        if os.path.exists(tmp_dest):
+            os.replace(tmp_dest, dest)
+        return None
+    print("--- EXTRACTING "+str(len(keep_record_list))+" of "
+          +str(len(record_list))+" GRIB2 records from "+src+" TO "+dest
+          +" using "+index_name)
+    if len(keep_record_list) != 0:
+        _write_grib_records(src, dest, keep_record_list)
+    return len(keep_record_list)
+
+@timed_operation('convert_grib1_to_grib2', path_arg=1, size_arg=1)
 def convert_grib1_to_grib2(file_grib1, file_grib2, cnvgrib):
     """! Convert file from GRIB1 to GRIB2
          
@@ -195,6 +3411,7 @@ def convert_grib1_to_grib2(file_grib1, file_grib2, cnvgrib):
         [cnvgrib, '-g12', file_grib1, file_grib2]
     )
 
+@timed_operation('convert_grib2_to_grib1', path_arg=1, size_arg=1)
 def convert_grib2_to_grib1(file_grib2, file_grib1, cnvgrib):
     """! Convert file from GRIB2 to GRIB1
          
@@ -213,6 +3430,130 @@ def convert_grib2_to_grib1(file_grib2, file_grib1, cnvgrib):
         [cnvgrib, '-g21', file_grib2, file_grib1]
     )
 
+def _convert_grib_batch(file_pair_list, grib_option, cnvgrib):
+    """! Convert a batch of files with one cnvgrib run on the
+         files put together, then split the output back into
+         a file for each input by message count; converts the
+         files one at a time when a file can not be indexed or
+         the output does not line up with the inputs
+
+         Args:
+             file_pair_list - list of tuples of full paths to
+                              in and out files
+             grib_option    - string of cnvgrib option, g12
+                              or g21
+             cnvgrib        - string of full path to
+                              cnvgrib executable
+
+         Returns:
+    """
+    if grib_option == 'g21':
+        scan_in, scan_out = scan_grib2_file, scan_grib1_file
+    else:
+        scan_in, scan_out = scan_grib1_file, scan_grib2_file
+    nmessage_list = []
+    if len(file_pair_list) > 1:
+        for file_in, file_out in file_pair_list:
+            record_list = scan_in(file_in)
+            if record_list is None or len(record_list) == 0:
+                nmessage_list = []
+                break
+            nmessage_list.append(len(record_list))
+    if len(nmessage_list) != 0:
+        # The batch files are as large as all the inputs, so they
+        # go next to the inputs rather than in memory
+        scratch_dir = make_scratch_dir(
+            os.path.dirname(os.path.abspath(file_pair_list[0][0]))
+        )
+        try:
+            batch_in = os.path.join(scratch_dir, 'batch.in')
+            batch_out = os.path.join(scratch_dir, 'batch.out')
+            batch_in_fd = os.open(batch_in, os.O_WRONLY | os.O_CREAT, 0o600)
+            try:
+                for file_in, file_out in file_pair_list:
+                    file_in_fd = os.open(file_in, os.O_RDONLY)
+                    try:
+                        _copy_file_data(file_in_fd, batch_in_fd,
+                                        os.fstat(file_in_fd).st_size)
+                    finally:
+                        os.close(file_in_fd)
+            finally:
+                os.close(batch_in_fd)
+            print("--- CONVERTING "+str(len(file_pair_list))+" files from "
+                  +os.path.dirname(file_pair_list[0][0])+" with one "
+                  +"cnvgrib -"+grib_option)
+            run_shell_command([cnvgrib, '-'+grib_option, batch_in, batch_out])
+            out_record_list = None
+            if os.path.exists(batch_out):
+                out_record_list = scan_out(batch_out)
+            if out_record_list is not None \
+                    and len(out_record_list) == sum(nmessage_list):
+                start = 0
+                for (file_in, file_out), nmessage in zip(file_pair_list,
+                                                         nmessage_list):
+                    _write_grib_records(
+                        batch_out, file_out,
+                        out_record_list[start:start+nmessage]
+                    )
+                    start+=nmessage
+                return
+            print("--- cnvgrib OUTPUT DOES NOT LINE UP WITH ITS INPUTS, "
+                  +"CONVERTING ONE FILE AT A TIME")
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+    for file_in, file_out in file_pair_list:
+        if grib_option == 'g21':
+            convert_grib2_to_grib1(file_in, file_out, cnvgrib)
+        else:
+            convert_grib1_to_grib2(file_in, file_out, cnvgrib)
+
+def convert_grib_files(file_pair_list, grib_option, cnvgrib, nworkers=1):
+    """! Convert many files between GRIB1 and GRIB2, putting
+         files from the same directory together into batches
+         converted by one cnvgrib run each, with the batches
+         run by a pool of workers
+
+         Args:
+             file_pair_list - list of tuples of full paths to
+                              in and out files
+             grib_option    - string of cnvgrib option, g12
+                              or g21
+             cnvgrib        - string of full path to
+                              cnvgrib executable
+             nworkers       - integer of number of worker
+                              processes, default: 1
+
+         Returns:
+             failed_list    - list of names of batches that
+                              failed
+    """
+    dir_batch_list_dict = collections.OrderedDict()
+    for file_in, file_out in file_pair_list:
+        if not os.path.exists(file_in) or os.stat(file_in).st_size == 0:
+            print("--- "+file_in+" DOES NOT EXIST OR IS EMPTY, NOT CONVERTING")
+            continue
+        file_in_size = os.stat(file_in).st_size
+        batch_list = dir_batch_list_dict.setdefault(
+            os.path.dirname(os.path.abspath(file_in)), []
+        )
+        if len(batch_list) == 0 \
+                or len(batch_list[-1]['pairs']) >= convert_batch_max_files \
+                or batch_list[-1]['bytes']+file_in_size \
+                    > convert_batch_max_bytes:
+            batch_list.append({'pairs': [], 'bytes': 0})
+        batch_list[-1]['pairs'].append((file_in, file_out))
+        batch_list[-1]['bytes']+=file_in_size
+    work_unit_list = []
+    for batch_dir, batch_list in dir_batch_list_dict.items():
+        for nbatch, batch in enumerate(batch_list):
+            work_unit_list.append(
+                ('cnvgrib -'+grib_option+' '+batch_dir+' batch '
+                 +str(nbatch+1)+' of '+str(len(batch_list)),
+                 _convert_grib_batch, (batch['pairs'], grib_option, cnvgrib))
+            )
+    return run_work_units(work_unit_list, nworkers)
+
+@timed_operation('regrid_copygb', path_arg=1, size_arg=1)
 def regrid_copygb(file_in, file_out, grid, copygb):
     """! Convert file from GRIB2 to GRIB1
          
@@ -232,13 +3573,104 @@ def regrid_copygb(file_in, file_out, grid, copygb):
         [copygb, '-g'+grid, '-x', file_in, file_out]
     )
 
+@functools.lru_cache(maxsize=None)
+def get_rstprod_gid():
+    """! Get the group id of rstprod, looked up once
+
+         Args:
+
+         Returns:
+             rstprod_gid - integer of rstprod group id,
+                           None if there is no rstprod group
+    """
+    try:
+        return grp.getgrnam('rstprod').gr_gid
+    except KeyError:
+        print("ERROR: group rstprod does not exist")
+        return None
+
+def _set_path_rstprod_permissions(path, path_fd=None):
+    """! Set mode 750 and group rstprod on one path
+
+         Args:
+             path    - string of full path to file or
+                       directory
+             path_fd - integer of open file descriptor of
+                       path to use instead of the path
+    """
+    rstprod_gid = get_rstprod_gid()
+    try:
+        if path_fd is None:
+            os.chmod(path, 0o750)
+        else:
+            os.fchmod(path_fd, 0o750)
+    except OSError as err:
+        print("ERROR: chmod 750 "+path+" failed: "+str(err))
+    if rstprod_gid is not None:
+        try:
+            if path_fd is None:
+                os.chown(path, -1, rstprod_gid)
+            else:
+                os.fchown(path_fd, -1, rstprod_gid)
+        except OSError as err:
+            print("ERROR: chgrp rstprod "+path+" failed: "+str(err))
+
 def set_rstprod_permissions(file_path):
     """! Change files permissions and group
          to rstprod
          
          Args:
              file_path      - string of full path to
-                              file
+                              file, may be a glob pattern
+    """
+    if any(mark in file_path for mark in ['*', '?', '[']):
+        path_list = sorted(glob.glob(file_path))
+    else:
+        path_list = [file_path]
+    print("--- SETTING rstprod PERMISSIONS "+file_path)
+    for path in path_list:
+        _set_path_rstprod_permissions(path)
+
+def set_rstprod_permissions_tree(top_dir):
+    """! Change permissions and group to rstprod for a
+         directory and everything under it
+
+         Args:
+             top_dir - string of full path to directory
+    """
+    print("--- SETTING rstprod PERMISSIONS under "+top_dir)
+    _set_path_rstprod_permissions(top_dir)
+    scan_dir_list = [top_dir]
+    while len(scan_dir_list) != 0:
+        scan_dir = scan_dir_list.pop()
+        with os.scandir(scan_dir) as scan_dir_entries:
+            for entry in scan_dir_entries:
+                if entry.is_symlink():
+                    continue
+                _set_path_rstprod_permissions(entry.path)
+                if entry.is_dir():
+                    scan_dir_list.append(entry.path)
+
+def open_restricted_file(file_path, mode='wb'):
+    """! Open a file for writing that has rstprod
+         permissions from the moment it is created
+
+         Args:
+             file_path - string of full path to file
+             mode      - string of write mode
+                         (w, wb, a, ab, or xb to fail
+                         if the file exists)
+
+         Returns:
+             file_obj  - open file object
     """
-    run_shell_command(['chmod', '750', file_path])
-    run_shell_command(['chgrp', 'rstprod', file_path])
+    flags = os.O_WRONLY | os.O_CREAT
+    if mode.startswith('a'):
+        flags|=os.O_APPEND
+    elif mode.startswith('x'):
+        flags|=os.O_EXCL
+    else:
+        flags|=os.O_TRUNC
+    file_fd = os.open(file_path, flags, 0o700)
+    _set_path_rstprod_permissions(file_path, path_fd=file_fd)
+    return os.fdopen(file_fd, mode.replace('x', 'w'))
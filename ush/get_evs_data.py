@@ -162,6 +162,11 @@ if run_settings_dict['SENDARCH'] == 'YES':
     if not os.path.exists(global_det_stats_archive_dir):
         print("Making directory "+global_det_stats_archive_dir)
         os.makedirs(global_det_stats_archive_dir)
+
+# Open archive manifest
+if os.path.exists(run_settings_dict['ARCHIVE_DIR']):
+    ega_util.open_archive_manifest(run_settings_dict['ARCHIVE_DIR'])
+
 base_model_run_dir = os.path.join(
     run_settings_dict['RUN_DIR'], run_settings_dict['MODEL']
 )
@@ -174,6 +179,9 @@ print("In run directory: "+base_model_run_dir)
 # Set verif_case for model
 verif_case_list = ['grid2grid', 'grid2obs']
 
+# Start operation timing log
+ega_util.start_timing_log(run_settings_dict['RUN_DIR'], 'get_evs_data')
+
 # Get files
 for PDYm_key in list(PDYm_dict.keys()):
     PDYm = PDYm_dict[PDYm_key]
@@ -203,13 +211,15 @@ for PDYm_key in list(PDYm_dict.keys()):
                 +f"atmos.{verif_case}.v{PDYm}.stat"
             )
             if ega_util.check_file(source_file):
-                ega_util.copy_file(source_file, run_file)
                 if run_settings_dict['SENDARCH'] == 'YES':
                     if not os.path.exists(archive_file.rpartition('/')[0]):
                         print("Making directory "
                               +archive_file.rpartition('/')[0])
                         os.makedirs(archive_file.rpartition('/')[0])
-                    ega_util.copy_file(run_file, archive_file)
+                    ega_util.stage_file(source_file, archive_file)
                     ega_util.check_file(archive_file)
+                else:
+                    ega_util.copy_file(source_file, run_file)
 
+ega_util.print_timing_summary()
 print("\nEND: "+sys.argv[0]+" at "+str(datetime.datetime.today())+"\n")
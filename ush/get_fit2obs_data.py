@@ -162,6 +162,11 @@ if run_settings_dict['SENDARCH'] == 'YES':
         os.makedirs(model_archive_dir)
         if run_settings_dict['MODEL'] == 'fnl':
             ega_util.set_rstprod_permissions(model_archive_dir)
+
+# Open archive manifest
+if os.path.exists(run_settings_dict['ARCHIVE_DIR']):
+    ega_util.open_archive_manifest(run_settings_dict['ARCHIVE_DIR'])
+
 base_model_run_dir = os.path.join(
     run_settings_dict['RUN_DIR'], run_settings_dict['MODEL']
 )
@@ -173,6 +178,9 @@ if not os.path.exists(base_model_run_dir):
 os.chdir(base_model_run_dir)
 print("In run directory: "+base_model_run_dir)
 
+# Start operation timing log
+ega_util.start_timing_log(run_settings_dict['RUN_DIR'], 'get_fit2obs_data')
+
 # fnl - Operational GFS
 if run_settings_dict['MODEL'] == 'fnl':
     model_prod_dir = os.path.join(
@@ -200,6 +208,7 @@ if run_settings_dict['MODEL'] == 'fnl':
                     ega_util.run_shell_command(
                         ['tar','-xvf', source_tar, '-C', model_run_dir]
                     )
+                    ega_util.set_rstprod_permissions_tree(model_run_dir)
                     if run_settings_dict['SENDARCH'] == 'YES':
                         for fit2obs_mid_dir in ['fits', 'horiz/fcs',
                                                 'horiz/anl']:
@@ -239,4 +248,5 @@ else:
     print(run_settings_dict['MODEL']+" not recongized")
     sys.exit(1)
 
+ega_util.print_timing_summary()
 print("\nEND: "+sys.argv[0]+" at "+str(datetime.datetime.today())+"\n")
@@ -24,6 +24,30 @@ Command Line Agruments:
                   default: 120
         --fhrinc: optional, forecast hour increment
                   default: 24
+        --modelspecs: optional, comma separated list of
+                      model:cycle:fhrmin:fhrmax:fhrinc to get
+                      in one run, overrides --model, --cycle,
+                      --fhrmin, --fhrmax, and --fhrinc
+                      default: none
+        --reopen: optional, YES to check days already sealed
+                  as complete in the archive manifest again
+                  default: NO
+        --workers: optional, number of worker processes to
+                   run independent date/cycle/forecast hour
+                   work units with
+                   default: 1
+        --readiness: optional, YES to get only --date, polling
+                     for each forecast hour's source files and
+                     getting it as soon as they have stopped
+                     growing, for models whose recipe supports it
+                     default: NO
+        --deadline: optional, minutes to keep polling with
+                    --readiness=YES
+                    default: 360
+        --subset: optional, YES to download only the fields
+                  verification uses, for models whose recipe
+                  lists them
+                  default: NO
 Input Files:
 Output Files:
 Condition codes: 0 for success, 1 for failure
@@ -32,7 +56,8 @@ Condition codes: 0 for success, 1 for failure
 import os
 import sys
 import datetime
-import subprocess
+import shutil
+import time
 import emc_global_archive_util as ega_util
 
 print("\nBEGIN: "+sys.argv[0]+" at "+str(datetime.datetime.today())+"\n")
@@ -61,7 +86,21 @@ def usage():
            +"   --fhrmax=FHR_MAX        optional, "
            +"default: 120\n"
            +"   --fhrinc=FHR_INC        optional, "
-           +"default: 24\n")
+           +"default: 24\n"
+           +"   --modelspecs=MODEL_SPECS optional, "
+           +"model:cycle:fhrmin:fhrmax:fhrinc[,...], "
+           +"default: none\n"
+           +"   --reopen=REOPEN         optional, "
+           +"default: NO\n"
+           +"   --workers=NWORKERS      optional, "
+           +"default: 1\n"
+           +"   --readiness=READINESS   optional, "
+           +"default: NO\n"
+           +"   --deadline=DEADLINE     optional, "
+           +"minutes to poll with --readiness=YES, "
+           +"default: 360\n"
+           +"   --subset=SUBSET         optional, "
+           +"default: NO\n")
     sys.exit(1)
 
 # Command line agrument information
@@ -99,6 +138,30 @@ cmd_line_args_dict = {
     '--fhrinc=': {
         'run_name': 'FHR_INC',
         'default': '24'
+    },
+    '--modelspecs=': {
+        'run_name': 'MODEL_SPECS',
+        'default': ''
+    },
+    '--reopen=': {
+        'run_name': 'REOPEN',
+        'default': 'NO'
+    },
+    '--workers=': {
+        'run_name': 'NWORKERS',
+        'default': '1'
+    },
+    '--readiness=': {
+        'run_name': 'READINESS',
+        'default': 'NO'
+    },
+    '--deadline=': {
+        'run_name': 'DEADLINE',
+        'default': '360'
+    },
+    '--subset=': {
+        'run_name': 'SUBSET',
+        'default': 'NO'
     }
 }
 
@@ -110,7 +173,7 @@ for help_arg in help_args:
         sys.exit(0)
 
 # Check number of command line arguments
-if len(sys.argv[1:]) > 8:
+if len(sys.argv[1:]) > 14:
     print("Too many agruments")
     usage()
 
@@ -119,6 +182,11 @@ run_settings_dict = {}
 
 # Run settings: hard coded
 print("Hard coded settings...")
+# Seconds between polls with --readiness=YES, from the
+# min right after a file appears or grows, backing off
+# to the max while nothing changes
+run_settings_dict['ready_poll_min_seconds'] = 30
+run_settings_dict['ready_poll_max_seconds'] = 600
 for run_name in list(run_settings_dict.keys()):
     print(run_name+' = '+str(run_settings_dict[run_name]))
 
@@ -170,6 +238,7 @@ env_var_dict = {
     'gefs_ver': 'v12.3',
     'gfs_ver': 'v16.3',
     'naefs_ver': 'v6.1',
+    'GRAPHCASTGFS_URL': 'https://noaa-nws-graphcastgfs-pds.s3.amazonaws.com',
     'HOMEemc_global_archive': os.path.join(os.getcwd(), '..'),
     'SENDARCH': 'YES'
 }
@@ -190,483 +259,1061 @@ for run_name in list(run_settings_dict.keys()):
     print(run_name+' = '+str(run_settings_dict[run_name]))
 print("")
 
+# Check number of workers
+if not run_settings_dict['NWORKERS'].isdigit() \
+        or int(run_settings_dict['NWORKERS']) < 1:
+    print("--workers must be a positive integer, got "
+          +run_settings_dict['NWORKERS'])
+    sys.exit(1)
+
 # Get dates
 PDYm_dict = ega_util.get_PDYm_dict(run_settings_dict['PDY'])
 
 # Set up WCOSS2 dictionary
 wcoss2_dict = ega_util.get_machine_dict()
 
-# Make archive directory
-model_archive_dir = os.path.join(
-    run_settings_dict['ARCHIVE_DIR'], run_settings_dict['MODEL']
-)
-if run_settings_dict['SENDARCH'] == 'YES':
-    if not os.path.exists(model_archive_dir):
-        print("Making directory "+model_archive_dir)
-        os.makedirs(model_archive_dir)
-        if run_settings_dict['MODEL'] in ['ecm', 'ecmg4']:
-            ega_util.set_rstprod_permissions(model_archive_dir)
-base_model_run_dir = os.path.join(
-    run_settings_dict['RUN_DIR'], run_settings_dict['MODEL']
-)
-if not os.path.exists(base_model_run_dir):
-    print("Making directory "+base_model_run_dir)
-    os.makedirs(base_model_run_dir)
-    if run_settings_dict['MODEL'] in ['ecm', 'ecmg4']:
-        ega_util.set_rstprod_permissions(base_model_run_dir)
-os.chdir(base_model_run_dir)
-print("In run directory: "+base_model_run_dir)
-
-# Get model data
-# ecm - Operational European Center for Medium-Range Weather Forecasts
-if run_settings_dict['MODEL'] == 'ecm':
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        CDATE = PDYm+run_settings_dict['CYCLE'].zfill(2)
-        CDATE_mmdd = CDATE[4:8]
-        CDATE_mmddHH = CDATE[4:]
-        model_run_dir = os.path.join(base_model_run_dir, CDATE)
-        if not os.path.exists(model_run_dir):
-            print("Making directory "+model_run_dir)
-            os.makedirs(model_run_dir)
-            ega_util.set_rstprod_permissions(model_run_dir)
-        os.chdir(model_run_dir)
-        print("In run directory: "+model_run_dir)
-        model_prod_path = os.path.join(
-            run_settings_dict['DCOMROOT'], PDYm, 'wgrbbul', 'ecmwf'
+# Get model specifications
+if run_settings_dict['MODEL_SPECS'] != '':
+    model_spec_list = run_settings_dict['MODEL_SPECS'].split(',')
+else:
+    model_spec_list = [
+        run_settings_dict['MODEL']+':'+run_settings_dict['CYCLE']+':'
+        +run_settings_dict['FHR_MIN']+':'+run_settings_dict['FHR_MAX']+':'
+        +run_settings_dict['FHR_INC']
+    ]
+for model_spec in model_spec_list:
+    if len(model_spec.split(':')) != 5:
+        print("Model specifications must be in "
+              +"model:cycle:fhrmin:fhrmax:fhrinc format, got "+model_spec)
+        sys.exit(1)
+model_list = []
+for model_spec in model_spec_list:
+    if model_spec.split(':')[0] not in model_list:
+        model_list.append(model_spec.split(':')[0])
+
+# Model work units: each function gets the data for one
+# date/cycle/forecast hour and can be run in any order
+# relative to the other units in the same stage; unit_dict
+# holds the date, cycle, directories, and source directories
+# the model recipe gives it (see plan_model_work_units)
+# ecm parameters kept from the DCD files, wgrib name to
+# ECMWF table 128 parameter code
+ecm_grib1_param_dict = {
+    'T': 130, 'R': 157, 'GH': 156, 'U': 131, 'V': 132, 'MSL': 151,
+    'TP': 228, '2T': 167, '2D': 168, '10U': 165, '10V': 166
+}
+
+def make_ecm_grib2(source_file, dest_file):
+    """! Make an ecm GRIB2 file from a DCD file: subset the
+         records, convert to GRIB2, and set the surface levels
+         in a private scratch directory, in /dev/shm when it has
+         room (see ega_util.make_scratch_dir), then put only the
+         final file in place with rstprod permissions
+
+         Args:
+             source_file - string of full path to DCD file
+             dest_file   - string of full path to GRIB2 file
+                           to make
+
+         Returns:
+    """
+    scratch_dir = ega_util.make_scratch_dir(
+        nbytes=os.stat(source_file).st_size
+    )
+    try:
+        tmp_file = os.path.join(scratch_dir, 'tmp.grib1')
+        tmp2_file = os.path.join(scratch_dir, 'tmp2.grib2')
+        scratch_file = os.path.join(scratch_dir, 'out.grib2')
+        ega_util.extract_grib1_records(
+            source_file, tmp_file, ecm_grib1_param_dict,
+            run_settings_dict['WGRIB']
         )
-        fhr = int(run_settings_dict['FHR_MIN'])
-        while fhr <= int(run_settings_dict['FHR_MAX']):
-            if fhr == 0:
-                fhr_wgrib = 'anl'
-            else:
-                fhr_wgrib = str(fhr)
-            fhr2 = str(fhr).zfill(2)
-            fhr3 = str(fhr).zfill(3)
-            VDATE_dt = (datetime.datetime.strptime(CDATE, '%Y%m%d%H')
-                        +datetime.timedelta(hours=fhr))
-            run_file = os.path.join(
-                model_run_dir, 'pgbf'+fhr2+'.ecm.'+CDATE+'.grib2'
+        if os.path.exists(tmp_file):
+            ega_util.convert_grib1_to_grib2(
+                tmp_file, tmp2_file,
+                run_settings_dict['CNVGRIB']
             )
-            archive_file = os.path.join(
-                model_archive_dir, 'pgbf'+fhr2+'.ecm.'+CDATE+'.grib2'
+        if os.path.exists(tmp2_file):
+            ega_util.run_shell_command(
+                 [run_settings_dict['WGRIB2']+' '+tmp2_file+' '
+                  +'-if "(:DPT:surface|:TMP:surface)" -set_lev '
+                  +'"2 m above ground" -fi  -if '
+                  +'"(:VGRD:surface|:UGRD:surface)" -set_lev '
+                  +'"10 m above ground" -fi -grib '
+                  +scratch_file], shell=True
             )
-            source_file = os.path.join(
-                model_prod_path,
-                'DCD'+CDATE_mmddHH+'00'+VDATE_dt.strftime('%m%d%H')+'001'
+        ega_util.stage_file(scratch_file, dest_file, restricted=True)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+def get_ecm_fhr_archive_list(unit_dict, fhr):
+    """! Get the ecm archive files for one forecast hour
+    """
+    return [os.path.join(
+        unit_dict['archive_dir'],
+        'pgbf'+str(fhr).zfill(2)+'.ecm.'+unit_dict['CDATE']+'.grib2'
+    )]
+
+def get_ecm_fhr(unit_dict, fhr):
+    """! Get ecm data for one forecast hour
+    """
+    os.chdir(unit_dict['run_dir'])
+    CDATE = unit_dict['CDATE']
+    CDATE_mmddHH = CDATE[4:]
+    fhr2 = str(fhr).zfill(2)
+    VDATE_dt = (datetime.datetime.strptime(CDATE, '%Y%m%d%H')
+                +datetime.timedelta(hours=fhr))
+    run_file = os.path.join(
+        unit_dict['run_dir'], 'pgbf'+fhr2+'.ecm.'+CDATE+'.grib2'
+    )
+    archive_file = get_ecm_fhr_archive_list(unit_dict, fhr)[0]
+    source_file = os.path.join(
+        unit_dict['source_dir_dict']['dcom'],
+        'DCD'+CDATE_mmddHH+'00'+VDATE_dt.strftime('%m%d%H')+'001'
+    )
+    # Forecast hour 0 is also an analysis file, lock it against
+    # get_ecm_anl in this run or any other
+    lock_fd = ega_util.acquire_file_lock(archive_file)
+    try:
+        if not ega_util.check_file(archive_file):
+            if ega_util.check_file(source_file):
+                if run_settings_dict['SENDARCH'] == 'YES':
+                    make_ecm_grib2(source_file, archive_file)
+                    ega_util.check_file(archive_file)
+                else:
+                    make_ecm_grib2(source_file, run_file)
+                    ega_util.check_file(run_file)
+    finally:
+        ega_util.release_file_lock(lock_fd)
+
+def get_ecm_anl_archive_list(unit_dict, cycx):
+    """! Get the ecm archive files for one analysis cycle
+    """
+    return [
+        os.path.join(unit_dict['archive_dir'],
+                     prefix+'.ecm.'+unit_dict['PDYm']+cycx+'.grib2')
+        for prefix in ['pgbf00', 'pgbanl']
+    ]
+
+def get_ecm_anl(unit_dict, cycx):
+    """! Get ecm analysis data for one analysis cycle
+    """
+    os.chdir(unit_dict['run_dir'])
+    PDYm = unit_dict['PDYm']
+    CDATE_mmdd = PDYm[4:8]
+    run_file = os.path.join(
+        unit_dict['run_dir'], 'pgbf00.ecm.'+PDYm+cycx+'.grib2'
+    )
+    archive_file = get_ecm_anl_archive_list(unit_dict, cycx)[0]
+    source_file = os.path.join(
+        unit_dict['source_dir_dict']['dcom'],
+        'DCD'+CDATE_mmdd+cycx+'00'+CDATE_mmdd+cycx+'001'
+    )
+    # Each analysis file is made once no matter how many cycles,
+    # runs, or work units ask for it
+    lock_fd = ega_util.acquire_file_lock(archive_file)
+    try:
+        if not ega_util.check_file(archive_file):
+            if ega_util.check_file(source_file):
+                if run_settings_dict['SENDARCH'] == 'YES':
+                    make_ecm_grib2(source_file, archive_file)
+                    ega_util.check_file(archive_file)
+                else:
+                    make_ecm_grib2(source_file, run_file)
+                    ega_util.check_file(run_file)
+        run_file = os.path.join(
+            unit_dict['run_dir'], 'pgbanl.ecm.'+PDYm+cycx+'.grib2'
+        )
+        archive_file = get_ecm_anl_archive_list(unit_dict, cycx)[1]
+        # Older symbolic link aliases are made hard links here,
+        # when the analysis is archived, and never at tar time
+        if not ega_util.check_file(archive_file) \
+                or os.path.islink(archive_file):
+            if run_settings_dict['SENDARCH'] == 'YES':
+                ega_util.link_product_alias(
+                    ega_util.get_product_alias_target(archive_file),
+                    archive_file
+                )
+                if ega_util.check_file(archive_file):
+                    ega_util.set_rstprod_permissions(archive_file)
+    finally:
+        ega_util.release_file_lock(lock_fd)
+
+# ecmg4 surface parameters kept from the U1D files, wgrib
+# name to ECMWF table 128 parameter code
+ecmg4_grib1_param_dict = {
+    '10U': 165, # surface 10-m zonal wind
+    '10V': 166, # surface 10-m meridional wind
+    '2T': 167, # surface 2-m temperature
+    '2D': 168, # surface 2-m dew-point temperature
+    'MSL': 151, # surface Mean sea-level pressure [Pa]
+    'SD': 141, # surface Snow depth [m of water equivalent]
+    'TCC': 164, # surface Total cloud cover [(0 - 1)]
+    'TCW': 136, # surface Total column water [kg m**-2]
+    'TP': 228, # surface Total precipitation [m]
+}
+
+def write_ecmg4_nlcopygb(unit_dict):
+    """! Write the copygb namelist with the ecmg4 decimal
+         scaling in the run directory
+    """
+    tmpnlcopygb_file = os.path.join(unit_dict['run_dir'], 'tmpnlcopygb')
+    if not os.path.exists(tmpnlcopygb_file):
+        tmpnlcopygb = open(tmpnlcopygb_file, 'w')
+        tmpnlcopygb.write(
+            ' &NLCOPYGB IDS(49)=2, IDS(165)=2, IDS(166)=2, '
+            +'IDS(168)=2, IDS(167)=2, IDS(159)=2, IDS(59)=2, '
+            +'IDS(31)=2, IDS(156)=2, IDS(151)=2, IDS(3)=2, '
+            +'IDS(157)=2, IDS(134)=2, IDS(130)=2, IDS(131)=2, '
+            +'IDS(132)=2, IDS(138)=7, IDS(121)=2, IDS(122)=2, '
+            +'IDS(143)=4, IDS(142)=4, IDS(141)=4, IDS(144)=4, '
+            +'IDS(164)=4, IDS(136)=4, IDS(228)=4, IDS(135)=4, /'
+        )
+        tmpnlcopygb.close()
+
+def make_ecmg4_grib1(source_file, dest_file, tmpnlcopygb_file):
+    """! Make an ecmg4 GRIB1 file from a U1D file: pull the
+         surface parameters out in one pass over the file, then
+         repack them all with one copygb call using the NLCOPYGB
+         decimal scaling, in a private scratch directory, in
+         /dev/shm when it has room (see ega_util.make_scratch_dir),
+         then put only the final file in place with rstprod
+         permissions
+
+         Args:
+             source_file      - string of full path to U1D file
+             dest_file        - string of full path to GRIB1
+                                file to make
+             tmpnlcopygb_file - string of full path to copygb
+                                namelist
+
+         Returns:
+    """
+    scratch_dir = ega_util.make_scratch_dir(
+        nbytes=os.stat(source_file).st_size
+    )
+    try:
+        tmp_file = os.path.join(scratch_dir, 'tmp.grib1')
+        scratch_file = os.path.join(scratch_dir, 'out.grib1')
+        ega_util.extract_grib1_records(
+            source_file, tmp_file, ecmg4_grib1_param_dict,
+            run_settings_dict['WGRIB'], level_type=1
+        )
+        if os.path.exists(tmp_file):
+            ega_util.run_shell_command(
+                [run_settings_dict['COPYGB'], '-N', tmpnlcopygb_file,
+                 '-a', '-x', tmp_file, scratch_file]
             )
-            tmp_file = os.path.join(model_run_dir, 'tmp.f'+fhr3+'.'+CDATE+'.grib2')
-            tmp2_file = os.path.join(model_run_dir, 'tmp2.f'+fhr3+'.'+CDATE+'.grib2')
-            if not ega_util.check_file(archive_file):
-                if ega_util.check_file(source_file):
-                    ega_util.run_shell_command(
-                        [run_settings_dict['WGRIB']+' '+source_file+' | '
-                         +'egrep "(:T:|:R:|:GH:|:U:|:V:|:MSL:|:TP:|'
-                         +':2T:|:2D:|:10U:|:10V:)" | '
-                         +run_settings_dict['WGRIB']+' '+source_file+' -i '
-                         +'-grib -o '+tmp_file]
-                    )
-                if ega_util.check_file(tmp_file):
-                    ega_util.set_rstprod_permissions(tmp_file)
-                    ega_util.convert_grib1_to_grib2(
-                        tmp_file, tmp2_file,
-                        run_settings_dict['CNVGRIB']
+        ega_util.stage_file(scratch_file, dest_file, restricted=True)
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+
+def get_ecmg4_fhr_archive_list(unit_dict, fhr):
+    """! Get the ecmg4 archive files for one forecast hour
+    """
+    return [os.path.join(
+        unit_dict['archive_dir'],
+        'flxf'+str(fhr).zfill(2)+'.ecm.'+unit_dict['CDATE']
+    )]
+
+def get_ecmg4_fhr(unit_dict, fhr):
+    """! Get ecmg4 data for one forecast hour
+    """
+    os.chdir(unit_dict['run_dir'])
+    CDATE = unit_dict['CDATE']
+    CDATE_mmddHH = CDATE[4:]
+    fhr2 = str(fhr).zfill(2)
+    VDATE_dt = (datetime.datetime.strptime(CDATE, '%Y%m%d%H')
+                +datetime.timedelta(hours=fhr))
+    run_file = os.path.join(
+        unit_dict['run_dir'], 'flxf'+fhr2+'.ecm.'+CDATE
+    )
+    archive_file = get_ecmg4_fhr_archive_list(unit_dict, fhr)[0]
+    if fhr2 == '00':
+        source_file_suffix = '011'
+    else:
+        source_file_suffix = '001'
+    source_file = os.path.join(
+        unit_dict['source_dir_dict']['dcom'],
+        'U1D'+CDATE_mmddHH+'00'+VDATE_dt.strftime('%m%d%H')
+        +source_file_suffix
+    )
+    tmpnlcopygb_file = os.path.join(unit_dict['run_dir'], 'tmpnlcopygb')
+    if not ega_util.check_file(archive_file):
+        if ega_util.check_file(source_file):
+            if run_settings_dict['SENDARCH'] == 'YES':
+                make_ecmg4_grib1(source_file, archive_file, tmpnlcopygb_file)
+                ega_util.check_file(archive_file)
+            else:
+                make_ecmg4_grib1(source_file, run_file, tmpnlcopygb_file)
+                ega_util.check_file(run_file)
+
+# gfs fields kept from the sflux files, wgrib2 inventory name
+# to discipline, parameter category, parameter number, and
+# first fixed surface type and value
+gfs_sflux_field_dict = {
+    'PRATE:surface': (0, 1, 7, 1, None),
+    'TMP:2 m above ground': (0, 0, 0, 103, 2.0)
+}
+
+def get_gfs_fhr_source_list(unit_dict, fhr):
+    """! Get the gfs source files for one forecast hour
+    """
+    model_prod_path = unit_dict['source_dir_dict']['gfs']
+    HH = unit_dict['CYCLE'].zfill(2)
+    fhr3 = str(fhr).zfill(3)
+    source_file_list = [
+        os.path.join(model_prod_path, 'gfs.t'+HH+'z.pgrb2.1p00.f'+fhr3)
+    ]
+    if fhr <= 240:
+        source_file_list.append(
+            os.path.join(model_prod_path,
+                         'gfs.t'+HH+'z.sfluxgrbf'+fhr3+'.grib2')
+        )
+    return source_file_list
+
+def get_gfs_fhr_archive_list(unit_dict, fhr):
+    """! Get the gfs archive files for one forecast hour
+    """
+    CDATE = unit_dict['CDATE']
+    fhr2 = str(fhr).zfill(2)
+    archive_file_list = [
+        os.path.join(unit_dict['archive_dir'],
+                     'pgbf'+fhr2+'.gfs.'+CDATE+'.grib2')
+    ]
+    if fhr <= 240:
+        archive_file_list.append(
+            os.path.join(unit_dict['archive_dir'],
+                         'flxf'+fhr2+'.gfs.'+CDATE+'.grib2')
+        )
+    return archive_file_list
+
+def get_gfs_fhr(unit_dict, fhr):
+    """! Get gfs data for one forecast hour
+    """
+    os.chdir(unit_dict['run_dir'])
+    CDATE = unit_dict['CDATE']
+    source_file_list = get_gfs_fhr_source_list(unit_dict, fhr)
+    fhr2 = str(fhr).zfill(2)
+    run_file = os.path.join(
+        unit_dict['run_dir'], 'pgbf'+fhr2+'.gfs.'+CDATE+'.grib2'
+    )
+    archive_file = os.path.join(
+        unit_dict['archive_dir'], 'pgbf'+fhr2+'.gfs.'+CDATE+'.grib2'
+    )
+    source_file = source_file_list[0]
+    if run_settings_dict['SENDARCH'] == 'YES':
+        ega_util.update_file(source_file, archive_file)
+    else:
+        ega_util.check_file(archive_file)
+    if fhr <= 240:
+        run_file = os.path.join(
+            unit_dict['run_dir'], 'flxf'+fhr2+'.gfs.'+CDATE+'.grib2'
+        )
+        archive_file = os.path.join(
+            unit_dict['archive_dir'], 'flxf'+fhr2+'.gfs.'+CDATE+'.grib2'
+        )
+        source_file = source_file_list[1]
+        if not ega_util.check_file(archive_file):
+            if ega_util.check_file(source_file):
+                if run_settings_dict['SENDARCH'] == 'YES':
+                    ega_util.extract_grib2_records(
+                        source_file, archive_file, gfs_sflux_field_dict,
+                        run_settings_dict['WGRIB2']
                     )
-                if ega_util.check_file(tmp2_file):
-                    ega_util.set_rstprod_permissions(tmp2_file)
-                    ega_util.run_shell_command(
-                         [run_settings_dict['WGRIB2']+' '+tmp2_file+' '
-                          +'-if "(:DPT:surface|:TMP:surface)" -set_lev '
-                          +'"2 m above ground" -fi  -if '
-                          +'"(:VGRD:surface|:UGRD:surface)" -set_lev '
-                          +'"10 m above ground" -fi -grib '
-                          +run_file]
+                    ega_util.check_file(archive_file)
+                else:
+                    ega_util.extract_grib2_records(
+                        source_file, run_file, gfs_sflux_field_dict,
+                        run_settings_dict['WGRIB2']
                     )
-                if ega_util.check_file(run_file):
-                    ega_util.set_rstprod_permissions(run_file)
-                    if run_settings_dict['SENDARCH'] == 'YES':
-                        ega_util.copy_file(run_file, archive_file)
-                        if ega_util.check_file(archive_file):
-                            ega_util.set_rstprod_permissions(archive_file)
-            fhr+=int(run_settings_dict['FHR_INC'])
-        for cycx in ['00', '06', '12', '18']:
+                    ega_util.check_file(run_file)
+
+def get_gfs_cycle_archive_list(unit_dict):
+    """! Get the gfs analysis, gdas, and track archive files
+         for one cycle
+    """
+    CDATE = unit_dict['CDATE']
+    return [
+        os.path.join(unit_dict['archive_dir'], archive_file_name)
+        for archive_file_name in [
+            'pgbanl.gfs.'+CDATE+'.grib2', 'pgbanl.gdas.'+CDATE+'.grib2',
+            'pgbf00.gdas.'+CDATE+'.grib2', 'pgbf06.gdas.'+CDATE+'.grib2',
+            'atcfunix.gfs.'+CDATE
+        ]
+    ]
+
+def get_gfs_cycle(unit_dict):
+    """! Get gfs analysis, gdas, and track data for one cycle
+    """
+    os.chdir(unit_dict['run_dir'])
+    CDATE = unit_dict['CDATE']
+    CYCLE = unit_dict['CYCLE']
+    model_prod_path = unit_dict['source_dir_dict']['gfs']
+    run_file = os.path.join(
+        unit_dict['run_dir'], 'pgbanl.gfs.'+CDATE+'.grib2'
+    )
+    archive_file = os.path.join(
+        unit_dict['archive_dir'], 'pgbanl.gfs.'+CDATE+'.grib2'
+    )
+    source_file = os.path.join(
+        model_prod_path, 'gfs.t'+CYCLE.zfill(2)+'z.pgrb2.1p00.anl'
+    )
+    if run_settings_dict['SENDARCH'] == 'YES':
+        ega_util.update_file(source_file, archive_file)
+    else:
+        ega_util.check_file(archive_file)
+    for fs in ['anl', 'f000', 'f006']:
+        source_file = os.path.join(
+            unit_dict['source_dir_dict']['gdas'],
+            'gdas.t'+CYCLE.zfill(2)+'z.pgrb2.1p00.'+fs
+        )
+        if fs != 'anl':
             run_file = os.path.join(
-                model_run_dir, 'pgbf00.ecm.'+PDYm+cycx+'.grib2'
+                unit_dict['run_dir'], 'pgbf'+fs[2:]+'.gdas.'+CDATE+'.grib2'
             )
             archive_file = os.path.join(
-                model_archive_dir, 'pgbf00.ecm.'+PDYm+cycx+'.grib2'
-            )
-            source_file = os.path.join(
-                model_prod_path,
-                'DCD'+CDATE_mmdd+cycx+'00'+CDATE_mmdd+cycx+'001'
+                unit_dict['archive_dir'],
+                'pgbf'+fs[2:]+'.gdas.'+CDATE+'.grib2'
             )
-            tmp_file = os.path.join(model_run_dir, 'tmp.f000.'+PDYm+cycx)+'.grib2'
-            tmp2_file = os.path.join(model_run_dir, 'tmp2.f000.'+PDYm+cycx)+'.grib2'
-            if not ega_util.check_file(archive_file):
-                if ega_util.check_file(source_file):
-                    ega_util.run_shell_command(
-                        [run_settings_dict['WGRIB']+' '+source_file+' | '
-                         +'egrep "(:T:|:R:|:GH:|:U:|:V:|:MSL:|:TP:|'
-                         +':2T:|:2D:|:10U:|:10V:)" | '
-                         +run_settings_dict['WGRIB']+' '+source_file+' -i '
-                         +'-grib -o '+tmp_file]
-                    )
-                if ega_util.check_file(tmp_file):
-                    ega_util.set_rstprod_permissions(tmp_file)
-                    ega_util.convert_grib1_to_grib2(
-                        tmp_file, tmp2_file,
-                        run_settings_dict['CNVGRIB']
-                    )
-                if ega_util.check_file(tmp2_file):
-                    ega_util.set_rstprod_permissions(tmp2_file)
-                    ega_util.run_shell_command(
-                         [run_settings_dict['WGRIB2']+' '+tmp2_file+' '
-                          +'-if "(:DPT:surface|:TMP:surface)" -set_lev '
-                          +'"2 m above ground" -fi  -if '
-                          +'"(:VGRD:surface|:UGRD:surface)" -set_lev '
-                          +'"10 m above ground" -fi -grib '
-                          +run_file]
-                    )
-                if ega_util.check_file(run_file):
-                    ega_util.set_rstprod_permissions(run_file)
-                    if run_settings_dict['SENDARCH'] == 'YES':
-                        ega_util.copy_file(run_file, archive_file)
-                        if ega_util.check_file(archive_file):
-                            ega_util.set_rstprod_permissions(archive_file)
-                
+        else:
             run_file = os.path.join(
-                model_run_dir, 'pgbanl.ecm.'+PDYm+cycx+'.grib2'
+                unit_dict['run_dir'], 'pgb'+fs+'.gdas.'+CDATE+'.grib2'
             )
             archive_file = os.path.join(
-                model_archive_dir, 'pgbanl.ecm.'+PDYm+cycx+'.grib2'
+                unit_dict['archive_dir'], 'pgb'+fs+'.gdas.'+CDATE+'.grib2'
             )
-            source_file = os.path.join(
-                model_archive_dir, 'pgbf00.ecm.'+PDYm+cycx+'.grib2'
+        if run_settings_dict['SENDARCH'] == 'YES':
+            ega_util.update_file(source_file, archive_file)
+        else:
+            ega_util.check_file(archive_file)
+    source_file = os.path.join(
+        unit_dict['source_dir_dict']['ens_tracker'],
+        'avn.t'+CYCLE.zfill(2)+'z.cyclone.trackatcfunix'
+    )
+    run_file = os.path.join(
+        unit_dict['run_dir'], 'atcfunix.gfs.'+CDATE
+    )
+    archive_file = os.path.join(
+        unit_dict['archive_dir'], 'atcfunix.gfs.'+CDATE
+    )
+    if run_settings_dict['SENDARCH'] == 'YES':
+        ega_util.update_file(source_file, archive_file)
+    else:
+        ega_util.check_file(archive_file)
+
+def get_eagle_solo_fhr_archive_list(unit_dict, fhr):
+    """! Get the eagle_solo archive files for one forecast hour
+    """
+    return [os.path.join(
+        unit_dict['archive_dir'],
+        f"aigfs.t{unit_dict['CDATE'][-2:]}z.f{str(fhr).zfill(3)}.grib2"
+    )]
+
+def get_eagle_solo_fhr(unit_dict, fhr):
+    """! Get eagle_solo data for one forecast hour
+    """
+    os.chdir(unit_dict['run_dir'])
+    CDATE = unit_dict['CDATE']
+    aws_url = unit_dict['source_dir_dict']['aws']
+    fhr3 = str(fhr).zfill(3)
+    source_pres_file = os.path.join(
+        aws_url,
+        f"aigfs.t{CDATE[-2:]}z.pres.f{fhr3}.grib2"
+    )
+    source_sfc_file = os.path.join(
+        aws_url,
+        f"aigfs.t{CDATE[-2:]}z.sfc.f{fhr3}.grib2"
+    )
+    archive_file = get_eagle_solo_fhr_archive_list(unit_dict, fhr)[0]
+    if not ega_util.check_file(archive_file):
+        ega_util.download_concatenated_files(
+            [source_pres_file, source_sfc_file], archive_file,
+            field_list=unit_dict['subset_field_list']
+        )
+        ega_util.check_file(archive_file)
+
+def get_graphcastgfs_fhr_archive_list(unit_dict, fhr):
+    """! Get the graphcastgfs archive files for one forecast hour
+    """
+    return [os.path.join(
+        unit_dict['archive_dir'],
+        f"graphcastgfs.t{unit_dict['CDATE'][-2:]}z.pgrb2.0p25"
+        +f".f{str(fhr).zfill(3)}"
+    )]
+
+def get_graphcastgfs_fhr(unit_dict, fhr):
+    """! Get graphcastgfs data for one forecast hour
+    """
+    os.chdir(unit_dict['run_dir'])
+    CDATE = unit_dict['CDATE']
+    fhr3 = str(fhr).zfill(3)
+    source_file = os.path.join(
+        unit_dict['source_dir_dict']['aws'],
+        f"graphcastgfs.t{CDATE[-2:]}z.pgrb2.0p25.f{fhr3}"
+    )
+    archive_file = get_graphcastgfs_fhr_archive_list(unit_dict, fhr)[0]
+    if not ega_util.check_file(archive_file):
+        # Downloaded straight into the archive, next to the
+        # archive file and renamed into place
+        if run_settings_dict['SENDARCH'] == 'YES':
+            dest_file = archive_file
+        else:
+            dest_file = os.path.join(unit_dict['run_dir'],
+                                     source_file.rpartition('/')[2])
+        if unit_dict['subset_field_list'] is not None:
+            ega_util.download_grib2_fields(
+                source_file, dest_file, unit_dict['subset_field_list']
             )
-            if not ega_util.check_file(archive_file):
-                if run_settings_dict['SENDARCH'] == 'YES':
-                    ega_util.link_file(source_file, archive_file)
-                    if ega_util.check_file(archive_file):
-                        ega_util.set_rstprod_permissions(archive_file)
-# ecmg4 - Operational European Center for Medium-Range Weather Forecasts Hi-Res
-elif run_settings_dict['MODEL'] == 'ecmg4':
-    ecmg4_var_kpds_dict = {
-        'surface 10-m zonal wind': '4*-1,165,1,0',
-        'surface 10-m meridional wind': '4*-1,166,1,0',
-        'surface 2-m temperature': '4*-1,167,1,0',
-        'surface 2-m dew-point temperature': '4*-1,168,1,0',
-        'surface Mean sea-level pressure [Pa]': '4*-1,151,1,0',
-        'surface Snow depth [m of water equivalent]': '4*-1,141,1,0',
-        'surface Total cloud cover [(0 - 1)]': '4*-1,164,1,0',
-        'surface Total column water [kg m**-2]': '4*-1,136,1,0',
-        'surface Total precipitation [m]': '4*-1,228,1,0',
+        else:
+            ega_util.download_file(source_file, dest_file)
+        ega_util.check_file(dest_file)
+
+# Model recipes: how the work units of each model are planned
+#     restricted      - boolean, if True the run and archive
+#                       directories get rstprod permissions
+#     variant_list    - list of dictionaries, one per set of
+#                       files the model has, with
+#         name            - string used to name the work units
+#         run_dir         - string template of the run directory
+#                           under RUN_DIR/MODEL
+#         archive_dir     - string template of the archive
+#                           directory under ARCHIVE_DIR/MODEL
+#         source_dir_dict - dictionary of string templates of
+#                           where the source files are
+#     setup           - function run with unit_dict for each date
+#                       before its units run, None for nothing
+#     fhr_unit        - function run with unit_dict and forecast
+#                       hour for each forecast hour
+#     fhr_source_func - function returning the list of source
+#                       files fhr_unit needs for a forecast hour,
+#                       used by --readiness=YES, None if the
+#                       model can not be polled
+#     fhr_archive_func - function returning the list of archive
+#                        files fhr_unit makes for a forecast hour,
+#                        used to check a day is complete
+#     fhr_inc_change  - tuple of forecast hour and the forecast
+#                       hour increment used from it on,
+#                       None to keep --fhrinc
+#     cycle_unit      - function run with unit_dict once per
+#                       date and cycle, None for nothing
+#     cycle_archive_func - function returning the list of archive
+#                          files cycle_unit makes, None for nothing
+#     anl_unit        - function run with unit_dict and analysis
+#                       cycle for each of anl_cycle_list once
+#                       per date, after the forecast hours
+#     anl_archive_func - function returning the list of archive
+#                        files anl_unit makes for an analysis
+#                        cycle, None for nothing
+#     anl_cycle_list  - list of analysis cycles
+#     subset_field_list - list of wgrib2 inventory names of
+#                         the only fields downloaded with
+#                         --subset=YES, None to get all of
+#                         the files
+# Templates are filled with {PDYm}, {HH}, {CDATE}, and
+# the run settings (e.g. {COMROOT}, {gfs_ver})
+# Fields verification uses from the AI model files
+ai_subset_field_list = (
+    [var+':'+lev+' mb' for var in ['HGT', 'TMP', 'UGRD', 'VGRD', 'SPFH']
+     for lev in ['1000', '925', '850', '700', '500', '250', '200']]
+    +['PRMSL:mean sea level', 'TMP:2 m above ground',
+      'UGRD:10 m above ground', 'VGRD:10 m above ground', 'APCP:surface']
+)
+model_recipe_dict = {
+    # ecm - Operational European Center for Medium-Range Weather Forecasts
+    'ecm': {
+        'restricted': True,
+        'variant_list': [
+            {'name': 'ecm', 'run_dir': '{CDATE}', 'archive_dir': '',
+             'source_dir_dict': {
+                 'dcom': '{DCOMROOT}/{PDYm}/wgrbbul/ecmwf'
+             }}
+        ],
+        'setup': None,
+        'fhr_unit': get_ecm_fhr,
+        'fhr_source_func': None,
+        'fhr_archive_func': get_ecm_fhr_archive_list,
+        'fhr_inc_change': None,
+        'cycle_unit': None,
+        'cycle_archive_func': None,
+        'anl_unit': get_ecm_anl,
+        'anl_archive_func': get_ecm_anl_archive_list,
+        'anl_cycle_list': ['00', '06', '12', '18'],
+        'subset_field_list': None
+    },
+    # ecmg4 - Operational European Center for Medium-Range Weather Forecasts Hi-Res
+    'ecmg4': {
+        'restricted': True,
+        'variant_list': [
+            {'name': 'ecmg4', 'run_dir': '{CDATE}', 'archive_dir': '',
+             'source_dir_dict': {
+                 'dcom': '{DCOMROOT}/{PDYm}/wgrbbul/ecmwf'
+             }}
+        ],
+        'setup': write_ecmg4_nlcopygb,
+        'fhr_unit': get_ecmg4_fhr,
+        'fhr_source_func': None,
+        'fhr_archive_func': get_ecmg4_fhr_archive_list,
+        'fhr_inc_change': None,
+        'cycle_unit': None,
+        'cycle_archive_func': None,
+        'anl_unit': None,
+        'anl_archive_func': None,
+        'anl_cycle_list': [],
+        'subset_field_list': None
+    },
+    'gfs': {
+        'restricted': False,
+        'variant_list': [
+            {'name': 'gfs', 'run_dir': '{CDATE}', 'archive_dir': '',
+             'source_dir_dict': {
+                 'gfs': '{COMROOT}/gfs/{gfs_ver}/gfs.{PDYm}/{HH}/atmos',
+                 'gdas': '{COMROOT}/gfs/{gfs_ver}/gdas.{PDYm}/{HH}/atmos',
+                 'ens_tracker': ('{COMROOT}/ens_tracker/{ens_tracker_ver}/'
+                                 +'gfs.{PDYm}/{HH}/tctrack')
+             }}
+        ],
+        'setup': None,
+        'fhr_unit': get_gfs_fhr,
+        'fhr_source_func': get_gfs_fhr_source_list,
+        'fhr_archive_func': get_gfs_fhr_archive_list,
+        'fhr_inc_change': (240, 12),
+        'cycle_unit': get_gfs_cycle,
+        'cycle_archive_func': get_gfs_cycle_archive_list,
+        'anl_unit': None,
+        'anl_archive_func': None,
+        'anl_cycle_list': [],
+        'subset_field_list': None
+    },
+    'eagle_solo': {
+        'restricted': False,
+        'variant_list': [
+            {'name': 'eagle_solo', 'run_dir': 'eagle_solo/{CDATE}',
+             'archive_dir': 'eagle_solo/eagle_solo.{PDYm}/{HH}',
+             'source_dir_dict': {
+                 'aws': ('{GRAPHCASTGFS_URL}/aigfs.{PDYm}/{HH}/'
+                         +'model/atmos/grib2')
+             }},
+            {'name': 'eagle_solo_test', 'run_dir': 'eagle_solo_test/{CDATE}',
+             'archive_dir': 'eagle_solo_test/eagle_solo_test.{PDYm}/{HH}',
+             'source_dir_dict': {
+                 'aws': ('{GRAPHCASTGFS_URL}/test/aigfs.{PDYm}/{HH}/'
+                         +'model/atmos/grib2')
+             }}
+        ],
+        'setup': None,
+        'fhr_unit': get_eagle_solo_fhr,
+        'fhr_source_func': None,
+        'fhr_archive_func': get_eagle_solo_fhr_archive_list,
+        'fhr_inc_change': None,
+        'cycle_unit': None,
+        'cycle_archive_func': None,
+        'anl_unit': None,
+        'anl_archive_func': None,
+        'anl_cycle_list': [],
+        'subset_field_list': ai_subset_field_list
+    },
+    'graphcastgfs': {
+        'restricted': False,
+        'variant_list': [
+            {'name': 'graphcastgfs13', 'run_dir': '13/{CDATE}',
+             'archive_dir': 'graphcastgfs13/graphcastgfs.{PDYm}/{HH}',
+             'source_dir_dict': {
+                 'aws': ('{GRAPHCASTGFS_URL}/graphcastgfs.{PDYm}/{HH}/'
+                         +'forecasts_13_levels')
+             }},
+            {'name': 'graphcastgfs13_test', 'run_dir': '13_test/{CDATE}',
+             'archive_dir': 'graphcastgfs13_test/graphcastgfs.{PDYm}/{HH}',
+             'source_dir_dict': {
+                 'aws': ('{GRAPHCASTGFS_URL}/graphcastgfs.{PDYm}/{HH}/'
+                         +'forecasts_13_levels_test')
+             }}
+        ],
+        'setup': None,
+        'fhr_unit': get_graphcastgfs_fhr,
+        'fhr_source_func': None,
+        'fhr_archive_func': get_graphcastgfs_fhr_archive_list,
+        'fhr_inc_change': None,
+        'cycle_unit': None,
+        'cycle_archive_func': None,
+        'anl_unit': None,
+        'anl_archive_func': None,
+        'anl_cycle_list': [],
+        'subset_field_list': ai_subset_field_list
     }
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        CDATE = PDYm+run_settings_dict['CYCLE'].zfill(2)
-        CDATE_mmddHH = CDATE[4:]
-        model_run_dir = os.path.join(base_model_run_dir, CDATE)
-        if not os.path.exists(model_run_dir):
-            print("Making directory "+model_run_dir)
-            os.makedirs(model_run_dir)
-            ega_util.set_rstprod_permissions(model_run_dir)
-        os.chdir(model_run_dir)
-        print("In run directory: "+model_run_dir)
-        model_prod_path = os.path.join(
-            run_settings_dict['DCOMROOT'], PDYm, 'wgrbbul', 'ecmwf'
+}
+
+def get_unit_dict(MODEL, variant, PDYm, CYCLE):
+    """! Fill in a model recipe variant's templates for
+         a date and cycle
+
+         Args:
+             MODEL     - string of model name
+             variant   - dictionary of model recipe variant
+             PDYm      - string of date
+             CYCLE     - string of cycle hour
+
+         Returns:
+             unit_dict - dictionary of the work unit settings
+    """
+    template_dict = dict(run_settings_dict)
+    template_dict.update({
+        'PDYm': PDYm, 'HH': CYCLE.zfill(2), 'CDATE': PDYm+CYCLE.zfill(2)
+    })
+    unit_dict = {
+        'MODEL': MODEL,
+        'name': variant['name'],
+        'PDYm': PDYm,
+        'CYCLE': CYCLE,
+        'CDATE': PDYm+CYCLE.zfill(2),
+        'run_dir': os.path.join(
+            run_settings_dict['RUN_DIR'], MODEL,
+            variant['run_dir'].format(**template_dict)
+        ),
+        'archive_dir': os.path.join(
+            run_settings_dict['ARCHIVE_DIR'], MODEL,
+            variant['archive_dir'].format(**template_dict)
+        ).rstrip('/'),
+        'source_dir_dict': {},
+        'subset_field_list': None
+    }
+    if run_settings_dict['SUBSET'] == 'YES':
+        unit_dict['subset_field_list'] = (
+            model_recipe_dict[MODEL]['subset_field_list']
         )
-        fhr = int(run_settings_dict['FHR_MIN'])
-        while fhr <= int(run_settings_dict['FHR_MAX']):
-            fhr2 = str(fhr).zfill(2)
-            fhr3 = str(fhr).zfill(3)
-            VDATE_dt = (datetime.datetime.strptime(CDATE, '%Y%m%d%H')
-                        +datetime.timedelta(hours=fhr))
-            run_file = os.path.join(
-                model_run_dir, 'flxf'+fhr2+'.ecm.'+CDATE
-            )
-            archive_file = os.path.join(
-                model_archive_dir, 'flxf'+fhr2+'.ecm.'+CDATE
-            )
-            if fhr2 == '00':
-                source_file_suffix = '011'
-            else:
-                source_file_suffix = '001'
-            source_file = os.path.join(
-                model_prod_path,
-                'U1D'+CDATE_mmddHH+'00'+VDATE_dt.strftime('%m%d%H')
-                +source_file_suffix
-            )
-            tmpnlcopygb_file = os.path.join(model_run_dir, 'tmpnlcopygb')
-            tmp_file = os.path.join(model_run_dir, 'tmp.f'+fhr3+'.'+CDATE)
-            if not os.path.exists(tmpnlcopygb_file):
-                tmpnlcopygb = open(tmpnlcopygb_file, 'w')
-                tmpnlcopygb.write(
-                    ' &NLCOPYGB IDS(49)=2, IDS(165)=2, IDS(166)=2, '
-                    +'IDS(168)=2, IDS(167)=2, IDS(159)=2, IDS(59)=2, '
-                    +'IDS(31)=2, IDS(156)=2, IDS(151)=2, IDS(3)=2, '
-                    +'IDS(157)=2, IDS(134)=2, IDS(130)=2, IDS(131)=2, '
-                    +'IDS(132)=2, IDS(138)=7, IDS(121)=2, IDS(122)=2, '
-                    +'IDS(143)=4, IDS(142)=4, IDS(141)=4, IDS(144)=4, '
-                    +'IDS(164)=4, IDS(136)=4, IDS(228)=4, IDS(135)=4, /'
-                )
-                tmpnlcopygb.close()
-            if not ega_util.check_file(archive_file):
-                if not ega_util.check_file(tmp_file):
-                    ega_util.copy_file(source_file, tmp_file)
-                if ega_util.check_file(tmp_file):
-                    ega_util.set_rstprod_permissions(tmp_file)
-                    for var, kpds in ecmg4_var_kpds_dict.items():
-                        ega_util.run_shell_command(
-                            [run_settings_dict['COPYGB'], '-N', tmpnlcopygb_file,
-                             '-k"'+kpds+'"', '-a', '-x', tmp_file,
-                             run_file]
-                        )
-                if run_settings_dict['SENDARCH'] == 'YES':
-                    ega_util.copy_file(run_file, archive_file)
-                    if ega_util.check_file(archive_file):
-                        ega_util.set_rstprod_permissions(archive_file)
-            fhr+=int(run_settings_dict['FHR_INC'])
-elif run_settings_dict['MODEL'] == 'gfs':
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        CDATE = PDYm+run_settings_dict['CYCLE'].zfill(2)
-        model_run_dir = os.path.join(base_model_run_dir, CDATE)
-        if not os.path.exists(model_run_dir):
-            print("Making directory "+model_run_dir)
-            os.makedirs(model_run_dir)
-        os.chdir(model_run_dir)
-        print("In run directory: "+model_run_dir)
-        model_prod_path = os.path.join(
-            run_settings_dict['COMROOT'], run_settings_dict['MODEL'],
-            run_settings_dict['gfs_ver'], 'gfs.'+PDYm,
-            run_settings_dict['CYCLE'].zfill(2), 'atmos'
+    for source_name, source_dir in variant['source_dir_dict'].items():
+        unit_dict['source_dir_dict'][source_name] = (
+            source_dir.format(**template_dict)
         )
-        fhr = int(run_settings_dict['FHR_MIN'])
-        while fhr <= int(run_settings_dict['FHR_MAX']):
-            fhr2 = str(fhr).zfill(2)
-            fhr3 = str(fhr).zfill(3)
-            run_file = os.path.join(
-                model_run_dir, 'pgbf'+fhr2+'.gfs.'+CDATE+'.grib2'
+    return unit_dict
+
+def get_model_archive_file_list(MODEL, CYCLE, FHR_MIN, FHR_MAX, FHR_INC,
+                               PDYm):
+    """! Get the archive files the work units of a model
+         cycle make for a date, from the model's recipe
+
+         Args:
+             MODEL             - string of model name
+             CYCLE             - string of cycle hour
+             FHR_MIN           - integer of minimum forecast hour
+             FHR_MAX           - integer of maximum forecast hour
+             FHR_INC           - integer of forecast hour increment
+             PDYm              - string of date
+
+         Returns:
+             archive_file_list - list of strings of full paths
+                                 to archive files
+    """
+    model_recipe = model_recipe_dict[MODEL]
+    fhr_list = ega_util.get_fhr_list(FHR_MIN, FHR_MAX, FHR_INC,
+                                     model_recipe['fhr_inc_change'])
+    archive_file_list = []
+    for variant in model_recipe['variant_list']:
+        unit_dict = get_unit_dict(MODEL, variant, PDYm, CYCLE)
+        for fhr in fhr_list:
+            archive_file_list.extend(
+                model_recipe['fhr_archive_func'](unit_dict, fhr)
             )
-            archive_file = os.path.join(
-                model_archive_dir, 'pgbf'+fhr2+'.gfs.'+CDATE+'.grib2'
+        if model_recipe['cycle_archive_func'] is not None:
+            archive_file_list.extend(
+                model_recipe['cycle_archive_func'](unit_dict)
             )
-            source_file = os.path.join(
-                model_prod_path, 'gfs.t'+run_settings_dict['CYCLE'].zfill(2)
-                +'z.pgrb2.1p00.f'+fhr3
+        for cycx in model_recipe['anl_cycle_list']:
+            archive_file_list.extend(
+                model_recipe['anl_archive_func'](unit_dict, cycx)
             )
-            if not ega_util.check_file(archive_file):
-                if run_settings_dict['SENDARCH'] == 'YES':
-                    ega_util.copy_file(source_file, archive_file)
-                    ega_util.check_file(archive_file)
-            if fhr <= 240:
-                run_file = os.path.join(
-                    model_run_dir, 'flxf'+fhr2+'.gfs.'+CDATE+'.grib2'
-                )
-                archive_file = os.path.join(
-                    model_archive_dir, 'flxf'+fhr2+'.gfs.'+CDATE+'.grib2'
-                )
-                source_file = os.path.join(
-                    model_prod_path, 'gfs.t'
-                    +run_settings_dict['CYCLE'].zfill(2)+'z.sfluxgrbf'+fhr3
-                    +'.grib2'
+    return archive_file_list
+
+def plan_model_work_units(MODEL, CYCLE, FHR_MIN, FHR_MAX, FHR_INC,
+                          PDYm_list, ready_unit_list=None):
+    """! Plan the work units to get the data for a model
+         cycle over a list of dates from the model's recipe,
+         making the run and archive directories they need
+
+         Args:
+             MODEL          - string of model name
+             CYCLE          - string of cycle hour
+             FHR_MIN        - integer of minimum forecast hour
+             FHR_MAX        - integer of maximum forecast hour
+             FHR_INC        - integer of forecast hour increment
+             PDYm_list      - list of strings of dates to get
+             ready_unit_list - list to add the forecast hour
+                               work units to, with their source
+                               files, to be run when the files
+                               are ready (see run_ready_work_units),
+                               default: None (add them to the
+                               first stage)
+
+         Returns:
+             stage_list     - list of lists of work units, each
+                              list must finish before the next
+                              starts, None if the model is not
+                              recognized
+    """
+    if MODEL not in list(model_recipe_dict.keys()):
+        print(MODEL+" not recongized")
+        return None
+    model_recipe = model_recipe_dict[MODEL]
+    stage_list = [[], []]
+    fhr_list = ega_util.get_fhr_list(FHR_MIN, FHR_MAX, FHR_INC,
+                                     model_recipe['fhr_inc_change'])
+    for PDYm in PDYm_list:
+        CDATE = PDYm+CYCLE.zfill(2)
+        for variant in model_recipe['variant_list']:
+            unit_dict = get_unit_dict(MODEL, variant, PDYm, CYCLE)
+            if not os.path.exists(unit_dict['run_dir']):
+                print("Making directory "+unit_dict['run_dir'])
+                os.makedirs(unit_dict['run_dir'])
+                if model_recipe['restricted']:
+                    ega_util.set_rstprod_permissions(unit_dict['run_dir'])
+            if variant['archive_dir'] != '' \
+                    and not os.path.exists(unit_dict['archive_dir']):
+                print("Making directory "+unit_dict['archive_dir'])
+                os.makedirs(unit_dict['archive_dir'])
+                if model_recipe['restricted']:
+                    ega_util.set_rstprod_permissions(
+                        unit_dict['archive_dir']
+                    )
+            if model_recipe['setup'] is not None:
+                model_recipe['setup'](unit_dict)
+            for fhr in fhr_list:
+                work_unit = (
+                    variant['name']+' '+CDATE+' f'+str(fhr).zfill(3),
+                    model_recipe['fhr_unit'], (unit_dict, fhr)
                 )
-                if not ega_util.check_file(archive_file):
-                    if ega_util.check_file(source_file):
-                        ega_util.run_shell_command(
-                            [run_settings_dict['WGRIB2'], source_file,
-                             '-match', '"(:PRATE:surface:)|'
-                             +'(:TMP:2 m above ground:)"', '-grib',
-                             run_file]
-                        )
-                        if run_settings_dict['SENDARCH'] == 'YES':
-                            ega_util.copy_file(run_file, archive_file)
-                            ega_util.check_file(archive_file)
-            if fhr >= 240:
-                fhr+=12
-            else:
-                fhr+=int(run_settings_dict['FHR_INC'])
-        run_file = os.path.join(
-            model_run_dir, 'pgbanl.gfs.'+CDATE+'.grib2'
-        ) 
-        archive_file = os.path.join(
-            model_archive_dir, 'pgbanl.gfs.'+CDATE+'.grib2'
-        )
-        source_file = os.path.join(
-            model_prod_path, 'gfs.t'+run_settings_dict['CYCLE'].zfill(2)
-            +'z.pgrb2.1p00.anl'
-        )
-        if not ega_util.check_file(archive_file):
-            if run_settings_dict['SENDARCH'] == 'YES':
-                ega_util.copy_file(source_file, archive_file)
-                ega_util.check_file(archive_file)
-        for fs in ['anl', 'f000', 'f006']:
-            source_file = os.path.join(
-                run_settings_dict['COMROOT'], run_settings_dict['MODEL'],
-                run_settings_dict['gfs_ver'], 'gdas.'+PDYm,
-                run_settings_dict['CYCLE'].zfill(2), 'atmos',
-                'gdas.t'+run_settings_dict['CYCLE'].zfill(2)
-                +'z.pgrb2.1p00.'+fs
-            )
-            if fs != 'anl':
-                run_file = os.path.join(
-                    model_run_dir, 'pgbf'+fs[2:]+'.gdas.'+CDATE+'.grib2'
+                if ready_unit_list is not None:
+                    ready_unit_list.append(
+                        (model_recipe['fhr_source_func'](unit_dict, fhr),
+                         work_unit)
+                    )
+                else:
+                    stage_list[0].append(work_unit)
+            if model_recipe['cycle_unit'] is not None:
+                stage_list[0].append(
+                    (variant['name']+' '+CDATE+' cycle',
+                     model_recipe['cycle_unit'], (unit_dict,))
                 )
-                archive_file = os.path.join(
-                    model_archive_dir, 'pgbf'+fs[2:]+'.gdas.'+CDATE+'.grib2'
+            # Analysis cycle 'CYCLE' shares files with forecast hour 0,
+            # so the analyses run after the forecast hours
+            for cycx in model_recipe['anl_cycle_list']:
+                stage_list[1].append(
+                    (variant['name']+' '+PDYm+cycx+' anl',
+                     model_recipe['anl_unit'], (unit_dict, cycx))
                 )
+    return stage_list
+
+# Skip models without a recipe so they do not fail
+# the other models in the run
+for MODEL in list(model_list):
+    if MODEL not in list(model_recipe_dict.keys()):
+        print("WARNING: no recipe for "+MODEL+", skipping "
+              +', '.join([model_spec for model_spec in model_spec_list
+                          if model_spec.split(':')[0] == MODEL]))
+        model_list.remove(MODEL)
+        model_spec_list = [model_spec for model_spec in model_spec_list
+                           if model_spec.split(':')[0] != MODEL]
+
+# Make archive directories
+for MODEL in model_list:
+    model_archive_dir = os.path.join(run_settings_dict['ARCHIVE_DIR'], MODEL)
+    if run_settings_dict['SENDARCH'] == 'YES':
+        if not os.path.exists(model_archive_dir):
+            print("Making directory "+model_archive_dir)
+            os.makedirs(model_archive_dir)
+            if model_recipe_dict.get(MODEL, {}).get('restricted', False):
+                ega_util.set_rstprod_permissions(model_archive_dir)
+
+# Open archive manifest
+if os.path.exists(run_settings_dict['ARCHIVE_DIR']):
+    ega_util.open_archive_manifest(run_settings_dict['ARCHIVE_DIR'])
+
+for MODEL in model_list:
+    base_model_run_dir = os.path.join(run_settings_dict['RUN_DIR'], MODEL)
+    if not os.path.exists(base_model_run_dir):
+        print("Making directory "+base_model_run_dir)
+        os.makedirs(base_model_run_dir)
+        if model_recipe_dict.get(MODEL, {}).get('restricted', False):
+            ega_util.set_rstprod_permissions(base_model_run_dir)
+os.chdir(run_settings_dict['RUN_DIR'])
+print("In run directory: "+run_settings_dict['RUN_DIR'])
+
+def run_ready_work_units(ready_unit_list, deadline_dt):
+    """! Poll for the source files of work units, running
+         each unit as soon as its files exist and their sizes
+         are unchanged since the last poll, until all have run
+         or the deadline passes
+
+         Args:
+             ready_unit_list      - list of tuples of list of
+                                    source files and work unit
+             deadline_dt          - datetime to stop polling at
+
+         Returns:
+             failed_work_unit_list - list of names of work units
+                                     that failed or were not
+                                     ready by the deadline
+    """
+    failed_work_unit_list = []
+    pending_unit_list = list(ready_unit_list)
+    last_size_dict = {}
+    poll_seconds = run_settings_dict['ready_poll_min_seconds']
+    while True:
+        ready_work_unit_list = []
+        waiting_unit_list = []
+        changed = False
+        for source_file_list, work_unit in pending_unit_list:
+            size_list = []
+            for source_file in source_file_list:
+                if os.path.exists(source_file):
+                    size_list.append(os.stat(source_file).st_size)
+                else:
+                    size_list.append(0)
+            if 0 not in size_list \
+                    and last_size_dict.get(work_unit[0]) == size_list:
+                ready_work_unit_list.append(work_unit)
             else:
-                run_file = os.path.join(
-                    model_run_dir, 'pgb'+fs+'.gdas.'+CDATE+'.grib2'
-                )
-                archive_file = os.path.join(
-                    model_archive_dir, 'pgb'+fs+'.gdas.'+CDATE+'.grib2'
-                )
-            if not ega_util.check_file(archive_file):
-                if run_settings_dict['SENDARCH'] == 'YES':
-                    ega_util.copy_file(source_file, archive_file)
-                    ega_util.check_file(archive_file)
-        source_file = os.path.join(
-            run_settings_dict['COMROOT'], 'ens_tracker',
-            run_settings_dict['ens_tracker_ver'], 'gfs.'+PDYm,
-            run_settings_dict['CYCLE'].zfill(2), 'tctrack',
-            'avn.t'+run_settings_dict['CYCLE'].zfill(2)
-            +'z.cyclone.trackatcfunix'
-        )
-        run_file = os.path.join(
-            model_run_dir, 'atcfunix.gfs.'+CDATE
-        )
-        archive_file = os.path.join(
-            model_archive_dir, 'atcfunix.gfs.'+CDATE
-        )
-        if not ega_util.check_file(archive_file):
-            if run_settings_dict['SENDARCH'] == 'YES':
-                ega_util.copy_file(source_file, archive_file)
-                ega_util.check_file(archive_file)
-elif run_settings_dict['MODEL'] == 'eagle_solo':
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        CDATE = PDYm+run_settings_dict['CYCLE'].zfill(2)
-        for version in ["eagle_solo", "eagle_solo_test"]:
-            if version == "eagle_solo":
-                aws_url = os.path.join(
-                    'https://noaa-nws-graphcastgfs-pds.s3.amazonaws.com',
-                    f"aigfs.{PDYm}", CDATE[-2:], "model", "atmos", "grib2"
-                )
-            elif version == "eagle_solo_test":
-                aws_url = os.path.join(
-                    'https://noaa-nws-graphcastgfs-pds.s3.amazonaws.com', "test",
-                    f"aigfs.{PDYm}", CDATE[-2:], "model", "atmos", "grib2"
-                )
-            model_run_dir = os.path.join(base_model_run_dir, version, CDATE)
-            if not os.path.exists(model_run_dir):
-                print("Making directory "+model_run_dir)
-                os.makedirs(model_run_dir)
-            os.chdir(model_run_dir)
-            print("In run directory: "+model_run_dir)
-            version_model_archive_dir = os.path.join(
-                model_archive_dir, f"{version}",
-                f"{version}.{PDYm}", CDATE[-2:]
+                if any(size_list) \
+                        and last_size_dict.get(work_unit[0]) != size_list:
+                    changed = True
+                last_size_dict[work_unit[0]] = size_list
+                waiting_unit_list.append((source_file_list, work_unit))
+        if len(ready_work_unit_list) != 0:
+            print("--- READY: "+', '.join([work_unit[0] for work_unit
+                                          in ready_work_unit_list]))
+            failed_work_unit_list.extend(
+                ega_util.run_work_units(ready_work_unit_list,
+                                        int(run_settings_dict['NWORKERS']))
             )
-            if not os.path.exists(version_model_archive_dir):
-                print("Making directory "+version_model_archive_dir)
-                os.makedirs(version_model_archive_dir)
-            # Set AWS URL for date and cycle
-            fhr = int(run_settings_dict['FHR_MIN'])
-            while fhr <= int(run_settings_dict['FHR_MAX']):
-                fhr3 = str(fhr).zfill(3)
-                source_pres_file = os.path.join(
-                    aws_url,
-                    f"aigfs.t{CDATE[-2:]}z.pres.f{fhr3}.grib2"
-                )
-                source_sfc_file = os.path.join(
-                    aws_url,
-                    f"aigfs.t{CDATE[-2:]}z.sfc.f{fhr3}.grib2"
-                )
-                tmp_file = os.path.join(
-                    model_run_dir, 'tmp.'
-                    +f"aigfs.t{CDATE[-2:]}z.f{fhr3}.grib2"
-                )
-                archive_file = os.path.join(
-                    version_model_archive_dir,
-                    f"aigfs.t{CDATE[-2:]}z.f{fhr3}.grib2"
-                )
-                if not ega_util.check_file(archive_file):
-                    for source_file in [source_pres_file, source_sfc_file]:
-                        print(f"Downloading {source_file}")
-                        run_wget = subprocess.run(
-                            ['wget', source_file], capture_output=True
-                        )
-                        if int(run_wget.returncode) != 0:
-                            print(run_wget)
-                    if ega_util.check_file(source_pres_file.rpartition("/")[2]) \
-                            and ega_util.check_file(source_sfc_file.rpartition("/")[2]):
-                        ega_util.run_shell_command(
-                            ["cat", source_pres_file.rpartition("/")[2],
-                             source_sfc_file.rpartition("/")[2], ">", tmp_file]
-                        )
-                    if ega_util.check_file(tmp_file):
-                        ega_util.copy_file(tmp_file, archive_file)
-                fhr+=int(run_settings_dict['FHR_INC'])
-elif run_settings_dict['MODEL'] == 'graphcastgfs':
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        CDATE = PDYm+run_settings_dict['CYCLE'].zfill(2)
-        aws_url = os.path.join(
-            'https://noaa-nws-graphcastgfs-pds.s3.amazonaws.com',
-            f"graphcastgfs.{PDYm}", CDATE[-2:]
-        )
-        for file_levels_num in ['13', '13_test']:
-            model_run_dir = os.path.join(base_model_run_dir, file_levels_num,
-                                         CDATE)
-            if not os.path.exists(model_run_dir):
-                print("Making directory "+model_run_dir)
-                os.makedirs(model_run_dir)
-            os.chdir(model_run_dir)
-            print("In run directory: "+model_run_dir)
-            file_levels_num_model_archive_dir = os.path.join(
-                model_archive_dir, f"graphcastgfs{file_levels_num}",
-                f"graphcastgfs.{PDYm}", CDATE[-2:]
+        pending_unit_list = waiting_unit_list
+        if len(pending_unit_list) == 0:
+            print("--- ALL WORK UNITS READY AND RUN")
+            break
+        now_dt = datetime.datetime.now()
+        if now_dt >= deadline_dt:
+            print("--- DEADLINE "+str(deadline_dt)+" PASSED, NOT READY: "
+                  +', '.join([work_unit[0] for source_file_list, work_unit
+                              in pending_unit_list]))
+            failed_work_unit_list.extend(
+                [work_unit[0] for source_file_list, work_unit
+                 in pending_unit_list]
             )
-            if not os.path.exists(file_levels_num_model_archive_dir):
-                print("Making directory "+file_levels_num_model_archive_dir)
-                os.makedirs(file_levels_num_model_archive_dir)
-            # Set AWS URL for date and cycle
-            if file_levels_num == '13_test':
-                aws_file_levels_num_url = os.path.join(
-                    aws_url, 'forecasts_13_levels_test'
-                )
-            else:
-                aws_file_levels_num_url = os.path.join(
-                    aws_url,
-                    f"forecasts_{file_levels_num}_levels"
-                )
-            fhr = int(run_settings_dict['FHR_MIN'])
-            while fhr <= int(run_settings_dict['FHR_MAX']):
-                fhr3 = str(fhr).zfill(3)
-                source_file = os.path.join(
-                    aws_file_levels_num_url,
-                    f"graphcastgfs.t{CDATE[-2:]}z.pgrb2.0p25.f{fhr3}"
-                )
-                archive_file = os.path.join(
-                    file_levels_num_model_archive_dir,
-                    source_file.rpartition('/')[2]
-                )
-                if not ega_util.check_file(archive_file):
-                    print(f"Downloading {source_file}")
-                    run_wget = subprocess.run(
-                        ['wget', source_file], capture_output=True
-                    )
-                    if int(run_wget.returncode) != 0:
-                        print(run_wget)
-                    if run_settings_dict['SENDARCH'] == 'YES':
-                        ega_util.copy_file(
-                            source_file.rpartition('/')[2], archive_file,
-                        )
-                        ega_util.check_file(archive_file)
-                fhr+=int(run_settings_dict['FHR_INC'])
-else:
-    print(run_settings_dict['MODEL']+" not recongized")
+            break
+        # Poll again soon while files are arriving, back off
+        # while nothing changes
+        if len(ready_work_unit_list) != 0 or changed:
+            poll_seconds = run_settings_dict['ready_poll_min_seconds']
+        else:
+            poll_seconds = min(2*poll_seconds,
+                               run_settings_dict['ready_poll_max_seconds'])
+        sleep_seconds = min(poll_seconds,
+                            (deadline_dt-now_dt).total_seconds())
+        print("--- WAITING "+str(int(sleep_seconds))+" s for "
+              +str(len(pending_unit_list))+" work units")
+        sys.stdout.flush()
+        time.sleep(sleep_seconds)
+    return failed_work_unit_list
+
+# Start operation timing log
+ega_util.start_timing_log(run_settings_dict['RUN_DIR'], 'get_model_data')
+
+# Get model data, planning all the model specifications
+# together so the work units of every model and cycle
+# share the workers
+stage_list = [[], []]
+ready_unit_list = []
+work_unit_name_set = set()
+work_unit_spec_dict = {}
+unsealed_day_list = []
+failed_work_unit_list = []
+for model_spec in model_spec_list:
+    MODEL, CYCLE, FHR_MIN, FHR_MAX, FHR_INC = model_spec.split(':')
+    if run_settings_dict['REOPEN'] == 'YES':
+        ega_util.reopen_days(run_settings_dict['ARCHIVE_DIR'], model_spec)
+    # Readiness mode only gets the cycle of --date, as it comes in
+    if run_settings_dict['READINESS'] == 'YES':
+        check_PDYm_list = [run_settings_dict['PDY']]
+    else:
+        check_PDYm_list = list(PDYm_dict.values())
+    PDYm_list = []
+    for PDYm in check_PDYm_list:
+        if ega_util.check_sealed_day(run_settings_dict['ARCHIVE_DIR'],
+                                     model_spec, PDYm):
+            print("Skipping "+model_spec+" "+PDYm+", sealed as complete")
+        else:
+            PDYm_list.append(PDYm)
+    if run_settings_dict['READINESS'] == 'YES' \
+            and MODEL in list(model_recipe_dict.keys()) \
+            and model_recipe_dict[MODEL]['fhr_source_func'] is not None:
+        model_ready_unit_list = []
+    else:
+        if run_settings_dict['READINESS'] == 'YES':
+            print("Readiness polling not supported for "+MODEL+", "
+                  +"getting what is there now")
+        model_ready_unit_list = None
+    model_stage_list = plan_model_work_units(
+        MODEL, CYCLE, int(FHR_MIN), int(FHR_MAX), int(FHR_INC), PDYm_list,
+        ready_unit_list=model_ready_unit_list
+    )
+    if model_stage_list is None:
+        failed_work_unit_list.append(model_spec)
+        continue
+    if model_ready_unit_list is not None:
+        for source_file_list, work_unit in model_ready_unit_list:
+            if work_unit[0] not in work_unit_name_set:
+                work_unit_name_set.add(work_unit[0])
+                work_unit_spec_dict[work_unit[0]] = model_spec
+                ready_unit_list.append((source_file_list, work_unit))
+    for stage, model_stage in zip(stage_list, model_stage_list):
+        for work_unit in model_stage:
+            # Units shared by cycles of the same model
+            # (e.g. ecm analyses) are only run once
+            if work_unit[0] not in work_unit_name_set:
+                work_unit_name_set.add(work_unit[0])
+                work_unit_spec_dict[work_unit[0]] = model_spec
+                stage.append(work_unit)
+    unsealed_day_list.extend(
+        [(model_spec, PDYm) for PDYm in PDYm_list]
+    )
+if len(ready_unit_list) != 0:
+    deadline_dt = (datetime.datetime.now()
+                   +datetime.timedelta(
+                       minutes=int(run_settings_dict['DEADLINE'])
+                   ))
+    print("Polling for "+str(len(ready_unit_list))+" work units until "
+          +str(deadline_dt))
+    failed_work_unit_list.extend(
+        run_ready_work_units(ready_unit_list, deadline_dt)
+    )
+for stage in stage_list:
+    failed_work_unit_list.extend(
+        ega_util.run_work_units(stage, int(run_settings_dict['NWORKERS']))
+    )
+
+# Seal the days that now have all their files so later
+# runs skip them
+for model_spec, PDYm in unsealed_day_list:
+    MODEL, CYCLE, FHR_MIN, FHR_MAX, FHR_INC = model_spec.split(':')
+    check_file_list = get_model_archive_file_list(
+        MODEL, CYCLE, int(FHR_MIN), int(FHR_MAX), int(FHR_INC), PDYm
+    )
+    ega_util.seal_day(run_settings_dict['ARCHIVE_DIR'], model_spec, PDYm,
+                      check_file_list)
+ega_util.print_timing_summary()
+# Report each model specification on its own, a failure in
+# one does not stop the work units of the others
+for model_spec in model_spec_list:
+    spec_failed_list = [
+        name for name in failed_work_unit_list
+        if work_unit_spec_dict.get(name, name) == model_spec
+    ]
+    if len(spec_failed_list) != 0:
+        print(model_spec+": "+str(len(spec_failed_list))
+              +" work units failed")
+    else:
+        print(model_spec+": OK")
+if len(failed_work_unit_list) != 0:
+    print("ERROR: "+str(len(failed_work_unit_list))+" work units failed: "
+          +', '.join(failed_work_unit_list))
     sys.exit(1)
 
 print("\nEND: "+sys.argv[0]+" at "+str(datetime.datetime.today())+"\n")
@@ -16,7 +16,8 @@ Command Line Agruments:
                    default: /lfs/h2/emc/vpppg/noscrub/$USER/obs_archive
         --rundir: optional, path to run directory,
                   default: /lfs/h2/emc/stmp/$USER/run_get_obs_data
-        --obs: optional, observation name,
+        --obs: optional, observation name, or comma separated
+               list of observation names to get in one run,
                default: prepbufr_gdas
 Input Files:
 Output Files:
@@ -48,7 +49,7 @@ def usage():
            +"default: /lfs/h2/emc/vpppg/noscrub/$USER/obs_archive\n"
            +"   --rundir=RUN_DIR        optional, "
            +"default: /lfs/h2/emc/stmp/$USER/run_get_obs_data\n"
-           +"   --obs=obs               optional, "
+           +"   --obs=obs[,obs...]      optional, "
            +"default: prepbufr_gdas\n")
     sys.exit(1)
 
@@ -168,462 +169,523 @@ PDYm_dict = ega_util.get_PDYm_dict(run_settings_dict['PDY'])
 wcoss2_dict = ega_util.get_machine_dict()
 
 # Make archive directory
-if run_settings_dict['OBS'] in ['prepbufr_gdas', 'prepbufr_nam',
-                                'prepbufr_rap']:
-    obs_archive_dir = os.path.join(
-        run_settings_dict['ARCHIVE_DIR'],
-        run_settings_dict['OBS'].partition('_')[0],
-        run_settings_dict['OBS'].partition('_')[2]
-    )
-else:
-    obs_archive_dir = os.path.join(
-        run_settings_dict['ARCHIVE_DIR'], run_settings_dict['OBS']
-    )
 if run_settings_dict['SENDARCH'] == 'YES':
-    if not os.path.exists(obs_archive_dir):
-        print("Making directory "+obs_archive_dir)
-        os.makedirs(obs_archive_dir)
-        if run_settings_dict['OBS'] in ['prepbufr_gdas', 'prepbufr_nam',
-                                        'prepbufr_rap']:
-            ega_util.set_rstprod_permissions(obs_archive_dir)
-base_obs_run_dir = os.path.join(
-    run_settings_dict['RUN_DIR'], run_settings_dict['OBS']
-)
-if not os.path.exists(base_obs_run_dir):
-    print("Making directory "+base_obs_run_dir)
-    os.makedirs(base_obs_run_dir)
-    if run_settings_dict['OBS'] in ['prepbufr_gdas', 'prepbufr_nam',
-                                    'prepbufr_rap']:
-        ega_util.set_rstprod_permissions(base_obs_run_dir)
-os.chdir(base_obs_run_dir)
-print("In run directory: "+base_obs_run_dir)
+    if not os.path.exists(run_settings_dict['ARCHIVE_DIR']):
+        print("Making directory "+run_settings_dict['ARCHIVE_DIR'])
+        os.makedirs(run_settings_dict['ARCHIVE_DIR'])
 
-# Get obs data
-# prepbufr_gdas - Operational GDAS prepbufr files
-if run_settings_dict['OBS'] == 'prepbufr_gdas':
-    #gdas_prod_dir = os.path.join(
-    #    run_settings_dict['COMROOT'], 'gfs', run_settings_dict['gfs_ver']
-    #)
-    gdas_prod_dir = os.path.join(
-        run_settings_dict['COMROOT'], 'obsproc', run_settings_dict['obsproc_ver']
-    )
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-            ega_util.set_rstprod_permissions(obs_run_dir)
-        os.chdir(obs_run_dir)
-        print("In run directory: "+obs_run_dir)
-        for cyc in run_settings_dict['prepbufr_gdas_cycle_list']:
-            run_file = os.path.join(
-                obs_run_dir, 'prepbufr.gdas.'+PDYm+cyc
-            )
-            archive_file = os.path.join(
-                obs_archive_dir, 'prepbufr.gdas.'+PDYm+cyc
-            )
-            source_file = os.path.join(
-                gdas_prod_dir, 'gdas.'+PDYm, cyc, 'atmos',
-                'gdas.t'+cyc+'z.prepbufr'
-            )
-            if not ega_util.check_file(archive_file):
-                ega_util.copy_file(source_file, run_file)
-                if run_settings_dict['SENDARCH'] == 'YES':
-                    ega_util.copy_file(run_file, archive_file)
-                    if ega_util.check_file(archive_file):
-                        ega_util.set_rstprod_permissions(archive_file)
-# prepbufr_nam - Operational NAM prepbufr files
-elif run_settings_dict['OBS'] == 'prepbufr_nam':
-    #nam_prod_dir = os.path.join(
-    #    run_settings_dict['COMROOT'], 'nam', run_settings_dict['nam_ver']
-    #)
-    nam_prod_dir = os.path.join(
-        run_settings_dict['COMROOT'], 'obsproc', run_settings_dict['obsproc_ver']
+# Open archive manifest
+if os.path.exists(run_settings_dict['ARCHIVE_DIR']):
+    ega_util.open_archive_manifest(run_settings_dict['ARCHIVE_DIR'])
+
+# Observation types get_obs_data gets
+supported_obs_list = [
+    'prepbufr_gdas', 'prepbufr_nam', 'prepbufr_rap', 'ccpa_accum24hr',
+    'ccpa_accum6hr', 'nohrsc_accum24hr', 'osi_saf', 'get_d', 'ghrsst_ospo',
+    'ndbc_buoy', 'jason3', 'OBSPRCP'
+]
+
+def get_obs_data(OBS):
+    """! Get the data for one observation type
+
+         Args:
+             OBS - string of observation name
+
+         Returns:
+    """
+    print("\nGetting "+OBS+" data")
+    # Make archive directory
+    if OBS in ['prepbufr_gdas', 'prepbufr_nam', 'prepbufr_rap']:
+        obs_archive_dir = os.path.join(
+            run_settings_dict['ARCHIVE_DIR'],
+            OBS.partition('_')[0],
+            OBS.partition('_')[2]
+        )
+    else:
+        obs_archive_dir = os.path.join(
+            run_settings_dict['ARCHIVE_DIR'], OBS
+        )
+    if run_settings_dict['SENDARCH'] == 'YES':
+        if not os.path.exists(obs_archive_dir):
+            print("Making directory "+obs_archive_dir)
+            os.makedirs(obs_archive_dir)
+            if OBS in ['prepbufr_gdas', 'prepbufr_nam', 'prepbufr_rap']:
+                ega_util.set_rstprod_permissions(obs_archive_dir)
+
+    base_obs_run_dir = os.path.join(
+        run_settings_dict['RUN_DIR'], OBS
     )
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        obs_archive_PDYm_dir = os.path.join(obs_archive_dir, 'nam.'+PDYm)
-        if run_settings_dict['SENDARCH'] == 'YES':
-            if not os.path.exists(obs_archive_PDYm_dir):
-                print("Making directory "+obs_archive_PDYm_dir)
-                os.makedirs(obs_archive_PDYm_dir)
-                ega_util.set_rstprod_permissions(obs_archive_PDYm_dir)
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-            ega_util.set_rstprod_permissions(obs_run_dir)
-        os.chdir(obs_run_dir)
-        print("In run directory: "+obs_run_dir)
-        for cyc in run_settings_dict['prepbufr_nam_cycle_list']:
-            for suffix in run_settings_dict['prepbufr_nam_suffix_list']:
+    if not os.path.exists(base_obs_run_dir):
+        print("Making directory "+base_obs_run_dir)
+        os.makedirs(base_obs_run_dir)
+        if OBS in ['prepbufr_gdas', 'prepbufr_nam', 'prepbufr_rap']:
+            ega_util.set_rstprod_permissions(base_obs_run_dir)
+    os.chdir(base_obs_run_dir)
+    print("In run directory: "+base_obs_run_dir)
+
+    # Get obs data
+    # prepbufr_gdas - Operational GDAS prepbufr files
+    if OBS == 'prepbufr_gdas':
+        #gdas_prod_dir = os.path.join(
+        #    run_settings_dict['COMROOT'], 'gfs', run_settings_dict['gfs_ver']
+        #)
+        gdas_prod_dir = os.path.join(
+            run_settings_dict['COMROOT'], 'obsproc', run_settings_dict['obsproc_ver']
+        )
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+                ega_util.set_rstprod_permissions(obs_run_dir)
+            os.chdir(obs_run_dir)
+            print("In run directory: "+obs_run_dir)
+            for cyc in run_settings_dict['prepbufr_gdas_cycle_list']:
                 run_file = os.path.join(
-                    obs_run_dir, 'nam.t'+cyc+'z.prepbufr.'+suffix
+                    obs_run_dir, 'prepbufr.gdas.'+PDYm+cyc
                 )
                 archive_file = os.path.join(
-                    obs_archive_PDYm_dir, 'nam.t'+cyc+'z.prepbufr.'+suffix
+                    obs_archive_dir, 'prepbufr.gdas.'+PDYm+cyc
                 )
                 source_file = os.path.join(
-                    nam_prod_dir, 'nam.'+PDYm, 'nam.t'+cyc+'z.prepbufr.'+suffix
+                    gdas_prod_dir, 'gdas.'+PDYm, cyc, 'atmos',
+                    'gdas.t'+cyc+'z.prepbufr'
                 )
                 if not ega_util.check_file(archive_file):
-                    ega_util.copy_file(source_file, run_file)
                     if run_settings_dict['SENDARCH'] == 'YES':
-                        ega_util.copy_file(run_file, archive_file)
-                        if ega_util.check_file(archive_file):
-                            ega_util.set_rstprod_permissions(archive_file)
-# prepbufr_rap - Operational RAP prepbufr files
-elif run_settings_dict['OBS'] == 'prepbufr_rap':
-    rap_prod_dir = os.path.join(
-        run_settings_dict['COMROOT'], 'obsproc', run_settings_dict['obsproc_ver']
-    )
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        obs_archive_PDYm_dir = os.path.join(obs_archive_dir, 'rap.'+PDYm)
-        if run_settings_dict['SENDARCH'] == 'YES':
-            if not os.path.exists(obs_archive_PDYm_dir):
-                print("Making directory "+obs_archive_PDYm_dir)
-                os.makedirs(obs_archive_PDYm_dir)
-                ega_util.set_rstprod_permissions(obs_archive_PDYm_dir)
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-            ega_util.set_rstprod_permissions(obs_run_dir)
-        os.chdir(obs_run_dir)
-        print("In run directory: "+obs_run_dir)
-        for cyc in run_settings_dict['prepbufr_rap_cycle_list']:
-            run_file = os.path.join(
-                obs_run_dir, 'rap.t'+cyc+'z.prepbufr.tm00'
-            )
-            archive_file = os.path.join(
-                obs_archive_PDYm_dir, 'rap.t'+cyc+'z.prepbufr.tm00'
-            )
-            source_file = os.path.join(
-                rap_prod_dir, 'rap.'+PDYm, 'rap.t'+cyc+'z.prepbufr.tm00'
-            )
-            if not ega_util.check_file(archive_file):
-                ega_util.copy_file(source_file, run_file)
-                if run_settings_dict['SENDARCH'] == 'YES':
-                    ega_util.copy_file(run_file, archive_file)
-                    if ega_util.check_file(archive_file):
-                        ega_util.set_rstprod_permissions(archive_file)
-# ccpa_accum24hr - CCPA 24 hour accumulation files
-elif run_settings_dict['OBS'] == 'ccpa_accum24hr':
-    CCPA24HR_ACCUM = os.path.join(
-        run_settings_dict['HOMEemc_global_archive'], 'exec',
-        'ccpa24hr_accum'
-    )
-    ccpa_accum24hr_prod_dir = os.path.join(
-        run_settings_dict['COMROOT'], 'verf_precip',
-        run_settings_dict['verf_precip_ver']
-    )
-    ccpa_prod_dir = os.path.join(
-        run_settings_dict['COMROOT'], 'ccpa',
-        run_settings_dict['ccpa_ver']
-    )
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
-        PDYm_m1_dt = PDYm_dt - datetime.timedelta(hours=24)
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-        os.chdir(obs_run_dir)
-        print("In run directory: "+obs_run_dir)
-        run_file = os.path.join(
-            obs_run_dir, 'ccpa.'+PDYm+'12.24h'
-        )
-        archive_file = os.path.join(
-            obs_archive_dir, 'ccpa.'+PDYm+'12.24h'
+                        ega_util.stage_file(source_file, archive_file,
+                                            restricted=True)
+                        ega_util.check_file(archive_file)
+                    else:
+                        ega_util.copy_file(source_file, run_file)
+    # prepbufr_nam - Operational NAM prepbufr files
+    elif OBS == 'prepbufr_nam':
+        #nam_prod_dir = os.path.join(
+        #    run_settings_dict['COMROOT'], 'nam', run_settings_dict['nam_ver']
+        #)
+        nam_prod_dir = os.path.join(
+            run_settings_dict['COMROOT'], 'obsproc', run_settings_dict['obsproc_ver']
         )
-        source_file = os.path.join(
-            ccpa_accum24hr_prod_dir, 'precip.'+PDYm, 'ccpa.'+PDYm+'12.24h'
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            obs_archive_PDYm_dir = os.path.join(obs_archive_dir, 'nam.'+PDYm)
+            if run_settings_dict['SENDARCH'] == 'YES':
+                if not os.path.exists(obs_archive_PDYm_dir):
+                    print("Making directory "+obs_archive_PDYm_dir)
+                    os.makedirs(obs_archive_PDYm_dir)
+                    ega_util.set_rstprod_permissions(obs_archive_PDYm_dir)
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+                ega_util.set_rstprod_permissions(obs_run_dir)
+            os.chdir(obs_run_dir)
+            print("In run directory: "+obs_run_dir)
+            for cyc in run_settings_dict['prepbufr_nam_cycle_list']:
+                for suffix in run_settings_dict['prepbufr_nam_suffix_list']:
+                    run_file = os.path.join(
+                        obs_run_dir, 'nam.t'+cyc+'z.prepbufr.'+suffix
+                    )
+                    archive_file = os.path.join(
+                        obs_archive_PDYm_dir, 'nam.t'+cyc+'z.prepbufr.'+suffix
+                    )
+                    source_file = os.path.join(
+                        nam_prod_dir, 'nam.'+PDYm, 'nam.t'+cyc+'z.prepbufr.'+suffix
+                    )
+                    if not ega_util.check_file(archive_file):
+                        if run_settings_dict['SENDARCH'] == 'YES':
+                            ega_util.stage_file(source_file, archive_file,
+                                                restricted=True)
+                            ega_util.check_file(archive_file)
+                        else:
+                            ega_util.copy_file(source_file, run_file)
+    # prepbufr_rap - Operational RAP prepbufr files
+    elif OBS == 'prepbufr_rap':
+        rap_prod_dir = os.path.join(
+            run_settings_dict['COMROOT'], 'obsproc', run_settings_dict['obsproc_ver']
         )
-        if not ega_util.check_file(archive_file):
-            input_acc_ccpa_file = os.path.join(obs_run_dir, 'input_acc_ccpa')
-            with open(input_acc_ccpa_file, 'w') as write_iac:
-                write_iac.write('obs\n')
-                write_iac.write('ccpa.\n')
-                ccpa1 = os.path.join(
-                    ccpa_prod_dir, 'ccpa.'+PDYm_m1_dt.strftime('%Y%m%d'), '18',
-                    'ccpa.t18z.06h.hrap.conus'
-                )
-                if os.path.exists(ccpa1):
-                    write_iac.write(ccpa1+'\n')
-                ccpa2=os.path.join(
-                    ccpa_prod_dir, 'ccpa.'+PDYm, '00',
-                    'ccpa.t00z.06h.hrap.conus'
-                )
-                if os.path.exists(ccpa2):
-                    write_iac.write(ccpa2+'\n')
-                ccpa3=os.path.join(
-                    ccpa_prod_dir, 'ccpa.'+PDYm, '06',
-                    'ccpa.t06z.06h.hrap.conus'
-                )
-                if os.path.exists(ccpa3):
-                    write_iac.write(ccpa3+'\n')
-                ccpa4=os.path.join(
-                    ccpa_prod_dir, 'ccpa.'+PDYm, '12',
-                    'ccpa.t12z.06h.hrap.conus'
-                )
-                if os.path.exists(ccpa4):
-                    write_iac.write(ccpa4)
-            ega_util.run_shell_command(
-                [CCPA24HR_ACCUM, '<', input_acc_ccpa_file]
-            )
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            obs_archive_PDYm_dir = os.path.join(obs_archive_dir, 'rap.'+PDYm)
             if run_settings_dict['SENDARCH'] == 'YES':
-                ega_util.copy_file(run_file, archive_file)
-                ega_util.check_file(archive_file)
-# ccpa_accum6hr - CCPA 6 hour accumulation files
-elif run_settings_dict['OBS'] == 'ccpa_accum6hr':
-    ccpa_accum6hr_prod_dir = os.path.join(
-        run_settings_dict['COMROOT'], 'ccpa',
-        run_settings_dict['ccpa_ver']
-    )
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-        os.chdir(obs_run_dir)
-        print("In run directory: "+obs_run_dir)
-        for valid_hr in run_settings_dict['ccpa_accum6hr_valid_hr_list']:
-            for grid in ['hrap', '1p0']:
+                if not os.path.exists(obs_archive_PDYm_dir):
+                    print("Making directory "+obs_archive_PDYm_dir)
+                    os.makedirs(obs_archive_PDYm_dir)
+                    ega_util.set_rstprod_permissions(obs_archive_PDYm_dir)
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+                ega_util.set_rstprod_permissions(obs_run_dir)
+            os.chdir(obs_run_dir)
+            print("In run directory: "+obs_run_dir)
+            for cyc in run_settings_dict['prepbufr_rap_cycle_list']:
                 run_file = os.path.join(
-                    obs_run_dir, 'ccpa.'+grid+'.'+PDYm+valid_hr+'.6h'
+                    obs_run_dir, 'rap.t'+cyc+'z.prepbufr.tm00'
                 )
                 archive_file = os.path.join(
-                    obs_archive_dir, 'ccpa.'+grid+'.'+PDYm+valid_hr+'.6h'
+                    obs_archive_PDYm_dir, 'rap.t'+cyc+'z.prepbufr.tm00'
                 )
                 source_file = os.path.join(
-                    ccpa_accum6hr_prod_dir, 'ccpa.'+PDYm, valid_hr,
-                    'ccpa.t'+valid_hr+'z.06h.'+grid+'.conus.gb2'
+                    rap_prod_dir, 'rap.'+PDYm, 'rap.t'+cyc+'z.prepbufr.tm00'
                 )
                 if not ega_util.check_file(archive_file):
-                    ega_util.copy_file(source_file, run_file)
                     if run_settings_dict['SENDARCH'] == 'YES':
-                        ega_util.copy_file(run_file, archive_file)
+                        ega_util.stage_file(source_file, archive_file,
+                                            restricted=True)
                         ega_util.check_file(archive_file)
-# nohrsc_accum24hr - NOHRSC 24 hour accumulation files
-elif run_settings_dict['OBS'] == 'nohrsc_accum24hr':
-    nohrsc_accum24hr_prod_dir = os.path.join(
-        run_settings_dict['DCOMROOT']
-    )
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-        os.chdir(obs_run_dir)
-        print("In run directory: "+obs_run_dir)
-        run_file = os.path.join(
-            obs_run_dir, 'nohrsc.'+PDYm+'12.24h'
+                    else:
+                        ega_util.copy_file(source_file, run_file)
+    # ccpa_accum24hr - CCPA 24 hour accumulation files
+    elif OBS == 'ccpa_accum24hr':
+        CCPA24HR_ACCUM = os.path.join(
+            run_settings_dict['HOMEemc_global_archive'], 'exec',
+            'ccpa24hr_accum'
         )
-        archive_file = os.path.join(
-            obs_archive_dir, 'nohrsc.'+PDYm+'12.24h'
+        ccpa_accum24hr_prod_dir = os.path.join(
+            run_settings_dict['COMROOT'], 'verf_precip',
+            run_settings_dict['verf_precip_ver']
         )
-        source_file = os.path.join(
-            nohrsc_accum24hr_prod_dir, PDYm, 'wgrbbul', 'nohrsc_snowfall',
-            'sfav2_CONUS_24h_'+PDYm+'12_grid184.grb2'
+        ccpa_prod_dir = os.path.join(
+            run_settings_dict['COMROOT'], 'ccpa',
+            run_settings_dict['ccpa_ver']
         )
-        if not ega_util.check_file(archive_file):
-            ega_util.copy_file(source_file, run_file)
-            if run_settings_dict['SENDARCH'] == 'YES':
-                ega_util.copy_file(run_file, archive_file)
-                ega_util.check_file(archive_file)
-#osi_saf - sea ice concentration files
-elif run_settings_dict['OBS'] == 'osi_saf':
-    osi_saf_prod_dir = os.path.join(
-        run_settings_dict['DCOMROOT']
-    )
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-        os.chdir(obs_run_dir)
-        print("In run directory: "+obs_run_dir)
-        # Daily NH and SH files
-        for hem in ['nh', 'sh']:
-            daily_hem_run_file = os.path.join(
-                obs_run_dir, 'ice_conc_'+hem+'_polstere-100_multi_'
-                +PDYm_dt.strftime('%Y%m%d')+'1200.nc'
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
+            PDYm_m1_dt = PDYm_dt - datetime.timedelta(hours=24)
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+            os.chdir(obs_run_dir)
+            print("In run directory: "+obs_run_dir)
+            run_file = os.path.join(
+                obs_run_dir, 'ccpa.'+PDYm+'12.24h'
             )
-            daily_hem_archive_file = os.path.join(
-                obs_archive_dir, 'ice_conc_'+hem+'_polstere-100_multi_'
-                +PDYm_dt.strftime('%Y%m%d')+'1200.nc'
+            archive_file = os.path.join(
+                obs_archive_dir, 'ccpa.'+PDYm+'12.24h'
             )
-            if not ega_util.check_file(daily_hem_archive_file):
-                source_hem_file = os.path.join(
-                    osi_saf_prod_dir, PDYm_dt.strftime('%Y%m%d'),
-                    'seaice', 'osisaf',
-                    'ice_conc_'+hem+'_polstere-100_multi_'
+            source_file = os.path.join(
+                ccpa_accum24hr_prod_dir, 'precip.'+PDYm, 'ccpa.'+PDYm+'12.24h'
+            )
+            if not ega_util.check_file(archive_file):
+                input_acc_ccpa_file = os.path.join(obs_run_dir, 'input_acc_ccpa')
+                with open(input_acc_ccpa_file, 'w') as write_iac:
+                    write_iac.write('obs\n')
+                    write_iac.write('ccpa.\n')
+                    ccpa1 = os.path.join(
+                        ccpa_prod_dir, 'ccpa.'+PDYm_m1_dt.strftime('%Y%m%d'), '18',
+                        'ccpa.t18z.06h.hrap.conus'
+                    )
+                    if os.path.exists(ccpa1):
+                        write_iac.write(ccpa1+'\n')
+                    ccpa2=os.path.join(
+                        ccpa_prod_dir, 'ccpa.'+PDYm, '00',
+                        'ccpa.t00z.06h.hrap.conus'
+                    )
+                    if os.path.exists(ccpa2):
+                        write_iac.write(ccpa2+'\n')
+                    ccpa3=os.path.join(
+                        ccpa_prod_dir, 'ccpa.'+PDYm, '06',
+                        'ccpa.t06z.06h.hrap.conus'
+                    )
+                    if os.path.exists(ccpa3):
+                        write_iac.write(ccpa3+'\n')
+                    ccpa4=os.path.join(
+                        ccpa_prod_dir, 'ccpa.'+PDYm, '12',
+                        'ccpa.t12z.06h.hrap.conus'
+                    )
+                    if os.path.exists(ccpa4):
+                        write_iac.write(ccpa4)
+                ega_util.run_shell_command(
+                    [CCPA24HR_ACCUM, '<', input_acc_ccpa_file], shell=True
+                )
+                if run_settings_dict['SENDARCH'] == 'YES':
+                    ega_util.copy_file(run_file, archive_file)
+                    ega_util.check_file(archive_file)
+    # ccpa_accum6hr - CCPA 6 hour accumulation files
+    elif OBS == 'ccpa_accum6hr':
+        ccpa_accum6hr_prod_dir = os.path.join(
+            run_settings_dict['COMROOT'], 'ccpa',
+            run_settings_dict['ccpa_ver']
+        )
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+            os.chdir(obs_run_dir)
+            print("In run directory: "+obs_run_dir)
+            for valid_hr in run_settings_dict['ccpa_accum6hr_valid_hr_list']:
+                for grid in ['hrap', '1p0']:
+                    run_file = os.path.join(
+                        obs_run_dir, 'ccpa.'+grid+'.'+PDYm+valid_hr+'.6h'
+                    )
+                    archive_file = os.path.join(
+                        obs_archive_dir, 'ccpa.'+grid+'.'+PDYm+valid_hr+'.6h'
+                    )
+                    source_file = os.path.join(
+                        ccpa_accum6hr_prod_dir, 'ccpa.'+PDYm, valid_hr,
+                        'ccpa.t'+valid_hr+'z.06h.'+grid+'.conus.gb2'
+                    )
+                    if not ega_util.check_file(archive_file):
+                        if run_settings_dict['SENDARCH'] == 'YES':
+                            ega_util.stage_file(source_file, archive_file)
+                            ega_util.check_file(archive_file)
+                        else:
+                            ega_util.copy_file(source_file, run_file)
+    # nohrsc_accum24hr - NOHRSC 24 hour accumulation files
+    elif OBS == 'nohrsc_accum24hr':
+        nohrsc_accum24hr_prod_dir = os.path.join(
+            run_settings_dict['DCOMROOT']
+        )
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+            os.chdir(obs_run_dir)
+            print("In run directory: "+obs_run_dir)
+            run_file = os.path.join(
+                obs_run_dir, 'nohrsc.'+PDYm+'12.24h'
+            )
+            archive_file = os.path.join(
+                obs_archive_dir, 'nohrsc.'+PDYm+'12.24h'
+            )
+            source_file = os.path.join(
+                nohrsc_accum24hr_prod_dir, PDYm, 'wgrbbul', 'nohrsc_snowfall',
+                'sfav2_CONUS_24h_'+PDYm+'12_grid184.grb2'
+            )
+            if not ega_util.check_file(archive_file):
+                if run_settings_dict['SENDARCH'] == 'YES':
+                    ega_util.stage_file(source_file, archive_file)
+                    ega_util.check_file(archive_file)
+                else:
+                    ega_util.copy_file(source_file, run_file)
+    #osi_saf - sea ice concentration files
+    elif OBS == 'osi_saf':
+        osi_saf_prod_dir = os.path.join(
+            run_settings_dict['DCOMROOT']
+        )
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+            os.chdir(obs_run_dir)
+            print("In run directory: "+obs_run_dir)
+            # Daily NH and SH files
+            for hem in ['nh', 'sh']:
+                daily_hem_run_file = os.path.join(
+                    obs_run_dir, 'ice_conc_'+hem+'_polstere-100_multi_'
                     +PDYm_dt.strftime('%Y%m%d')+'1200.nc'
                 )
-                if not ega_util.check_file(daily_hem_run_file):
-                    ega_util.copy_file(source_hem_file, daily_hem_run_file)
-                if ega_util.check_file(daily_hem_run_file):
-                    if run_settings_dict['SENDARCH'] == 'YES':
-                        ega_util.copy_file(daily_hem_run_file, daily_hem_archive_file)
-# get_d - NESDIS GET_D Flux files
-elif run_settings_dict['OBS']  == 'get_d':
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-        os.chdir(obs_run_dir)
-        PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
-        PDYm_YYYY = PDYm_dt.strftime('%Y')
-        PDYm_j = PDYm_dt.strftime('%j')
-        ftp_file = os.path.join(PDYm_YYYY, 'GETDL3_DAL_CONUS_'
-                                +PDYm_YYYY+PDYm_j+'_1.0.nc')
-        run_file = os.path.join(obs_run_dir, 'GETDL3_DAL_CONUS_'
-                                    +PDYm_YYYY+PDYm_j+'_1.0.nc')
-        archive_file = os.path.join(obs_archive_dir, 'GETDL3_DAL_CONUS_'
+                daily_hem_archive_file = os.path.join(
+                    obs_archive_dir, 'ice_conc_'+hem+'_polstere-100_multi_'
+                    +PDYm_dt.strftime('%Y%m%d')+'1200.nc'
+                )
+                if not ega_util.check_file(daily_hem_archive_file):
+                    source_hem_file = os.path.join(
+                        osi_saf_prod_dir, PDYm_dt.strftime('%Y%m%d'),
+                        'seaice', 'osisaf',
+                        'ice_conc_'+hem+'_polstere-100_multi_'
+                        +PDYm_dt.strftime('%Y%m%d')+'1200.nc'
+                    )
+                    if not ega_util.check_file(daily_hem_run_file):
+                        ega_util.copy_file(source_hem_file, daily_hem_run_file)
+                    if ega_util.check_file(daily_hem_run_file):
+                        if run_settings_dict['SENDARCH'] == 'YES':
+                            ega_util.copy_file(daily_hem_run_file, daily_hem_archive_file)
+    # get_d - NESDIS GET_D Flux files
+    elif OBS  == 'get_d':
+        # The days missing from the archive are gotten together so
+        # the FTP server is logged in to and listed once, straight
+        # into the archive
+        ftp_file_list = []
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+            os.chdir(obs_run_dir)
+            PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
+            PDYm_YYYY = PDYm_dt.strftime('%Y')
+            PDYm_j = PDYm_dt.strftime('%j')
+            ftp_file = os.path.join(PDYm_YYYY, 'GETDL3_DAL_CONUS_'
                                     +PDYm_YYYY+PDYm_j+'_1.0.nc')
-        if not ega_util.check_file(archive_file):
-            ega_util.run_shell_command(
-                ['lftp', '-c',
-                 'open '+run_settings_dict['nesdis_get_d_ftp']+'; '
-                 'cd '+run_settings_dict['nesdis_get_d_ftp_dir']+'; '
-                 'get '+ftp_file+' -o '+run_file]
-            )
-            if run_settings_dict['SENDARCH'] == 'YES':
-                ega_util.copy_file(run_file, archive_file)
-                ega_util.check_file(archive_file)
-# ghrsst_ospo - GHRSST OSPO SST
-elif run_settings_dict['OBS']  == 'ghrsst_ospo':
-    ghrsst_ospo_prod_dir = os.path.join(
-        run_settings_dict['DCOMROOT']
-    )
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-        os.chdir(obs_run_dir)
-        PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
-        prod_file = os.path.join(ghrsst_ospo_prod_dir,
-                                 PDYm_dt.strftime('%Y%m%d'),
-                                 'validation_data', 'marine',
-                                 'ghrsst', PDYm_dt.strftime('%Y%m%d')
-                                 +'_OSPO_L4_GHRSST.nc')
-        run_file = os.path.join(obs_run_dir,
-                                PDYm_dt.strftime('%Y%m%d')
-                                +'_OSPO_L4_GHRSST.nc')
-        archive_file = os.path.join(obs_archive_dir,
+            run_file = os.path.join(obs_run_dir, 'GETDL3_DAL_CONUS_'
+                                        +PDYm_YYYY+PDYm_j+'_1.0.nc')
+            archive_file = os.path.join(obs_archive_dir, 'GETDL3_DAL_CONUS_'
+                                        +PDYm_YYYY+PDYm_j+'_1.0.nc')
+            if not ega_util.check_file(archive_file):
+                if run_settings_dict['SENDARCH'] == 'YES':
+                    dest_file = archive_file
+                else:
+                    dest_file = run_file
+                ftp_file_list.append(
+                    (run_settings_dict['nesdis_get_d_ftp']+'/'
+                     +run_settings_dict['nesdis_get_d_ftp_dir']+'/'
+                     +ftp_file, dest_file)
+                )
+        if len(ftp_file_list) != 0:
+            ega_util.get_remote_files(ftp_file_list)
+        for ftp_url, dest_file in ftp_file_list:
+            ega_util.check_file(dest_file)
+    # ghrsst_ospo - GHRSST OSPO SST
+    elif OBS  == 'ghrsst_ospo':
+        ghrsst_ospo_prod_dir = os.path.join(
+            run_settings_dict['DCOMROOT']
+        )
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+            os.chdir(obs_run_dir)
+            PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
+            prod_file = os.path.join(ghrsst_ospo_prod_dir,
+                                     PDYm_dt.strftime('%Y%m%d'),
+                                     'validation_data', 'marine',
+                                     'ghrsst', PDYm_dt.strftime('%Y%m%d')
+                                     +'_OSPO_L4_GHRSST.nc')
+            run_file = os.path.join(obs_run_dir,
                                     PDYm_dt.strftime('%Y%m%d')
                                     +'_OSPO_L4_GHRSST.nc')
-        if not ega_util.check_file(archive_file):
-            ega_util.copy_file(prod_file, run_file)
-            if ega_util.check_file(run_file):
+            archive_file = os.path.join(obs_archive_dir,
+                                        PDYm_dt.strftime('%Y%m%d')
+                                        +'_OSPO_L4_GHRSST.nc')
+            if not ega_util.check_file(archive_file):
                 if run_settings_dict['SENDARCH'] == 'YES':
-                    ega_util.copy_file(run_file, archive_file)
+                    ega_util.stage_file(prod_file, archive_file)
                     ega_util.check_file(archive_file)
-# ndbc_buoy - NDBC buoy
-elif run_settings_dict['OBS']  == 'ndbc_buoy':
-    ndbc_buoy_prod_dir = os.path.join(
-        run_settings_dict['DCOMROOT']
-    )
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-        os.chdir(obs_run_dir)
-        PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
-        prod_files = os.path.join(ndbc_buoy_prod_dir,
-                                  PDYm_dt.strftime('%Y%m%d'),
-                                  'validation_data', 'marine',
-                                  'buoy')
-        run_file = os.path.join(obs_run_dir,
-                                f"buoy_{PDYm_dt:%Y%m%d}.tar")
-        archive_file = os.path.join(obs_archive_dir,
+                else:
+                    ega_util.copy_file(prod_file, run_file)
+                    ega_util.check_file(run_file)
+    # ndbc_buoy - NDBC buoy
+    elif OBS  == 'ndbc_buoy':
+        ndbc_buoy_prod_dir = os.path.join(
+            run_settings_dict['DCOMROOT']
+        )
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+            os.chdir(obs_run_dir)
+            PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
+            prod_files = os.path.join(ndbc_buoy_prod_dir,
+                                      PDYm_dt.strftime('%Y%m%d'),
+                                      'validation_data', 'marine',
+                                      'buoy')
+            run_file = os.path.join(obs_run_dir,
                                     f"buoy_{PDYm_dt:%Y%m%d}.tar")
-        if not ega_util.check_file(archive_file):
-            if len(glob.glob(prod_files+'/*')) != 0:
-                ega_util.run_shell_command(
-                    ['tar', '-cvf', run_file, '-C', prod_files, '.']
-                )
-                if ega_util.check_file(run_file):
-                    if run_settings_dict['SENDARCH'] == 'YES':
-                        ega_util.copy_file(run_file, archive_file)
-                        ega_util.check_file(archive_file)
-            else:
-                print(f"No files matching {prod_files}/*")
-# JASON3 - satellite altimetry
-elif run_settings_dict['OBS']  == 'jason3':
-    jason3_prod_dir = os.path.join(
-        run_settings_dict['DCOMROOT']
-    )
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-        os.chdir(obs_run_dir)
-        PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
-        prod_file = os.path.join(jason3_prod_dir,
-                                 PDYm_dt.strftime('%Y%m%d'),
-                                 'b031', 'xx124')
-        run_file = os.path.join(obs_run_dir,
-                                'jason3_b031_xx124_'
-                                +PDYm_dt.strftime('%Y%m%d'))
-        archive_file = os.path.join(obs_archive_dir,
+            archive_file = os.path.join(obs_archive_dir,
+                                        f"buoy_{PDYm_dt:%Y%m%d}.tar")
+            if not ega_util.check_file(archive_file):
+                if len(glob.glob(prod_files+'/*')) != 0:
+                    ega_util.run_shell_command(
+                        ['tar', '-cvf', run_file, '-C', prod_files, '.']
+                    )
+                    if ega_util.check_file(run_file):
+                        if run_settings_dict['SENDARCH'] == 'YES':
+                            ega_util.copy_file(run_file, archive_file)
+                            ega_util.check_file(archive_file)
+                else:
+                    print(f"No files matching {prod_files}/*")
+    # JASON3 - satellite altimetry
+    elif OBS  == 'jason3':
+        jason3_prod_dir = os.path.join(
+            run_settings_dict['DCOMROOT']
+        )
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+            os.chdir(obs_run_dir)
+            PDYm_dt = datetime.datetime.strptime(PDYm, '%Y%m%d')
+            prod_file = os.path.join(jason3_prod_dir,
+                                     PDYm_dt.strftime('%Y%m%d'),
+                                     'b031', 'xx124')
+            run_file = os.path.join(obs_run_dir,
                                     'jason3_b031_xx124_'
-                                     +PDYm_dt.strftime('%Y%m%d'))
-        if not ega_util.check_file(archive_file):
-            ega_util.copy_file(prod_file, run_file)
-            if ega_util.check_file(run_file):
+                                    +PDYm_dt.strftime('%Y%m%d'))
+            archive_file = os.path.join(obs_archive_dir,
+                                        'jason3_b031_xx124_'
+                                         +PDYm_dt.strftime('%Y%m%d'))
+            if not ega_util.check_file(archive_file):
                 if run_settings_dict['SENDARCH'] == 'YES':
-                    ega_util.copy_file(run_file, archive_file)
+                    ega_util.stage_file(prod_file, archive_file)
                     ega_util.check_file(archive_file)
-# OBSPRCP - CPC rain gauge files
-elif run_settings_dict['OBS'] == 'OBSPRCP':
-    for PDYm_key in list(PDYm_dict.keys()):
-        PDYm = PDYm_dict[PDYm_key]
-        obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
-        if not os.path.exists(obs_run_dir):
-            print("Making directory "+obs_run_dir)
-            os.makedirs(obs_run_dir)
-        os.chdir(obs_run_dir)
-        ftp_file = 'prcp-obs-'+PDYm+'.txt'
-        run_file = os.path.join(obs_run_dir, 'usa-dlyprcp-'+PDYm)
-        archive_file = os.path.join(obs_archive_dir, 'usa-dlyprcp-'+PDYm)
-        if not ega_util.check_file(archive_file):
-            ega_util.run_shell_command(
-                ['wget',
-                 'https://'
-                 +run_settings_dict['cpc_rain_gauge_ftp']+'/'
-                 +run_settings_dict['cpc_rain_gauge_ftp_dir']+'/'
-                 +ftp_file]
-            )
-            ega_util.run_shell_command(
-                ['mv', ftp_file, run_file]
-            )
-            #ega_util.run_shell_command(
-            #    ['lftp', '-c', 
-            #     'open '+run_settings_dict['cpc_rain_gauge_ftp']+'; '
-            #     +'cd '+run_settings_dict['cpc_rain_gauge_ftp_dir']+'; '
-            #     +'get '+ftp_file+' -o '+archive_file]
-            #)
-            if run_settings_dict['SENDARCH'] == 'YES':
-                ega_util.copy_file(run_file, archive_file)
-                ega_util.check_file(archive_file)
-else:
-    print(run_settings_dict['OBS']+" not recongized")
-    sys.exit(1)
+                else:
+                    ega_util.copy_file(prod_file, run_file)
+                    ega_util.check_file(run_file)
+    # OBSPRCP - CPC rain gauge files
+    elif OBS == 'OBSPRCP':
+        # The days missing from the archive are gotten together so
+        # the server directory is listed once, straight into the
+        # archive
+        http_file_list = []
+        for PDYm_key in list(PDYm_dict.keys()):
+            PDYm = PDYm_dict[PDYm_key]
+            obs_run_dir = os.path.join(base_obs_run_dir, PDYm)
+            if not os.path.exists(obs_run_dir):
+                print("Making directory "+obs_run_dir)
+                os.makedirs(obs_run_dir)
+            os.chdir(obs_run_dir)
+            ftp_file = 'prcp-obs-'+PDYm+'.txt'
+            run_file = os.path.join(obs_run_dir, 'usa-dlyprcp-'+PDYm)
+            archive_file = os.path.join(obs_archive_dir, 'usa-dlyprcp-'+PDYm)
+            if not ega_util.check_file(archive_file):
+                if run_settings_dict['SENDARCH'] == 'YES':
+                    dest_file = archive_file
+                else:
+                    dest_file = run_file
+                http_file_list.append(
+                    ('https://'
+                     +run_settings_dict['cpc_rain_gauge_ftp']+'/'
+                     +run_settings_dict['cpc_rain_gauge_ftp_dir']+'/'
+                     +ftp_file, dest_file)
+                )
+        if len(http_file_list) != 0:
+            ega_util.get_remote_files(http_file_list)
+        for http_url, dest_file in http_file_list:
+            ega_util.check_file(dest_file)
+    else:
+        print(OBS+" not recongized")
+        sys.exit(1)
+
+# Start operation timing log
+if not os.path.exists(run_settings_dict['RUN_DIR']):
+    print("Making directory "+run_settings_dict['RUN_DIR'])
+    os.makedirs(run_settings_dict['RUN_DIR'])
+ega_util.start_timing_log(run_settings_dict['RUN_DIR'], 'get_obs_data')
+
+# Check obs types before getting any
+obs_list = run_settings_dict['OBS'].split(',')
+for OBS in obs_list:
+    if OBS not in supported_obs_list:
+        print(OBS+" not recongized, supported obs are "
+              +', '.join(supported_obs_list))
+        sys.exit(1)
 
+# Get obs data, an obs type that fails does not stop the others
+failed_obs_list = ega_util.run_work_units(
+    [(OBS, get_obs_data, (OBS,)) for OBS in obs_list], 1
+)
+
+ega_util.print_timing_summary()
+if len(failed_obs_list) != 0:
+    print("ERROR: getting "+', '.join(failed_obs_list)+" data failed")
+    sys.exit(1)
 print("\nEND: "+sys.argv[0]+" at "+str(datetime.datetime.today())+"\n")
@@ -23,6 +23,9 @@ Command Line Agruments:
                   default: 120
         --fhrinc: optional, forecast hour increment
                   default: 24
+        --workers: optional, number of cnvgrib batches
+                   to run at once
+                   default: 1
 Input Files:
 Output Files:
 Condition codes: 0 for success, 1 for failure
@@ -59,7 +62,10 @@ def usage():
            +"   --fhrmax=FHR_MAX        optional, "
            +"default: 120\n"
            +"   --fhrinc=FHR_INC        optional, "
-           +"default: 24\n")
+           +"default: 24\n"
+           +"   --workers=NWORKERS      optional, "
+           +"number of cnvgrib batches to run at once, "
+           +"default: 1\n")
     sys.exit(1)
 
 # Command line agrument information
@@ -97,6 +103,10 @@ cmd_line_args_dict = {
     '--fhrinc=': {
         'run_name': 'FHR_INC',
         'default': '24'
+    },
+    '--workers=': {
+        'run_name': 'NWORKERS',
+        'default': '1'
     }
 }
 
@@ -108,7 +118,7 @@ for help_arg in help_args:
         sys.exit(0)
 
 # Check number of command line arguments
-if len(sys.argv[1:]) > 8:
+if len(sys.argv[1:]) > 9:
     print("Too many agruments")
     usage()
 
@@ -235,6 +245,10 @@ elif CDATE_dt \
     print("Farthest date back supported is 20160510, requested "
           +run_settings_dict['PDY'])
     sys.exit(1)
+# GRIB2 files are converted together after they are all
+# pulled from HPSS
+convert_file_pair_list = []
+archive_file_list = []
 fhr = int(run_settings_dict['FHR_MIN'])
 while fhr <= int(run_settings_dict['FHR_MAX']):
     fhr2 = str(fhr).zfill(2)
@@ -262,11 +276,8 @@ while fhr <= int(run_settings_dict['FHR_MAX']):
                 )
                 ega_util.run_shell_command(['mv', hpss_file, tmp_file])
             if ega_util.check_file(tmp_file):
-                ega_util.convert_grib2_to_grib1(
-                    tmp_file, archive_file,
-                    run_settings_dict['CNVGRIB']
-                )
-            ega_util.check_file(archive_file)
+                convert_file_pair_list.append((tmp_file, archive_file))
+            archive_file_list.append(archive_file)
     # flx - native grid grib2 files
     elif run_settings_dict['FILE_TYPE'] == 'flx':
         archive_file = os.path.join(gfs_archive_dir, 'flxf'+fhr2+'.gfs.'+CDATE)
@@ -323,16 +334,13 @@ while fhr <= int(run_settings_dict['FHR_MAX']):
                 if not ega_util.check_file(tmp2_file):
                     ega_util.run_shell_command(
                         [run_settings_dict['WGRIB2'], tmp1_file,
-                         '-match', '"(:PRATE:surface:)|'
-                         +'(:TMP:2 m above ground:)"', '-grib',
+                         '-match', '(:PRATE:surface:)|'
+                         +'(:TMP:2 m above ground:)', '-grib',
                          tmp2_file]
                     )
                 if ega_util.check_file(tmp2_file):
-                    ega_util.convert_grib2_to_grib1(
-                        tmp2_file, archive_file,
-                        run_settings_dict['CNVGRIB']
-                    )
-            ega_util.check_file(archive_file)
+                    convert_file_pair_list.append((tmp2_file, archive_file))
+            archive_file_list.append(archive_file)
     else:
         print(run_settings_dict['FILE_TYPE']+" not recongized")
         sys.exit(1)
@@ -340,5 +348,12 @@ while fhr <= int(run_settings_dict['FHR_MAX']):
         fhr+=12
     else:
         fhr+=int(run_settings_dict['FHR_INC'])
+if len(convert_file_pair_list) != 0:
+    ega_util.convert_grib_files(
+        convert_file_pair_list, 'g21', run_settings_dict['CNVGRIB'],
+        nworkers=int(run_settings_dict['NWORKERS'])
+    )
+for archive_file in archive_file_list:
+    ega_util.check_file(archive_file)
 
 print("\nEND: "+sys.argv[0]+" at "+str(datetime.datetime.today())+"\n")
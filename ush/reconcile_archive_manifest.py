@@ -0,0 +1,92 @@
+"""
+About:
+        This script rebuilds the archive manifest
+        from what is on disk in the archive directory.
+Author(s):
+        Mallory Row (mallory.row@noaa.gov)
+History Log:
+        October 2026 - Inital version
+Command Line Agruments:
+        --archdir: path to archive directory,
+                   default: /lfs/h2/emc/vpppg/noscrub/$USER/archive/model_data
+Input Files:
+Output Files:
+Condition codes: 0 for success, 1 for failure
+"""
+
+import os
+import sys
+import datetime
+import emc_global_archive_util as ega_util
+
+print("\nBEGIN: "+sys.argv[0]+" at "+str(datetime.datetime.today())+"\n")
+
+def usage():
+    """! How to call this script.
+    """
+    filename = os.path.basename(__file__)
+    print ("Usage: "+filename+" arg1 arg2\n"
+           +"-h|--help               Display this usage statement\n"
+           +"Arguments:\n"
+           +"   --archdir=ARCHIVE_DIR   optional, "
+           +"path to archive directory, "
+           +"default: /lfs/h2/emc/vpppg/noscrub/$USER/archive/model_data\n")
+    sys.exit(1)
+
+# Command line agrument information
+cmd_line_args_dict = {
+    '--archdir=': {
+        'run_name': 'ARCHIVE_DIR',
+        'default': ('/lfs/h2/emc/vpppg/noscrub/'+os.environ['USER']
+                    +'/archive/model_data')
+    }
+}
+
+# Print usage statement
+help_args = ('-h', '--help')
+for help_arg in help_args:
+    if help_arg in sys.argv:
+        usage()
+        sys.exit(0)
+
+# Check number of command line arguments
+if len(sys.argv[1:]) > 1:
+    print("Too many agruments")
+    usage()
+
+# Set up dictionary for run settings
+run_settings_dict = {}
+
+# Run settings: command line arguments
+print("Command line argument settings...")
+for cmd_line_arg_name in list(cmd_line_args_dict.keys()):
+    cmd_line_arg_opt_dict = cmd_line_args_dict[cmd_line_arg_name]
+    cmd_line_arg_opt_run_name = cmd_line_arg_opt_dict['run_name']
+    cmd_line_arg_opt_default = cmd_line_arg_opt_dict['default']
+    if any(cmd_line_arg_name in arg for arg in sys.argv[1:]):
+        for arg in sys.argv[1:]:
+            if cmd_line_arg_name in arg:
+                print(cmd_line_arg_name+" passed, using  "
+                      +arg.replace(cmd_line_arg_name, ''))
+                run_settings_dict[cmd_line_arg_opt_run_name] = (
+                    arg.replace(cmd_line_arg_name, '')
+                )
+    else:
+        print(cmd_line_arg_name+" not passed, using default "
+              +cmd_line_arg_opt_default)
+        run_settings_dict[cmd_line_arg_opt_run_name] = (
+            cmd_line_arg_opt_default
+        )
+
+print("\nUsing run settings...")
+for run_name in list(run_settings_dict.keys()):
+    print(run_name+' = '+str(run_settings_dict[run_name]))
+print("")
+
+# Rebuild manifest
+if not os.path.exists(run_settings_dict['ARCHIVE_DIR']):
+    print(run_settings_dict['ARCHIVE_DIR']+" does not exist")
+    sys.exit(1)
+ega_util.reconcile_archive_manifest(run_settings_dict['ARCHIVE_DIR'])
+
+print("\nEND: "+sys.argv[0]+" at "+str(datetime.datetime.today())+"\n")
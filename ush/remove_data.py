@@ -155,11 +155,14 @@ if nremove_files != 0:
     print("Removing "+str(nremove_files)+" files "
           +' '.join(remove_file_list))
     ega_util.run_shell_command(
-        ['rm', '-rf', ' '.join(remove_file_list)]
+        ['rm', '-rf']+remove_file_list
     )
+    if ega_util.find_archive_manifest(remove_archive_dir) is not None:
+        for remove_file in remove_file_list:
+            ega_util.remove_archive_file_record(remove_file)
     ega_util.run_shell_command(
         ['ssh', os.environ['USER']+'@'+wcoss2_dict['OTHER'],
-         '"rm -rf '+' '.join(remove_file_list)+'"']
+         'rm -rf '+' '.join(remove_file_list)]
     )
 else:
     print("No files matching date "+run_settings_dict['PDY']+" in "
@@ -108,8 +108,8 @@ wcoss2_dict = ega_util.get_machine_dict()
 
 # Sync data
 ega_util.run_shell_command(
-    ['rsync', '-ahr', '-P', os.path.join(run_settings_dict['ARCHIVE_DIR'], '*'),
+    ['rsync', '-ahrH', '-P', os.path.join(run_settings_dict['ARCHIVE_DIR'], '*'),
      wcoss2_dict['OTHER']+':'
      +os.path.join(run_settings_dict['ARCHIVE_DIR'], '.')
-    ]
+    ], shell=True
 )